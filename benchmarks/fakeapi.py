@@ -0,0 +1,386 @@
+import re
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from math import ceil
+from urllib.parse import parse_qsl, urlsplit
+
+from odp.lib.client import ODPAPIError
+from odp.ui.base import api
+
+RECORD, USER, RESOURCE, PACKAGE, PROVIDER, COLLECTION, AUDIT = range(1, 8)
+
+EPOCH = datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+CATALOGS = {
+    'SAEON': 'https://catalogue.saeon.ac.za/records',
+    'MIMS': 'https://catalogue.mims.ac.za/records',
+    'DataCite': 'https://doi.org',
+}
+ROLES = ('admin', 'curator', 'harvester', 'provider', 'viewer')
+MIMETYPES = ('text/csv', 'application/netcdf', 'image/tiff', 'application/pdf', 'application/zip')
+
+
+def make_id(kind: int, index: int) -> str:
+    return str(uuid.UUID(int=kind << 64 | index))
+
+
+def _index(kind: int, id: str, count: int) -> int:
+    try:
+        value = uuid.UUID(id).int
+    except ValueError:
+        value = 0
+    if value >> 64 != kind or (index := value & (1 << 64) - 1) >= count:
+        raise ODPAPIError(404, {'detail': 'Not Found'})
+    return index
+
+
+def _timestamp(seconds: int) -> str:
+    return (EPOCH + timedelta(seconds=seconds)).isoformat()
+
+
+def _page(items, total: int, page, size) -> dict:
+    """Return an API page of ``items``, a function of (start, stop)
+    returning the items in that range.
+
+    As for the API, ``size=0`` returns all items on a single page.
+    """
+    page = int(page or 1)
+    size = 50 if size in (None, '') else int(size)
+    if size == 0:
+        return dict(items=items(0, total), total=total, page=1, pages=1)
+
+    start = (page - 1) * size
+    return dict(
+        items=items(start, min(start + size, total)),
+        total=total,
+        page=page,
+        pages=max(1, ceil(total / size)),
+    )
+
+
+class FakeAPI:
+    """In-process stand-in for the ODP API, serving large synthetic
+    datasets to the admin UI.
+
+    Objects are generated deterministically from their position in the
+    dataset (which is encoded in their ids) when requested, so that the
+    dataset size does not affect memory use. Write requests are accepted
+    and discarded.
+    """
+
+    def __init__(
+            self,
+            *,
+            records: int = 100_000,
+            users: int = 50_000,
+            resources: int = 500_000,
+            packages: int = 20_000,
+            providers: int = 100,
+            collections: int = 400,
+            record_audit_entries: int = 2_000,
+            provider_users: int = 1_000,
+            package_resources: int = 2_000,
+            latency: float = 0.0,
+    ):
+        """
+        :param latency: simulated network round trip per API call, in seconds
+        """
+        self.records = records
+        self.users = users
+        self.resources = resources
+        self.packages = packages
+        self.providers = providers
+        self.collections = collections
+        self.record_audit_entries = record_audit_entries
+        self.provider_users = provider_users
+        self.package_resources = package_resources
+        self.latency = latency
+
+        object_id = '(?P<id>[^/]+)'
+        self._routes = [
+            (re.compile(pattern), handler) for pattern, handler in (
+                (r'/record/', self._record_list),
+                (fr'/record/{object_id}', self._record_detail),
+                (fr'/record/{object_id}/catalog', self._record_catalog_list),
+                (fr'/record/{object_id}/audit', self._record_audit_list),
+                (r'/catalog/', self._catalog_list),
+                (r'/collection/', self._collection_list),
+                (r'/provider/', self._provider_list),
+                (r'/provider/all/', self._provider_list),
+                (fr'/provider/all/{object_id}', self._provider_detail),
+                (fr'/provider/{object_id}/audit', self._provider_audit_list),
+                (r'/role/', self._role_list),
+                (r'/schema/', self._schema_list),
+                (r'/scope/', self._scope_list),
+                (r'/user/', self._user_list),
+                (fr'/user/{object_id}', self._user_detail),
+                (r'/package/all/', self._package_list),
+                (fr'/package/all/{object_id}', self._package_detail),
+                (r'/resource/all/', self._resource_list),
+            )
+        ]
+
+    def install(self) -> None:
+        """Route ``odp.ui.base.api`` calls to this fake.
+
+        This must be called before ``create_app()``, so that the fake
+        sits beneath the admin UI's API caches and instrumentation,
+        which are then exercised as in production.
+        """
+        api.get = self._get
+        api.post = api.put = api.delete = self._write
+
+    def _get(self, path, **params):
+        self._round_trip()
+        url = urlsplit(path)
+        params = dict(parse_qsl(url.query)) | {k: v for k, v in params.items() if v is not None}
+        for pattern, handler in self._routes:
+            if match := pattern.fullmatch(url.path):
+                return handler(*match.groups(), **params)
+
+        raise ODPAPIError(404, {'detail': 'Not Found'})
+
+    def _write(self, path, *args, **kwargs):
+        self._round_trip()
+        return {}
+
+    def _round_trip(self) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+
+    # --- records ---
+
+    def record(self, i: int) -> dict:
+        collection = i % self.collections
+        record_id = make_id(RECORD, i)
+        qc_tags = [dict(
+            id=make_id(AUDIT, i),
+            tag_id='Record.QC',
+            user_id=make_id(USER, i % self.users),
+            user_name=f'User {i % self.users}',
+            user_email=f'user{i % self.users}@example.org',
+            data=dict(pass_=True, comment='Checked'),
+            timestamp=_timestamp(i * 60 + 30),
+            cardinality='user',
+            public=False,
+        )] if i % 3 == 0 else []
+
+        return dict(
+            id=record_id,
+            doi=f'10.15493/BENCH.{i:08d}',
+            sid=None,
+            collection_id=make_id(COLLECTION, collection),
+            collection_key=f'collection-{collection}',
+            collection_name=f'Collection {collection}',
+            provider_id=make_id(PROVIDER, collection % self.providers),
+            provider_key=f'provider-{collection % self.providers}',
+            schema_id='SAEON.DataCite4',
+            schema_uri='https://odp.saeon.ac.za/schema/metadata/saeon/datacite4',
+            parent_id=None,
+            parent_doi=None,
+            child_dois=[],
+            metadata=dict(
+                doi=f'10.15493/BENCH.{i:08d}',
+                titles=[dict(title=f'Synthetic dataset {i}')],
+                creators=[dict(name=f'Creator {j}', affiliation=[dict(affiliation='SAEON')]) for j in range(5)],
+                subjects=[dict(subject=f'Keyword {j}') for j in range(10)],
+                descriptions=[dict(description='Lorem ipsum dolor sit amet. ' * 20, descriptionType='Abstract')],
+                publicationYear=str(2000 + i % 25),
+            ),
+            validity=dict(valid=True),
+            timestamp=_timestamp(i * 60),
+            tags=qc_tags,
+            published_catalog_ids=['SAEON', 'DataCite'] if i % 2 else ['SAEON'],
+        )
+
+    def _record_list(self, page=None, size=None, **params):
+        return _page(lambda start, stop: [self.record(i) for i in range(start, stop)], self.records, page, size)
+
+    def _record_detail(self, id, **params):
+        return self.record(_index(RECORD, id, self.records))
+
+    def _record_catalog_list(self, id, page=None, size=None, **params):
+        i = _index(RECORD, id, self.records)
+        return _page(lambda start, stop: [dict(
+            catalog_id=catalog_id,
+            record_id=id,
+            published=True,
+            reason='',
+            timestamp=_timestamp(i * 60 + 45),
+        ) for catalog_id in list(CATALOGS)[start:stop]], len(CATALOGS), page, size)
+
+    def _record_audit_list(self, id, page=None, size=None, **params):
+        i = _index(RECORD, id, self.records)
+        total = self.record_audit_entries
+
+        def entry(n):
+            # most recent first
+            seconds = i * 60 + (total - n) * 3600
+            return dict(
+                table='record' if n % 4 else 'record_tag',
+                tag_id=None if n % 4 else 'Record.QC',
+                audit_id=total - n,
+                client_id='odp.admin',
+                user_id=make_id(USER, n % self.users),
+                user_name=f'User {n % self.users}',
+                command='update',
+                timestamp=_timestamp(seconds),
+            )
+
+        return _page(lambda start, stop: [entry(n) for n in range(start, stop)], total, page, size)
+
+    # --- reference data ---
+
+    def _catalog_list(self, page=None, size=None, **params):
+        return _page(lambda start, stop: [
+            dict(id=catalog_id, url=url, record_count=self.records)
+            for catalog_id, url in list(CATALOGS.items())[start:stop]
+        ], len(CATALOGS), page, size)
+
+    def _collection_list(self, page=None, size=None, **params):
+        return _page(lambda start, stop: [dict(
+            id=make_id(COLLECTION, i),
+            key=f'collection-{i}',
+            name=f'Collection {i}',
+            provider_id=make_id(PROVIDER, i % self.providers),
+            provider_key=f'provider-{i % self.providers}',
+            doi_key=None,
+            record_count=self.records // self.collections,
+            tags=[],
+            role_ids=[],
+            timestamp=_timestamp(i),
+        ) for i in range(start, stop)], self.collections, page, size or self.collections)
+
+    def _provider(self, i: int, with_users: bool) -> dict:
+        provider = dict(
+            id=make_id(PROVIDER, i),
+            key=f'provider-{i}',
+            name=f'Provider {i}',
+            collection_keys={
+                make_id(COLLECTION, c): f'collection-{c}'
+                for c in range(i, self.collections, self.providers)
+            },
+            timestamp=_timestamp(i),
+        )
+        if with_users:
+            user_ids = [make_id(USER, (i * self.provider_users + n) % self.users) for n in range(self.provider_users)]
+            provider |= dict(
+                user_ids=user_ids,
+                user_names={
+                    user_id: f'User {(i * self.provider_users + n) % self.users}'
+                    for n, user_id in enumerate(user_ids)
+                },
+            )
+        return provider
+
+    def _provider_list(self, page=None, size=None, **params):
+        return _page(lambda start, stop: [
+            self._provider(i, False) for i in range(start, stop)
+        ], self.providers, page, size or self.providers)
+
+    def _provider_detail(self, id, **params):
+        return self._provider(_index(PROVIDER, id, self.providers), True)
+
+    def _provider_audit_list(self, id, page=None, size=None, **params):
+        _index(PROVIDER, id, self.providers)
+        return _page(lambda start, stop: [], 0, page, size)
+
+    def _role_list(self, page=None, size=None, **params):
+        return _page(lambda start, stop: [
+            dict(id=role_id, scope_ids=[], collection_keys={}, user_ids=[])
+            for role_id in ROLES[start:stop]
+        ], len(ROLES), page, size or len(ROLES))
+
+    def _schema_list(self, page=None, size=None, **params):
+        schemas = ('SAEON.DataCite4', 'SAEON.ISO19115', 'Tag.QC', 'Tag.Note', 'Tag.Embargo')
+        return _page(lambda start, stop: [
+            dict(id=schema_id, type='metadata', uri=f'https://odp.saeon.ac.za/schema/{schema_id}', schema_={})
+            for schema_id in schemas[start:stop]
+        ], len(schemas), page, size or len(schemas))
+
+    def _scope_list(self, page=None, size=None, **params):
+        return _page(lambda start, stop: [], 0, page, size)
+
+    # --- users ---
+
+    def _user(self, i: int) -> dict:
+        return dict(
+            id=make_id(USER, i),
+            name=f'User {i}',
+            email=f'user{i}@example.org',
+            active=True,
+            verified=True,
+            picture=None,
+            role_ids=[ROLES[i % len(ROLES)]],
+        )
+
+    def _user_list(self, page=None, size=None, text_query=None, role_id=None, **params):
+        # filters are accepted but not applied; the result size is what matters here
+        return _page(lambda start, stop: [self._user(i) for i in range(start, stop)], self.users, page, size)
+
+    def _user_detail(self, id, **params):
+        return self._user(_index(USER, id, self.users))
+
+    # --- packages and resources ---
+
+    def _resource(self, i: int) -> dict:
+        provider = i % self.providers
+        return dict(
+            id=make_id(RESOURCE, i),
+            title=f'Resource {i}',
+            description=None,
+            filename=f'file-{i:06d}.{MIMETYPES[i % len(MIMETYPES)].split("/")[1]}',
+            mimetype=MIMETYPES[i % len(MIMETYPES)],
+            size=(i * 7919) % 10_000_000,
+            hash=None,
+            hash_algorithm=None,
+            provider_id=make_id(PROVIDER, provider),
+            provider_key=f'provider-{provider}',
+            archive_paths={},
+            timestamp=_timestamp(i),
+        )
+
+    def _package(self, i: int) -> dict:
+        provider = i % self.providers
+        first = i * self.package_resources % self.resources
+        resources = [self._resource((first + n) % self.resources) for n in range(self.package_resources)]
+        return dict(
+            id=make_id(PACKAGE, i),
+            title=f'Package {i}',
+            status='pending',
+            provider_id=make_id(PROVIDER, provider),
+            provider_key=f'provider-{provider}',
+            record_id=None,
+            record_doi=None,
+            record_sid=None,
+            resource_ids=[resource['id'] for resource in resources],
+            resources=resources,
+            tags=[],
+            timestamp=_timestamp(i),
+        )
+
+    def _package_list(self, page=None, size=None, **params):
+        return _page(lambda start, stop: [
+            self._package(i) | dict(resources=[]) for i in range(start, stop)
+        ], self.packages, page, size)
+
+    def _package_detail(self, id, **params):
+        return self._package(_index(PACKAGE, id, self.packages))
+
+    def _resource_list(self, page=None, size=None, provider_id=None, package_id=None, **params):
+        if package_id:
+            first = _index(PACKAGE, package_id, self.packages) * self.package_resources % self.resources
+            return _page(lambda start, stop: [
+                self._resource((first + n) % self.resources) for n in range(start, stop)
+            ], self.package_resources, page, size)
+
+        if provider_id:
+            # every providers'th resource belongs to the provider
+            provider = _index(PROVIDER, provider_id, self.providers)
+            total = len(range(provider, self.resources, self.providers))
+            return _page(lambda start, stop: [
+                self._resource(provider + n * self.providers) for n in range(start, stop)
+            ], total, page, size)
+
+        return _page(lambda start, stop: [self._resource(i) for i in range(start, stop)], self.resources, page, size)
@@ -0,0 +1,101 @@
+"""Report the admin app's startup cost.
+
+Usage::
+
+    python -m benchmarks.importtime [--top N] [--output FILE] [--baseline FILE]
+
+``create_app()`` is run in a fresh interpreter under ``-X importtime``,
+and the wall time to create the app and to load its views is reported,
+along with the modules and top-level packages with the greatest
+cumulative import time. With ``LAZY_VIEWS`` enabled, view loading is
+excluded from app creation.
+
+With ``--baseline``, the run fails (exit status 1) if app creation or
+view loading is slower than in the baseline results by more than
+``--tolerance``.
+"""
+import argparse
+import json
+import subprocess
+import sys
+from collections import defaultdict
+
+STARTUP = '''
+import json, time
+start = time.perf_counter()
+from odp.ui.admin import create_app, views
+app = create_app()
+created = time.perf_counter()
+views.load(app)
+loaded = time.perf_counter()
+print(json.dumps(dict(create_app=(created - start) * 1000, load_views=(loaded - created) * 1000)))
+'''
+
+
+def measure() -> tuple[dict, list[tuple[str, int, int]]]:
+    """Return startup timings (ms) and a list of (module, self us,
+    cumulative us) import times."""
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', STARTUP],
+        capture_output=True,
+        text=True,
+    )
+    if process.returncode:
+        sys.exit(process.stderr)
+
+    imports = []
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, module = line.removeprefix('import time:').split('|')
+        # nesting is indicated by indentation; keep module names only
+        imports += [(module.strip(), int(self_us), int(cumulative_us))]
+
+    return json.loads(process.stdout.splitlines()[-1]), imports
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--top', type=int, default=20, help='number of modules to list')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    parser.add_argument('--baseline', help='compare with results previously written by --output')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed increase over baseline')
+    args = parser.parse_args()
+
+    timings, imports = measure()
+
+    packages = defaultdict(int)
+    for module, self_us, _ in imports:
+        packages[module.split('.')[0]] += self_us
+
+    print(f"create_app: {timings['create_app']:.1f} ms")
+    print(f"load views: {timings['load_views']:.1f} ms")
+    print(f"imports:    {sum(self_us for _, self_us, _ in imports) / 1000:.1f} ms ({len(imports)} modules)")
+
+    print(f"\n{'package':<40}{'self ms':>10}")
+    for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f'{package:<40}{self_us / 1000:>10.1f}')
+
+    print(f"\n{'module':<60}{'cumulative ms':>15}")
+    for module, _, cumulative_us in sorted(imports, key=lambda item: -item[2])[:args.top]:
+        print(f'{module:<60}{cumulative_us / 1000:>15.1f}')
+
+    results = timings | dict(packages={package: self_us / 1000 for package, self_us in packages.items()})
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    failed = False
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        for key in ('create_app', 'load_views'):
+            if results[key] > baseline[key] * (1 + args.tolerance):
+                print(f'{key}: {results[key]:.1f} ms exceeds baseline {baseline[key]:.1f} ms')
+                failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
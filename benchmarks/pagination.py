@@ -0,0 +1,74 @@
+"""Compare offset and keyset (cursor) pagination of the local record mirror.
+
+Usage::
+
+    python -m benchmarks.pagination [--records N] [--repeat R] [--db FILE]
+
+A mirror database is populated with synthetic records, and the time to
+fetch a page at increasing depths is reported for both modes. Offset
+pages get slower with depth, since SQLite must step over all preceding
+rows; keyset pages should cost the same at any depth.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.fakeapi import FakeAPI
+from odp.ui.admin.lib.mirror import PAGE_SIZE, RecordMirror
+from odp.ui.admin.lib.pagination import encode_cursor
+
+
+def populate(mirror: RecordMirror, api: FakeAPI) -> None:
+    batch = 1000
+    for start in range(0, api.records, batch):
+        mirror.upsert([api.record(i) for i in range(start, min(start + batch, api.records))])
+
+
+def timed(func, repeat: int) -> float:
+    """Return the median duration of ``func`` in ms."""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations += [(time.perf_counter() - start) * 1000]
+    return statistics.median(durations)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--records', type=int, default=200_000)
+    parser.add_argument('--repeat', type=int, default=20, help='fetches per measurement')
+    parser.add_argument('--db', help='mirror database file; a temporary file by default')
+    args = parser.parse_args()
+
+    path = args.db or os.path.join(tempfile.mkdtemp(), 'mirror.db')
+    mirror = RecordMirror(path)
+    if mirror.get_page(None, None)['total'] != args.records:
+        print(f'Populating {path} with {args.records} records...')
+        populate(mirror, FakeAPI(records=args.records))
+
+    total = args.records
+    pages = total // PAGE_SIZE
+    print(f"{'page':>8}{'offset ms':>12}{'keyset ms':>12}")
+    depth = 1
+    while depth <= pages:
+        offset_ms = timed(lambda: mirror.get_page(None, None, page=depth), args.repeat)
+
+        # the cursor that the previous page would have returned
+        cursor = None
+        if depth > 1:
+            previous = mirror.get_page(None, None, page=depth - 1)['items'][-1]
+            cursor = encode_cursor(previous['timestamp'], previous['id'], total)
+        keyset_ms = timed(lambda: mirror.get_page(None, None, cursor=cursor), args.repeat)
+
+        print(f'{depth:>8}{offset_ms:>12.2f}{keyset_ms:>12.2f}')
+        depth *= 4
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,164 @@
+"""Benchmark the admin UI's main views against a synthetic ODP API.
+
+Usage::
+
+    python -m benchmarks.run [--requests N] [--concurrency C] [--latency MS]
+                             [--scale F] [--output FILE] [--baseline FILE]
+
+The admin app is created with ``create_app()``, so the usual ODP
+environment configuration must be present; API calls, however, are
+served in-process by ``benchmarks.fakeapi.FakeAPI`` and no ODP services
+are contacted. Requests are made as a signed-in user holding every
+ODP scope.
+
+With ``--baseline``, the run fails (exit status 1) if any view's p95
+latency exceeds that of the baseline results by more than
+``--tolerance``, so that performance regressions can be caught before
+deployment.
+"""
+import argparse
+import json
+import random
+import re
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Flask, g, url_for
+from flask_login import UserMixin
+
+from benchmarks.fakeapi import COLLECTION, PACKAGE, PROVIDER, RECORD, USER, FakeAPI, make_id
+from odp.const import ODPScope
+
+VIEWS = {
+    'records.index': lambda api: dict(page=random.randint(1, max(1, api.records // 50))),
+    'records.detail': lambda api: dict(id=make_id(RECORD, random.randrange(api.records))),
+    'providers.edit': lambda api: dict(id=make_id(PROVIDER, random.randrange(api.providers))),
+    'packages.detail': lambda api: dict(id=make_id(PACKAGE, random.randrange(api.packages))),
+    'packages.edit': lambda api: dict(id=make_id(PACKAGE, random.randrange(api.packages))),
+    'packages.fetch_resources': lambda api: dict(
+        provider_id=make_id(PROVIDER, random.randrange(api.providers)),
+        cursor=f'{random.randint(1, 10)}.0',
+    ),
+}
+"""Benchmarked endpoints, and functions returning random URL values for them."""
+
+SERVER_TIMING_API = re.compile(r'api;dur=([\d.]+);desc="(\d+) API calls"')
+
+
+class BenchUser(UserMixin):
+    id = make_id(USER, 0)
+    name = 'Benchmark'
+    email = 'benchmark@example.org'
+
+
+def sign_in(app: Flask) -> None:
+    """Make every request on behalf of a user holding all scopes."""
+
+    def before_request():
+        g._login_user = BenchUser()
+        g.user_permissions = {scope.value: '*' for scope in ODPScope}
+
+    app.before_request_funcs.setdefault(None, []).insert(0, before_request)
+
+
+def bench_view(app: Flask, api: FakeAPI, endpoint: str, requests: int, concurrency: int) -> dict:
+    with app.test_request_context():
+        urls = [url_for(endpoint, **VIEWS[endpoint](api)) for _ in range(requests)]
+
+    local = threading.local()
+    errors = []
+
+    def fetch(url):
+        if not hasattr(local, 'client'):
+            local.client = app.test_client()
+        start = time.perf_counter()
+        response = local.client.get(url)
+        response.get_data()
+        elapsed = time.perf_counter() - start
+        if response.status_code != 200:
+            errors.append(f'{url}: {response.status_code}')
+
+        api_calls = 0
+        if match := SERVER_TIMING_API.search(response.headers.get('Server-Timing', '')):
+            api_calls = int(match.group(2))
+        return elapsed, api_calls
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        results = list(executor.map(fetch, urls))
+    wall = time.perf_counter() - start
+
+    latencies = sorted(elapsed for elapsed, _ in results)
+    percentiles = statistics.quantiles(latencies, n=100, method='inclusive')
+    return dict(
+        requests=requests,
+        errors=len(errors),
+        first_error=errors[0] if errors else None,
+        throughput=requests / wall,
+        p50=percentiles[49] * 1000,
+        p95=percentiles[94] * 1000,
+        p99=percentiles[98] * 1000,
+        api_calls=statistics.mean(api_calls for _, api_calls in results),
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=200, help='requests per view')
+    parser.add_argument('--concurrency', type=int, default=8, help='concurrent clients')
+    parser.add_argument('--warmup', type=int, default=20, help='unmeasured requests per view')
+    parser.add_argument('--latency', type=float, default=5, help='simulated API round trip, in ms')
+    parser.add_argument('--scale', type=float, default=1, help='dataset size multiplier')
+    parser.add_argument('--views', nargs='+', choices=VIEWS, default=list(VIEWS))
+    parser.add_argument('--output', help='write results as JSON to this file')
+    parser.add_argument('--baseline', help='compare with results previously written by --output')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed p95 increase over baseline')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    api = FakeAPI(
+        records=int(100_000 * args.scale),
+        users=int(50_000 * args.scale),
+        resources=int(500_000 * args.scale),
+        packages=int(20_000 * args.scale),
+        latency=args.latency / 1000,
+    )
+    api.install()
+
+    from odp.ui.admin import create_app
+    app = create_app()
+    sign_in(app)
+
+    results = {}
+    print(f"{'view':<26}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'API calls':>11}{'errors':>8}")
+    for endpoint in args.views:
+        if args.warmup:
+            bench_view(app, api, endpoint, args.warmup, args.concurrency)
+        results[endpoint] = result = bench_view(app, api, endpoint, args.requests, args.concurrency)
+        print(f"{endpoint:<26}{result['throughput']:>9.1f}{result['p50']:>9.1f}{result['p95']:>9.1f}"
+              f"{result['p99']:>9.1f}{result['api_calls']:>11.1f}{result['errors']:>8}")
+        if result['first_error']:
+            print(f"  first error: {result['first_error']}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    failed = any(result['errors'] for result in results.values())
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        for endpoint, result in results.items():
+            if endpoint in baseline and result['p95'] > baseline[endpoint]['p95'] * (1 + args.tolerance):
+                print(f"{endpoint}: p95 {result['p95']:.1f} ms exceeds baseline {baseline[endpoint]['p95']:.1f} ms")
+                failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
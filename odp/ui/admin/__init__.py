@@ -7,6 +7,7 @@ from odp.const import ODPScope
 from odp.const.hydra import HydraScope
 from odp.ui import base
 from odp.ui.admin import views
+from odp.ui.admin.lib import cache, jobs, memo, metrics, mirror, search, service, storage, templating, transport, uploads, warmup
 
 
 def create_app():
@@ -21,12 +22,57 @@ def create_app():
         SECRET_KEY=config.ODP.ADMIN.FLASK_SECRET,
     )
 
+    # optional tuning; the defaults apply where a deployment's
+    # ODP.ADMIN config does not define these settings
+    for setting in (
+            'API_POOL_SIZE',
+            'API_POOL_BLOCK',
+            'API_CONNECT_TIMEOUT',
+            'API_READ_TIMEOUT',
+            'API_GET_RETRIES',
+            'API_RETRY_BACKOFF',
+            'API_RESPONSE_CACHE_SIZE',
+            'API_RESPONSE_CACHE_BYTES',
+            'METRICS_ENABLED',
+            'METRICS_TOKEN',
+            'TEMPLATE_BYTECODE_CACHE',
+            'TEMPLATE_BYTECODE_CACHE_DIR',
+            'TEMPLATE_PROFILING',
+            'LAZY_VIEWS',
+            'RECORD_SEARCH_INDEX',
+            'RECORD_SEARCH_REFRESH_INTERVAL',
+            'RECORD_SEARCH_REBUILD_INTERVAL',
+            'RECORD_MIRROR',
+            'RECORD_MIRROR_SYNC_INTERVAL',
+            'RECORD_MIRROR_RESYNC_INTERVAL',
+            'RECORD_MIRROR_MAX_STALENESS',
+            'SERVICE_CLIENT_ID',
+            'SERVICE_CLIENT_SECRET',
+            'SERVICE_CLIENT_SCOPE',
+            'WARMUP_TIMEOUT',
+            'STORAGE_SUMMARY_TTL',
+    ):
+        if (value := getattr(config.ODP.ADMIN, setting, None)) is not None:
+            app.config[setting] = value
+
     base.init_app(
         app,
         user_api=True,
         template_dir=Path(__file__).parent / 'templates',
         macro_dir=Path(__file__).parent / 'macros',
     )
+    templating.init_app(app)
+    transport.init_app(app)
+    service.init_app(app)
+    metrics.init_app(app)
+    cache.init_app(app)
+    warmup.init_app(app)
+    memo.init_app(app)
+    jobs.init_app(app)
+    uploads.init_app(app)
+    search.init_app(app)
+    mirror.init_app(app)
+    storage.init_app(app)
     views.init_app(app)
 
     return app
@@ -1,13 +1,32 @@
-from wtforms import BooleanField, FileField, RadioField, SelectField, StringField, TextAreaField, ValidationError
+from wtforms import BooleanField, FileField, IntegerField, RadioField, SelectField, StringField, TextAreaField, ValidationError
 from wtforms.validators import data_required, input_required, length, optional, regexp
 
-from odp.const import DOI_REGEX, SID_REGEX
+from odp.const import DOI_REGEX, ODPCollectionTag, ODPRecordTag, SID_REGEX
 from odp.const.hydra import GrantType, ResponseType, TokenEndpointAuthMethod
+from odp.ui.admin.lib.audit import AUDIT_PAGE_SIZES
 from odp.ui.base.forms import BaseForm
 from odp.ui.base.forms.fields import DateStringField, JSONTextField, MultiCheckboxField, StringListField
 from odp.ui.base.forms.validators import file_required, json_object
 
 
+class AuditFilterForm(BaseForm):
+    type = SelectField(
+        label='Type',
+        choices=[('', '(All)'), ('entity', 'Object'), ('tag', 'Tag')],
+    )
+    since = StringField(
+        label='From',
+    )
+    until = StringField(
+        label='To',
+    )
+    size = SelectField(
+        label='Page size',
+        choices=[(str(size), str(size)) for size in AUDIT_PAGE_SIZES],
+        default=str(AUDIT_PAGE_SIZES[1]),
+    )
+
+
 class ClientForm(BaseForm):
     id = StringField(
         label='Client id',
@@ -66,6 +85,21 @@ class ClientForm(BaseForm):
             raise ValidationError('At least one scope must be selected.')
 
 
+class CollectionBulkTagForm(BaseForm):
+    tag_id = SelectField(
+        label='Tag',
+        choices=[(tag.value, tag.value) for tag in (
+            ODPCollectionTag.PUBLISHED,
+            ODPCollectionTag.FROZEN,
+        )],
+    )
+    action = RadioField(
+        label='Action',
+        choices=[('apply', 'Apply'), ('remove', 'Remove')],
+        default='apply',
+    )
+
+
 class CollectionForm(BaseForm):
     id = StringField(
         label='Collection id',
@@ -118,8 +152,12 @@ class PackageForm(BaseForm):
         label='Provider',
         validators=[input_required()],
     )
-    resource_ids = MultiCheckboxField(
-        label='Resources',
+    add_resource_ids = MultiCheckboxField(
+        label='Add resources',
+        dynamic_choices=True,
+    )
+    remove_resource_ids = MultiCheckboxField(
+        label='Remove resources',
         dynamic_choices=True,
     )
 
@@ -138,8 +176,12 @@ class ProviderForm(BaseForm):
         label='Provider name',
         validators=[data_required()],
     )
-    user_ids = MultiCheckboxField(
-        label='Users',
+    add_user_ids = MultiCheckboxField(
+        label='Add users',
+        dynamic_choices=True,
+    )
+    remove_user_ids = MultiCheckboxField(
+        label='Remove users',
         dynamic_choices=True,
     )
 
@@ -176,7 +218,58 @@ class RecordForm(BaseForm):
             raise ValidationError('SID is required if there is no DOI.')
 
 
+class RecordBulkDeleteForm(BaseForm):
+    select_all = BooleanField(
+        label='All records matching the current filter',
+    )
+
+
+class RecordBulkTagForm(BaseForm):
+    tag_id = SelectField(
+        label='Tag',
+        choices=[(tag.value, tag.value) for tag in (
+            ODPRecordTag.QC,
+            ODPRecordTag.EMBARGO,
+            ODPRecordTag.NOTSEARCHABLE,
+            ODPRecordTag.RETRACTED,
+        )],
+    )
+    action = RadioField(
+        label='Action',
+        choices=[('apply', 'Apply'), ('remove', 'Remove')],
+        default='apply',
+    )
+    pass_ = BooleanField(
+        label='QC pass',
+    )
+    start = DateStringField(
+        label='Embargo start date',
+        validators=[optional()],
+    )
+    end = DateStringField(
+        label='Embargo end date',
+        validators=[optional()],
+    )
+    comment = StringField(
+        label='Comment',
+    )
+    select_all = BooleanField(
+        label='All records matching the current filter',
+    )
+
+    def validate_start(self, field):
+        if self.tag_id.data == ODPRecordTag.EMBARGO and self.action.data == 'apply' and not field.data:
+            raise ValidationError('A start date is required for an embargo.')
+
+    def validate_end(self, field):
+        if self.start.data and field.data and field.data < self.start.data:
+            raise ValidationError('The end date cannot be earlier than the start date.')
+
+
 class RecordFilterForm(BaseForm):
+    q = StringField(
+        label='Search',
+    )
     id_q = StringField(
         label='Record ID / DOI / SID',
     )
@@ -188,6 +281,24 @@ class RecordFilterForm(BaseForm):
     )
 
 
+class RecordImportForm(BaseForm):
+    file = FileField(
+        label='Metadata file (.json, .jsonl or .zip)',
+        validators=[file_required()],
+    )
+    collection_id = SelectField(
+        label='Collection',
+        validators=[input_required()],
+    )
+    schema_id = SelectField(
+        label='Schema',
+        validators=[input_required()],
+    )
+    validate_only = BooleanField(
+        label='Validate only (do not create records)',
+    )
+
+
 class RecordTagNoteForm(BaseForm):
     comment = TextAreaField(
         label='Note',
@@ -220,6 +331,29 @@ class RecordTagEmbargoForm(BaseForm):
             raise ValidationError('The end date cannot be earlier than the start date.')
 
 
+class ResourcePickerForm(BaseForm):
+    resource_provider_id = SelectField(
+        label='Provider',
+    )
+    filename = StringField(
+        label='File name',
+    )
+    mimetype = StringField(
+        label='MIME type',
+    )
+    min_size = IntegerField(
+        label='Min size (bytes)',
+        validators=[optional()],
+    )
+    max_size = IntegerField(
+        label='Max size (bytes)',
+        validators=[optional()],
+    )
+    include_packaged = BooleanField(
+        label='Include packaged resources',
+    )
+
+
 class RoleForm(BaseForm):
     id = StringField(
         label='Role id',
@@ -229,11 +363,17 @@ class RoleForm(BaseForm):
     collection_specific = BooleanField(
         label='Collection-specific',
     )
-    collection_ids = MultiCheckboxField(
-        label='Collections',
+    add_collection_ids = MultiCheckboxField(
+        label='Add collections',
     )
-    scope_ids = MultiCheckboxField(
-        label='Scope',
+    remove_collection_ids = MultiCheckboxField(
+        label='Remove collections',
+    )
+    add_scope_ids = MultiCheckboxField(
+        label='Add scopes',
+    )
+    remove_scope_ids = MultiCheckboxField(
+        label='Remove scopes',
     )
 
 
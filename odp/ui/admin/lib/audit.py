@@ -0,0 +1,111 @@
+from datetime import date
+from math import ceil
+
+from flask import abort, request
+
+from odp.ui.base import api
+
+AUDIT_SORT = 'timestamp desc'
+"""Most recent first, so that time range scans can stop early. Scans
+check that the API has applied this order."""
+
+AUDIT_PAGE_SIZES = (25, 50, 100, 250)
+
+RECENT_AUDIT_SIZE = 10
+"""Number of audit entries shown on object detail pages."""
+
+SCAN_PAGE_SIZE = 250
+"""API page size used when scanning an audit log for filtered results."""
+
+MAX_SCAN_PAGES = 20
+"""Maximum number of API pages scanned for a filtered audit log page."""
+
+
+def recent_request(path: str) -> tuple[str, dict]:
+    """Return a (path, params) request for the most recent audit entries,
+    for use with ``fanout.get``."""
+    return path, dict(page=1, size=RECENT_AUDIT_SIZE, sort=AUDIT_SORT)
+
+
+def recent(result: dict) -> dict:
+    """Convert the result of a ``recent_request`` to a single page of
+    audit entries, so that tables do not render pagination links; the
+    total number of entries is retained for the link to the full log."""
+    return dict(items=result['items'], total=result['total'], page=1, pages=1)
+
+
+def get_page(path: str, entity_table: str) -> tuple[dict, str]:
+    """Get a page of audit entries, as selected by the request's
+    ``page``, ``size``, ``type`` ('entity' or 'tag'), ``since`` and
+    ``until`` query params.
+
+    Returns the page and the UI filter string for pagination links.
+    Unfiltered requests cost a single API call. Filtered requests walk
+    the audit log from most recent, retaining only the entries on the
+    requested page, for at most ``MAX_SCAN_PAGES`` API pages; if the scan
+    stops short of the end of the log (or of the ``since`` date), the
+    page's ``truncated`` flag is set, and its ``total`` counts only the
+    entries scanned.
+    """
+    page = request.args.get('page', 1, type=int)
+    size = request.args.get('size', AUDIT_PAGE_SIZES[1], type=int)
+    if size not in AUDIT_PAGE_SIZES:
+        size = AUDIT_PAGE_SIZES[1]
+    audit_type = request.args.get('type')
+    since = request.args.get('since', type=date.fromisoformat)
+    until = request.args.get('until', type=date.fromisoformat)
+
+    ui_filter = f'&size={size}'
+    if audit_type:
+        ui_filter += f'&type={audit_type}'
+    if since:
+        ui_filter += f'&since={since.isoformat()}'
+    if until:
+        ui_filter += f'&until={until.isoformat()}'
+
+    if not (audit_type or since or until):
+        return api.get(path, page=page, size=size, sort=AUDIT_SORT), ui_filter
+
+    start = (page - 1) * size
+    items = []
+    total = 0
+    truncated = False
+    last_timestamp = None
+    api_page = 1
+    while True:
+        result = api.get(path, page=api_page, size=SCAN_PAGE_SIZE, sort=AUDIT_SORT)
+        for audit_record in result['items']:
+            # the since check stops the scan, which is only valid if
+            # the API returns the log most recent first
+            if last_timestamp is not None and audit_record['timestamp'] > last_timestamp:
+                abort(502, 'Audit log is not sorted by timestamp')
+            last_timestamp = audit_record['timestamp']
+
+            audit_date = date.fromisoformat(audit_record['timestamp'][:10])
+            if since and audit_date < since:
+                break
+            if until and audit_date > until:
+                continue
+            if audit_type == 'entity' and audit_record['table'] != entity_table:
+                continue
+            if audit_type == 'tag' and audit_record['table'] == entity_table:
+                continue
+
+            if start <= total < start + size:
+                items += [audit_record]
+            total += 1
+        else:
+            if api_page < result['pages']:
+                if api_page < MAX_SCAN_PAGES:
+                    api_page += 1
+                    continue
+                truncated = True
+        break
+
+    return dict(
+        items=items,
+        total=total,
+        page=page,
+        pages=max(1, ceil(total / size)),
+        truncated=truncated,
+    ), ui_filter
@@ -0,0 +1,210 @@
+import copy
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+from flask import Flask, g
+
+from odp.const import ODPScope
+from odp.ui.admin.lib.hooks import wrap_api
+
+REFERENCE_PATHS = (
+    '/catalog/',
+    '/collection/',
+    '/provider/',
+    '/role/',
+    '/schema/',
+    '/scope/',
+)
+"""API listings of slow-changing reference objects, which may be cached."""
+
+SHARED_PATHS = {
+    '/catalog/': ODPScope.CATALOG_READ,
+    '/role/': ODPScope.ROLE_READ,
+    '/schema/': ODPScope.SCHEMA_READ,
+    '/scope/': ODPScope.SCOPE_READ,
+}
+"""Reference listings that are not filtered by object-level permissions,
+and the scopes required to read them. These are cached once, for all
+users holding the scope, rather than per set of user permissions."""
+
+SHARED = '*'
+"""Permissions key of shared cache entries."""
+
+DEPENDENT_PATHS = {
+    '/collection/': ('/provider/',),
+    '/provider/': ('/collection/',),
+}
+"""Listings that embed objects of another type, and must therefore be
+invalidated when that type is modified: collections embed their
+provider, and providers their collections."""
+
+
+class TTLCache:
+    """Thread-safe, size-bounded LRU cache in which entries expire
+    ``ttl`` seconds after being set.
+
+    If ``maxweight`` is given, the cache is also bounded by the total
+    ``weight(value)`` (e.g. size in bytes) of its entries.
+    """
+
+    def __init__(
+            self,
+            maxsize: int,
+            ttl: float,
+            maxweight: int = None,
+            weight: Callable[[Any], int] = None,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.maxweight = maxweight
+        self._weight = weight or (lambda value: 1)
+        self._entries: OrderedDict[Hashable, tuple[float, Any, int]] = OrderedDict()
+        self._total_weight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def weight(self) -> int:
+        """The total weight of the cached entries."""
+        return self._total_weight
+
+    def get(self, key: Hashable) -> tuple[bool, Any]:
+        """Return (True, value) for a live entry, otherwise (False, None)."""
+        with self._lock:
+            try:
+                expiry, value, _ = self._entries[key]
+            except KeyError:
+                return False, None
+
+            if expiry < time.monotonic():
+                self._remove(key)
+                return False, None
+
+            self._entries.move_to_end(key)
+            return True, value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Cache ``value``, unless its weight alone exceeds ``maxweight``."""
+        weight = self._weight(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if self.maxweight is not None and weight > self.maxweight:
+                return
+
+            self._entries[key] = time.monotonic() + self.ttl, value, weight
+            self._total_weight += weight
+            while len(self._entries) > self.maxsize or (
+                    self.maxweight is not None and self._total_weight > self.maxweight
+            ):
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> None:
+        """Remove all entries whose key satisfies ``predicate``."""
+        with self._lock:
+            for key in [key for key in self._entries if predicate(key)]:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._total_weight = 0
+
+    def _remove(self, key: Hashable) -> None:
+        _, _, weight = self._entries.pop(key)
+        self._total_weight -= weight
+
+
+reference_cache = TTLCache(maxsize=256, ttl=60)
+"""Process-wide cache of reference listings, keyed by
+(permissions hash, or SHARED, path, params)."""
+
+
+def init_app(app: Flask):
+    """Cache reference listings for ``REFERENCE_CACHE_TTL`` seconds.
+
+    Writes made via this app invalidate affected listings in the process
+    that made them only; under gunicorn, other workers may serve a
+    listing that predates the write until their entry expires, hence
+    the short default TTL. Cached results are copied on the way out,
+    so callers may modify them.
+    """
+    app.config.setdefault('REFERENCE_CACHE_SIZE', 256)
+    app.config.setdefault('REFERENCE_CACHE_TTL', 60)
+    reference_cache.maxsize = app.config['REFERENCE_CACHE_SIZE']
+    reference_cache.ttl = app.config['REFERENCE_CACHE_TTL']
+
+    wrap_api('cache', 'get', _cached_get)
+    for method in ('post', 'put', 'delete'):
+        wrap_api('cache', method, _invalidating_write)
+
+
+def invalidate(path: str) -> None:
+    """Invalidate cached reference listings affected by a write to ``path``."""
+    if not (root := _root_path(path)):
+        return
+
+    roots = (root,) + DEPENDENT_PATHS.get(root, ())
+    reference_cache.invalidate(lambda key: key[1] in roots)
+
+
+def permissions_key() -> str | None:
+    """Return a digest of the current user's permissions, or None
+    outside of an ``api.view``, in which case we do not cache."""
+    if (permissions := g.get('user_permissions')) is None:
+        return None
+
+    if isinstance(permissions, dict):
+        permissions = {
+            str(scope_id): sorted(object_ids) if isinstance(object_ids, (list, set, tuple)) else object_ids
+            for scope_id, object_ids in permissions.items()
+        }
+    else:
+        permissions = sorted(str(scope_id) for scope_id in permissions)
+
+    return hashlib.sha256(json.dumps(permissions, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def warm(path: str, params: dict, result: Any) -> None:
+    """Cache a shared reference listing fetched other than by a user,
+    e.g. on startup."""
+    reference_cache.set(_key(SHARED, path, params), result)
+
+
+def _key(perms: str, path: str, params: dict) -> tuple:
+    return perms, path, tuple(sorted((k, str(v)) for k, v in params.items()))
+
+
+def _cached_get(func, path, **params):
+    if path not in REFERENCE_PATHS or 'page' in params or not (perms := permissions_key()):
+        return func(path, **params)
+
+    if path in SHARED_PATHS:
+        # users lacking the scope get the API's response
+        if SHARED_PATHS[path] not in g.user_permissions:
+            return func(path, **params)
+        perms = SHARED
+
+    key = _key(perms, path, params)
+    hit, result = reference_cache.get(key)
+    if hit:
+        return copy.deepcopy(result)
+
+    result = func(path, **params)
+    reference_cache.set(key, copy.deepcopy(result))
+    return result
+
+
+def _invalidating_write(func, path, *args, **kwargs):
+    try:
+        return func(path, *args, **kwargs)
+    finally:
+        invalidate(path)
+
+
+def _root_path(path: str) -> str | None:
+    if segment := path.strip('/').split('/', 1)[0].split('?', 1)[0]:
+        return f'/{segment}/'
@@ -0,0 +1,44 @@
+from typing import Any, Iterator
+
+from odp.ui.base import api
+
+PAGE_SIZE = 200
+"""API page size used when walking the record list."""
+
+
+class OrderError(Exception):
+    """Raised if the API does not return records in timestamp
+    descending order, so that a walk cannot tell where to stop."""
+
+
+def iter_modified_records(since: str | None, client: Any = api) -> Iterator[list[dict]]:
+    """Lazily walk the record list from most recently modified, using
+    ``client`` (by default, the current user's API client), yielding
+    pages of records with a timestamp at or after ``since`` (all records
+    if None).
+
+    Records with a timestamp equal to ``since`` are included, so that a
+    walk from the latest timestamp seen by a previous walk misses none;
+    consumers should therefore apply records idempotently. Records
+    modified while the walk is in progress may be missed, but will have
+    a later timestamp than any seen, so are found by the next walk.
+
+    The walk relies on the API applying ``sort``; ``OrderError`` is
+    raised if a record is found to be newer than its predecessor.
+    """
+    page = 1
+    previous = None
+    while True:
+        result = client.get('/record/', page=page, size=PAGE_SIZE, sort='timestamp desc')
+        for record in result['items']:
+            if previous is not None and record['timestamp'] > previous:
+                raise OrderError(f'Record list is not in timestamp descending order (page {page})')
+            previous = record['timestamp']
+
+        records = [record for record in result['items'] if not since or record['timestamp'] >= since]
+        if records:
+            yield records
+
+        if len(records) < len(result['items']) or page >= result['pages']:
+            break
+        page += 1
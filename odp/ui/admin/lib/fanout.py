@@ -0,0 +1,132 @@
+import contextvars
+import logging
+import os
+import time
+from concurrent.futures import FIRST_EXCEPTION, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable
+
+from odp.ui.base import api
+
+logger = logging.getLogger(__name__)
+
+MAX_WORKERS = 8
+
+TIMEOUT = 180
+"""Seconds to wait for a fan-out's calls to complete. This is a backstop:
+API calls are normally bounded by the transport's connect and read
+timeouts (and retries)."""
+
+
+class Pool:
+    """Thread pool for concurrent API calls.
+
+    Page requests and background work (jobs, index and mirror syncs,
+    storage scans, cache warm-up) fan out on separate pools, so that
+    slow background calls cannot starve page requests of threads.
+    """
+
+    def __init__(self, name: str, max_workers: int = MAX_WORKERS):
+        self.name = name
+        self.max_workers = max_workers
+        self.restart()
+
+    def restart(self) -> None:
+        """Replace the pool's executor. A forked process (e.g. a gunicorn
+        worker with ``preload_app``) must do this before using the pool:
+        it inherits the executor but not its threads, so that calls
+        submitted to it might never run."""
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+
+    def shutdown(self) -> None:
+        """Release the pool's threads once any running calls complete,
+        without waiting for them; pending calls are cancelled."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def get(self, *requests: str | tuple[str, dict], client: Any = api) -> tuple[Any, ...]:
+        """Dispatch independent GET requests concurrently, using ``client``
+        (by default, the current user's API client), and return their
+        results in the order in which they were requested.
+
+        Each request is either a path, or a (path, params) tuple. If any
+        request fails, pending requests are cancelled and the exception
+        (typically an ``ODPAPIError``) of the first failed request, in
+        argument order, is re-raised, so that it is handled by ``api.view``
+        exactly as if the requests had been made serially.
+        """
+        calls = []
+        for req in requests:
+            path, params = (req, {}) if isinstance(req, str) else req
+            calls.append((f'GET {path}', client.get, (path,), params))
+
+        return self.run(*calls)
+
+    def run(self, *calls: tuple[str, Callable, tuple, dict], timeout: float = TIMEOUT) -> tuple[Any, ...]:
+        """Run (label, func, args, kwargs) calls concurrently within the
+        caller's context, and return their results in argument order.
+
+        Raise ``TimeoutError`` if the calls have not all completed within
+        ``timeout`` seconds; calls that have not started are cancelled.
+        """
+        futures: list[Future] = [
+            self.submit(label, func, *args, **kwargs)
+            for label, func, args, kwargs in calls
+        ]
+        done, not_done = wait(futures, timeout=timeout, return_when=FIRST_EXCEPTION)
+        for future in not_done:
+            future.cancel()
+
+        if any(future.exception() for future in done):
+            # wait for any calls that are already running, so that they
+            # do not outlive the request context, and so that the first
+            # failure in argument order is known
+            done, not_done = wait(not_done, timeout=timeout)
+            for future in futures:
+                if future.done() and not future.cancelled() and future.exception():
+                    raise future.exception()
+
+        if not_done:
+            raise TimeoutError(f'{len(not_done)} of {len(futures)} calls on {self.name} '
+                               f'did not complete within {timeout}s')
+
+        return tuple(future.result() for future in futures)
+
+    def submit(self, label: str, func: Callable, *args, **kwargs) -> Future:
+        """Submit a call to the pool, to be run in a copy of the caller's
+        context (Flask's ``g``, ``request`` and ``current_user`` are
+        context-local)."""
+        context = contextvars.copy_context()
+        return self._executor.submit(context.run, _timed, label, func, *args, **kwargs)
+
+
+pages = Pool('odp-admin-fanout')
+"""Pool for API calls made while handling page requests."""
+
+background = Pool('odp-admin-background')
+"""Pool for API calls made by background work."""
+
+os.register_at_fork(after_in_child=pages.restart)
+os.register_at_fork(after_in_child=background.restart)
+
+
+def get(*requests: str | tuple[str, dict]) -> tuple[Any, ...]:
+    """Dispatch independent API GET requests concurrently on behalf of
+    the current user; see ``Pool.get``."""
+    return pages.get(*requests)
+
+
+def run(*calls: tuple[str, Callable, tuple, dict], timeout: float = TIMEOUT) -> tuple[Any, ...]:
+    """Run calls concurrently on the page request pool; see ``Pool.run``."""
+    return pages.run(*calls, timeout=timeout)
+
+
+def submit(label: str, func: Callable, *args, **kwargs) -> Future:
+    """Submit a call to the page request pool; see ``Pool.submit``."""
+    return pages.submit(label, func, *args, **kwargs)
+
+
+def _timed(label: str, func: Callable, *args, **kwargs) -> Any:
+    start = time.perf_counter()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        logger.debug('%s: %.1f ms', label, (time.perf_counter() - start) * 1000)
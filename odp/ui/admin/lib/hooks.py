@@ -0,0 +1,92 @@
+from functools import partial, wraps
+from typing import Any, Callable
+
+from odp.ui.base import api
+
+LAYERS = (
+    'mirror',
+    'search',
+    'memo',
+    'cache',
+    'metrics',
+)
+"""API call wrapper layers, outermost first.
+
+- ``mirror`` and ``search`` observe record writes once they have
+  succeeded, to update the local record mirror and search index.
+- ``memo`` serves repeated GETs within a request; a memo hit involves
+  no further layer.
+- ``cache`` serves reference listings shared across requests.
+- ``metrics`` is innermost, so that only calls that actually reach the
+  API are counted and timed.
+"""
+
+_wrappers: dict[str, dict[str, Callable[..., Any]]] = {}
+"""Registered wrappers, by layer and method."""
+
+_originals: dict[str, Callable[..., Any]] = {}
+"""The unwrapped ``odp.ui.base.api`` functions, by method."""
+
+
+def wrap_api(layer: str, method: str, wrapper: Callable[..., Any]) -> None:
+    """Route calls to ``odp.ui.base.api.<method>`` through
+    ``wrapper(func, path, *args, **kwargs)``, where ``func`` calls the
+    next layer inward, in the order given by ``LAYERS`` -- regardless of
+    the order in which wrappers are registered.
+
+    The ``api`` module attributes are replaced (once per process), so
+    that calls made by admin views and by ``odp.ui.base`` helpers (e.g.
+    ``utils.populate_*_choices``) alike pass through the wrappers.
+    Registering a wrapper again for the same layer and method replaces
+    the previous one.
+    """
+    if layer not in LAYERS:
+        raise ValueError(f'Unknown API wrapper layer: {layer}')
+
+    _wrappers.setdefault(layer, {})[method] = wrapper
+    if method not in _originals:
+        _originals[method] = func = getattr(api, method)
+
+        @wraps(func)
+        def wrapped(path, *args, **kwargs):
+            return call(func, method, path, *args, **kwargs)
+
+        setattr(api, method, wrapped)
+
+
+def call(func: Callable[..., Any], method: str, path: str, *args, **kwargs) -> Any:
+    """Call ``func(path, *args, **kwargs)`` through the wrappers
+    registered for ``method``."""
+    for layer in reversed(LAYERS):
+        if wrapper := _wrappers.get(layer, {}).get(method):
+            func = partial(wrapper, func)
+
+    return func(path, *args, **kwargs)
+
+
+class BoundClient:
+    """An API client whose calls pass through the registered wrappers,
+    exactly as calls made via ``odp.ui.base.api`` do, so that e.g. writes
+    made by background work invalidate cached listings and update the
+    record mirror and search index."""
+
+    def __init__(self, client: Any):
+        self.client = client
+
+    def get(self, path: str, **params) -> Any:
+        return call(self.client.get, 'get', path, **params)
+
+    def post(self, path: str, data: Any, **params) -> Any:
+        return call(self.client.post, 'post', path, data, **params)
+
+    def put(self, path: str, data: Any, **params) -> Any:
+        return call(self.client.put, 'put', path, data, **params)
+
+    def delete(self, path: str, **params) -> Any:
+        return call(self.client.delete, 'delete', path, **params)
+
+
+def bind(client: Any) -> BoundClient:
+    """Return a wrapper around ``client`` (e.g. an ``ODPClient``) that
+    routes its calls through the registered API wrappers."""
+    return BoundClient(client)
@@ -0,0 +1,340 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Iterable
+
+from flask import Flask, current_app, g
+from flask_login import current_user
+
+from odp.const import ODPScope
+from odp.lib.client import ODPAPIError
+from odp.ui.admin.lib import hooks, service
+
+logger = logging.getLogger(__name__)
+
+MAX_RUNNING_JOBS = 2
+"""Number of jobs run at a time per process; further jobs are queued."""
+
+MAX_JOB_WORKERS = 8
+"""Maximum number of concurrent API calls made by a single job."""
+
+MAX_RETAINED_JOBS = 100
+"""Number of finished jobs kept for status display."""
+
+MAX_REPORTED_FAILURES = 1000
+"""Number of per-item failures kept per job."""
+
+MAX_REPORTED_RESULTS = 1000
+"""Number of per-item results kept per job."""
+
+MAX_RETRIES = 3
+"""Number of times an item of a retrying job is retried after a transient API error."""
+
+RETRY_BACKOFF = 0.5
+"""Delay in seconds before the first retry; doubled for each subsequent retry."""
+
+TRANSIENT_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+class JobItemError(Exception):
+    """Raised by a job function to fail an item with a message,
+    e.g. on validation failure."""
+
+
+@dataclass(frozen=True)
+class Grant:
+    """The authority under which a job runs: the app's service client,
+    with which it makes API calls, and a snapshot of the submitting
+    user's permissions, against which it must authorize each item.
+
+    The API sees, and audits, the service client rather than the user;
+    job functions are therefore responsible for checking that the user
+    may make each change, typically using the object's collection.
+    """
+    client: hooks.BoundClient
+    permissions: dict[str, str | list[str]]
+
+    def permits(self, scope: ODPScope, object_id: str = None) -> bool:
+        """Return whether the user has ``scope``, for ``object_id`` if given."""
+        if (object_ids := self.permissions.get(scope)) is None:
+            return False
+        return object_ids == '*' or object_id is None or object_id in object_ids
+
+    def authorize(self, scope: ODPScope, object_id: str = None) -> None:
+        """Raise JobItemError unless the user has ``scope``, for ``object_id`` if given."""
+        if not self.permits(scope, object_id):
+            raise JobItemError(f'You do not have {scope.value} permission for {object_id}.' if object_id
+                               else f'You do not have {scope.value} permission.')
+
+
+@dataclass
+class Job:
+    id: str
+    title: str
+    user_id: str
+    status: str = 'queued'
+    total: int | None = None
+    succeeded: int = 0
+    failed: int = 0
+    retried: int = 0
+    failures: list[tuple[str, str]] = field(default_factory=list)
+    results: list[tuple[str, str]] = field(default_factory=list)
+    error: str | None = None
+    created: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    started: datetime | None = None
+    finished: datetime | None = None
+    _cancel: threading.Event = field(default_factory=threading.Event, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def processed(self) -> int:
+        return self.succeeded + self.failed
+
+    @property
+    def done(self) -> bool:
+        return self.status in ('completed', 'failed', 'cancelled')
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def cancel(self) -> None:
+        """Request cancellation. Items already in flight are completed,
+        but no further items are started."""
+        self._cancel.set()
+
+    def to_dict(self) -> dict[str, Any]:
+        return dict(
+            id=self.id,
+            title=self.title,
+            status=self.status,
+            total=self.total,
+            processed=self.processed,
+            succeeded=self.succeeded,
+            failed=self.failed,
+            retried=self.retried,
+            failures=self.failures,
+            results=self.results,
+            error=self.error,
+            created=self.created.isoformat(),
+            started=self.started.isoformat() if self.started else None,
+            finished=self.finished.isoformat() if self.finished else None,
+        )
+
+    def _record(self, label: str, error: str | None, result: Any = None) -> None:
+        with self._lock:
+            if error is None:
+                self.succeeded += 1
+                if result is not None and len(self.results) < MAX_REPORTED_RESULTS:
+                    self.results += [(label, str(result))]
+            else:
+                self.failed += 1
+                if len(self.failures) < MAX_REPORTED_FAILURES:
+                    self.failures += [(label, error)]
+
+    def _record_retry(self) -> None:
+        with self._lock:
+            self.retried += 1
+
+
+_jobs: OrderedDict[str, Job] = OrderedDict()
+_jobs_lock = threading.Lock()
+_runner: ThreadPoolExecutor | None = None
+
+
+def init_app(app: Flask):
+    """Start the process's job runner.
+
+    Jobs, and their progress, are held in memory by the process that
+    runs them, and are not shared between processes. Job pages and
+    progress polls must therefore be served by the process that ran the
+    job: under gunicorn, the admin app must run with a single worker
+    (``--workers 1``, with ``--threads`` for concurrency).
+    """
+    global _runner
+    app.config.setdefault('JOB_RUNNERS', MAX_RUNNING_JOBS)
+    if _runner is None:
+        _runner = ThreadPoolExecutor(max_workers=app.config['JOB_RUNNERS'], thread_name_prefix='odp-admin-job')
+        os.register_at_fork(after_in_child=_reset)
+
+
+def grant() -> Grant | None:
+    """Return a grant for a job to be submitted by the current user,
+    or None if the app has no service client, in which case jobs are
+    unavailable."""
+    if not (client := service.client()):
+        return None
+
+    return Grant(client, {
+        scope: object_ids if object_ids == '*' else list(object_ids)
+        for scope, object_ids in g.user_permissions.items()
+    })
+
+
+def submit(
+        title: str,
+        items: Iterable,
+        func: Callable[[Any], Any],
+        *,
+        label: Callable[[Any], str] = str,
+        total: int = None,
+        retry: bool = False,
+        cleanup: Callable[[], None] = None,
+) -> Job:
+    """Queue a job that calls ``func(item)`` for each of ``items``, with
+    up to ``MAX_JOB_WORKERS`` calls in flight at a time, and return it
+    immediately.
+
+    ``items`` may be a lazy iterable (e.g. a generator that pages through
+    an API listing); it is consumed in the job's thread. ``items`` and
+    each call of ``func`` run in an app context of their own, outside
+    of any request, so they must make API calls with the client of a
+    ``Grant`` obtained on submission, and authorize each item against it.
+
+    If ``retry``, an item that fails with a transient API error is
+    retried with exponential backoff. Only jobs that may safely repeat
+    ``func`` for an item should set it: a request that failed with such
+    an error may nevertheless have taken effect, so e.g. a POST that
+    creates an object may create it twice. An item that fails is
+    recorded against the job, and does not stop it. A non-None return
+    value from ``func`` is recorded as the item's result.
+
+    ``cleanup``, if given, is called once the job has finished, however
+    it finishes -- including if it is cancelled before it starts -- and
+    after ``items`` (if a generator) has been closed; e.g. to remove a
+    file from which items are read.
+    """
+    job = Job(
+        id=uuid.uuid4().hex,
+        title=title,
+        user_id=current_user.id,
+        total=total,
+    )
+    with _jobs_lock:
+        _jobs[job.id] = job
+        _prune()
+
+    _runner.submit(_run, current_app._get_current_object(), job, items, func, label, retry, cleanup)
+
+    return job
+
+
+def get(job_id: str) -> Job | None:
+    """Get a job belonging to the current user."""
+    if (job := _jobs.get(job_id)) and job.user_id == current_user.id:
+        return job
+
+
+def list_jobs() -> list[Job]:
+    """List the current user's jobs, most recent first."""
+    with _jobs_lock:
+        return [job for job in reversed(_jobs.values()) if job.user_id == current_user.id]
+
+
+def _run(
+        app: Flask,
+        job: Job,
+        items: Iterable,
+        func: Callable,
+        label: Callable,
+        retry: bool,
+        cleanup: Callable | None,
+) -> None:
+    try:
+        _run_items(app, job, items, func, label, retry)
+    finally:
+        if close := getattr(items, 'close', None):
+            close()
+        if cleanup:
+            try:
+                cleanup()
+            except Exception:
+                logger.exception('Job %s cleanup failed', job.id)
+
+
+def _run_items(app: Flask, job: Job, items: Iterable, func: Callable, label: Callable, retry: bool) -> None:
+    if job.cancelled:
+        job.status = 'cancelled'
+        job.finished = datetime.now(timezone.utc)
+        return
+
+    job.status = 'running'
+    job.started = datetime.now(timezone.utc)
+    slots = threading.BoundedSemaphore(MAX_JOB_WORKERS)
+    count = 0
+
+    def run_item(item):
+        try:
+            with app.app_context():
+                result = _call(job, func, item) if retry else func(item)
+            job._record(label(item), None, result)
+        except ODPAPIError as e:
+            job._record(label(item), f'{e.status_code}: {e.error_detail}')
+        except JobItemError as e:
+            job._record(label(item), str(e))
+        except Exception as e:
+            logger.exception('Job %s item %s failed', job.id, label(item))
+            job._record(label(item), repr(e))
+        finally:
+            slots.release()
+
+    try:
+        with app.app_context(), \
+                ThreadPoolExecutor(max_workers=MAX_JOB_WORKERS, thread_name_prefix=f'odp-admin-job-{job.id}') as executor:
+            for item in items:
+                slots.acquire()
+                if job.cancelled:
+                    slots.release()
+                    break
+                executor.submit(run_item, item)
+                count += 1
+
+        if job.cancelled:
+            job.status = 'cancelled'
+        else:
+            job.total = count
+            job.status = 'completed'
+
+    except Exception as e:
+        # failure to enumerate items, e.g. an API error while paging
+        logger.exception('Job %s failed', job.id)
+        job.error = f'{e.status_code}: {e.error_detail}' if isinstance(e, ODPAPIError) else repr(e)
+        job.status = 'failed'
+
+    finally:
+        job.finished = datetime.now(timezone.utc)
+
+
+def _call(job: Job, func: Callable, item: Any) -> Any:
+    delay = RETRY_BACKOFF
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            return func(item)
+        except ODPAPIError as e:
+            if e.status_code not in TRANSIENT_STATUS_CODES or attempt == MAX_RETRIES or job.cancelled:
+                raise
+
+        job._record_retry()
+        time.sleep(delay)
+        delay *= 2
+
+
+def _prune() -> None:
+    finished = [job_id for job_id, job in _jobs.items() if job.done]
+    for job_id in finished[:max(0, len(finished) - MAX_RETAINED_JOBS)]:
+        del _jobs[job_id]
+
+
+def _reset() -> None:
+    # a forked process (e.g. a gunicorn worker with preload_app) inherits
+    # the runner but not its threads, nor any of its parent's jobs
+    global _runner, _jobs_lock
+    _runner = ThreadPoolExecutor(max_workers=_runner._max_workers, thread_name_prefix='odp-admin-job')
+    _jobs_lock = threading.Lock()
+    _jobs.clear()
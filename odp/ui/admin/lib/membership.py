@@ -0,0 +1,89 @@
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+from flask import request
+from wtforms import Field, Form
+
+CONFIRM = 'confirm'
+"""Name of the submit button on the preview page, which confirms an edit."""
+
+
+@dataclass
+class Delta:
+    """The effective changes to a membership list, as (id, label) pairs."""
+    label: str
+    added: list[tuple[str, str]]
+    removed: list[tuple[str, str]]
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed)
+
+
+def apply(current: Iterable[str], add: Iterable[str] | None, remove: Iterable[str] | None) -> list[str]:
+    """Return the member ids resulting from adding ``add`` to and
+    removing ``remove`` from ``current``, preserving the order of
+    ``current`` followed by that of ``add``.
+
+    Edit forms submit membership changes as such deltas rather than as
+    complete member lists, so that their size is proportional to the
+    edit. ``current`` should be read from the API when the edit is
+    saved, so that concurrent changes to other members are retained.
+    """
+    remove = set(remove or ())
+    result = [id_ for id_ in current if id_ not in remove]
+    present = set(result) | remove
+    for id_ in add or ():
+        if id_ not in present:
+            result += [id_]
+            present.add(id_)
+
+    return result
+
+
+def delta(label: str, current: Iterable[str], add_field: Field, remove_field: Field) -> Delta:
+    """Return the changes that ``apply`` would make to ``current``, given
+    the ids submitted in ``add_field`` and ``remove_field``, labelled as
+    they are in the fields' choices."""
+    current = set(current)
+    remove = set(remove_field.data or ())
+    labels = {
+        choice[0]: choice[1]
+        for field in (add_field, remove_field)
+        for choice in field.choices or ()
+    }
+    return Delta(
+        label=label,
+        added=[
+            (id_, labels.get(id_, id_)) for id_ in dict.fromkeys(add_field.data or ())
+            if id_ not in current and id_ not in remove
+        ],
+        removed=[
+            (id_, labels.get(id_, id_)) for id_ in dict.fromkeys(remove_field.data or ())
+            if id_ in current
+        ],
+    )
+
+
+def field_changes(form: Form, obj: dict[str, Any], *names: str) -> list[tuple[str, Any, Any]]:
+    """Return (label, old value, new value) for each of the named form
+    fields whose data differs from the corresponding ``obj`` value."""
+    return [
+        (form[name].label.text, obj.get(name), form[name].data)
+        for name in names
+        if form[name].data != obj.get(name)
+    ]
+
+
+def split_choices(add_field: Field, remove_field: Field, member_ids: Iterable[str]) -> None:
+    """Divide the choices populated for ``add_field`` between it and
+    ``remove_field``: non-members may be added, and members removed."""
+    member_ids = set(member_ids)
+    choices = add_field.choices or []
+    add_field.choices = [choice for choice in choices if choice[0] not in member_ids]
+    remove_field.choices = [choice for choice in choices if choice[0] in member_ids]
+
+
+def confirmed() -> bool:
+    """Return whether the submitted edit was confirmed on its preview page;
+    if not, the view should render ``membership_preview.html``."""
+    return CONFIRM in request.form
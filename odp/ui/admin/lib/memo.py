@@ -0,0 +1,78 @@
+import copy
+import logging
+import threading
+
+from flask import Flask, Response, current_app, g, has_request_context, request
+
+from odp.ui.admin.lib.hooks import wrap_api
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+
+
+def init_app(app: Flask):
+    """Memoize API GETs per request, so that identical GETs made while
+    handling a request (e.g. by a view and by a ``populate_*_choices``
+    helper, or on both passes of a GET/POST view) cost a single API call.
+
+    Memoization stops for the rest of the request after any write, and
+    once a streamed response starts, so that e.g. the pages fetched by
+    an export are not retained until it ends. It is off outside of
+    request handling, e.g. in jobs. Memoized results are copied on the
+    way in and out, so callers may modify them.
+    """
+    app.before_request(_start)
+    app.after_request(_report)
+    app.teardown_request(_stop)
+
+    wrap_api('memo', 'get', _memo_get)
+    for method in ('post', 'put', 'delete'):
+        wrap_api('memo', method, _memo_write)
+
+
+def _start() -> None:
+    g.api_memo = {}
+    g.api_memo_hits = 0
+    g.api_memo_misses = 0
+
+
+def _report(response: Response) -> Response:
+    if response.is_streamed:
+        g.pop('api_memo', None)
+
+    if current_app.debug and 'api_memo_hits' in g:
+        logger.debug('%s %s: API memo hits=%d misses=%d', request.method, request.path, g.api_memo_hits, g.api_memo_misses)
+        response.headers['X-API-Memo'] = f'hits={g.api_memo_hits}, misses={g.api_memo_misses}'
+    return response
+
+
+def _stop(exc) -> None:
+    g.pop('api_memo', None)
+
+
+def _memo_get(func, path, **params):
+    if not has_request_context() or (memo := g.get('api_memo')) is None:
+        return func(path, **params)
+
+    key = path, tuple(sorted((k, str(v)) for k, v in params.items()))
+    with _lock:
+        if key in memo:
+            g.api_memo_hits += 1
+            return copy.deepcopy(memo[key])
+
+    result = func(path, **params)
+    with _lock:
+        g.api_memo_misses += 1
+        if g.get('api_memo') is memo:
+            memo[key] = copy.deepcopy(result)
+
+    return result
+
+
+def _memo_write(func, path, *args, **kwargs):
+    if has_request_context() and 'api_memo' in g:
+        # bypass the memo for the remainder of the request
+        g.pop('api_memo', None)
+
+    return func(path, *args, **kwargs)
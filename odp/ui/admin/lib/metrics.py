@@ -0,0 +1,171 @@
+import hmac
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from flask import Flask, Response, abort, current_app, g, has_request_context, request
+from flask.signals import before_render_template, template_rendered
+
+from odp.ui.admin.lib import templating, transport
+from odp.ui.admin.lib.hooks import wrap_api
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+"""Upper bounds, in seconds, of request duration histogram buckets."""
+
+_lock = threading.Lock()
+
+
+class EndpointMetrics:
+    def __init__(self):
+        self.requests = 0
+        self.duration = 0.0
+        self.buckets = [0] * len(DURATION_BUCKETS)
+        self.api_calls = 0
+        self.api_duration = 0.0
+        self.render_duration = 0.0
+        self.response_bytes = 0
+
+
+_endpoints: defaultdict[str, EndpointMetrics] = defaultdict(EndpointMetrics)
+
+
+def init_app(app: Flask):
+    """Record, per endpoint, wall time, number and duration of API calls,
+    template render time and response size, and expose these per
+    response in a ``Server-Timing`` header and, if ``METRICS_ENABLED``,
+    on ``/metrics`` in Prometheus text format.
+
+    ``/metrics`` is off by default. It requires the bearer token
+    configured as ``METRICS_TOKEN`` (e.g. a Prometheus scrape config's
+    ``authorization.credentials``), and is not served without one.
+
+    Metrics are per process; under gunicorn, each worker reports its own.
+    API calls are timed innermost of the API wrappers (see ``hooks.LAYERS``),
+    so that only calls that reach the API are counted. API time is the sum of call
+    durations, which exceeds wall time for concurrent (fan-out) calls.
+    """
+    app.config.setdefault('METRICS_ENABLED', False)
+    app.config.setdefault('METRICS_TOKEN', None)
+
+    app.before_request(_start)
+    app.after_request(_finish)
+    before_render_template.connect(_start_render, app)
+    template_rendered.connect(_finish_render, app)
+
+    for method in ('get', 'post', 'put', 'delete'):
+        wrap_api('metrics', method, _timed_api_call)
+
+    if app.config['METRICS_ENABLED']:
+        if app.config['METRICS_TOKEN']:
+            app.add_url_rule('/metrics', 'metrics', _metrics)
+        else:
+            logger.warning('METRICS_ENABLED is set without METRICS_TOKEN; /metrics is not served')
+
+
+def _start() -> None:
+    g.metrics_start = time.perf_counter()
+    g.metrics_api_calls = 0
+    g.metrics_api_duration = 0.0
+    g.metrics_render_duration = 0.0
+
+
+def _timed_api_call(func, path, *args, **kwargs):
+    if not has_request_context() or 'metrics_start' not in g:
+        return func(path, *args, **kwargs)
+
+    start = time.perf_counter()
+    try:
+        return func(path, *args, **kwargs)
+    finally:
+        with _lock:
+            g.metrics_api_calls += 1
+            g.metrics_api_duration += time.perf_counter() - start
+
+
+def _start_render(sender, template, context, **extra) -> None:
+    g.metrics_render_start = time.perf_counter()
+
+
+def _finish_render(sender, template, context, **extra) -> None:
+    if (start := g.pop('metrics_render_start', None)) is not None:
+        g.metrics_render_duration += time.perf_counter() - start
+
+
+def _finish(response: Response) -> Response:
+    if 'metrics_start' not in g:
+        return response
+
+    duration = time.perf_counter() - g.metrics_start
+    response_bytes = 0 if response.is_streamed else response.calculate_content_length() or 0
+
+    with _lock:
+        metrics = _endpoints[request.endpoint or 'unknown']
+        metrics.requests += 1
+        metrics.duration += duration
+        for i, bound in enumerate(DURATION_BUCKETS):
+            if duration <= bound:
+                metrics.buckets[i] += 1
+        metrics.api_calls += g.metrics_api_calls
+        metrics.api_duration += g.metrics_api_duration
+        metrics.render_duration += g.metrics_render_duration
+        metrics.response_bytes += response_bytes
+
+    response.headers.add(
+        'Server-Timing',
+        f'app;dur={duration * 1000:.1f}, '
+        f'api;dur={g.metrics_api_duration * 1000:.1f};desc="{g.metrics_api_calls} API calls", '
+        f'render;dur={g.metrics_render_duration * 1000:.1f}',
+    )
+    return response
+
+
+def _metrics():
+    scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+    if scheme.lower() != 'bearer' or not hmac.compare_digest(token.encode(), current_app.config['METRICS_TOKEN'].encode()):
+        abort(401)
+
+    lines = [
+        '# HELP odp_admin_request_duration_seconds Request wall time.',
+        '# TYPE odp_admin_request_duration_seconds histogram',
+    ]
+    with _lock:
+        endpoints = sorted(_endpoints.items())
+        for endpoint, m in endpoints:
+            for bound, count in zip(DURATION_BUCKETS, m.buckets):
+                lines += [f'odp_admin_request_duration_seconds_bucket{{endpoint="{endpoint}",le="{bound}"}} {count}']
+            lines += [
+                f'odp_admin_request_duration_seconds_bucket{{endpoint="{endpoint}",le="+Inf"}} {m.requests}',
+                f'odp_admin_request_duration_seconds_sum{{endpoint="{endpoint}"}} {m.duration:.6f}',
+                f'odp_admin_request_duration_seconds_count{{endpoint="{endpoint}"}} {m.requests}',
+            ]
+
+        for name, attr, help_ in (
+                ('odp_admin_api_calls_total', 'api_calls', 'API calls made while handling requests.'),
+                ('odp_admin_api_duration_seconds_total', 'api_duration', 'Time spent in API calls.'),
+                ('odp_admin_render_duration_seconds_total', 'render_duration', 'Time spent rendering templates.'),
+                ('odp_admin_response_bytes_total', 'response_bytes', 'Response body bytes (excluding streamed responses).'),
+        ):
+            lines += [f'# HELP {name} {help_}', f'# TYPE {name} counter']
+            lines += [f'{name}{{endpoint="{endpoint}"}} {getattr(m, attr)}' for endpoint, m in endpoints]
+
+    if render_profile := templating.profile():
+        for name, index, help_ in (
+                ('odp_admin_render_profile_calls_total', 0, 'Template renders and macro calls.'),
+                ('odp_admin_render_profile_seconds_total', 1, 'Render time, including nested macro calls.'),
+                ('odp_admin_render_profile_self_seconds_total', 2, 'Render time, excluding nested macro calls.'),
+        ):
+            lines += [f'# HELP {name} {help_}', f'# TYPE {name} counter']
+            lines += [
+                f'{name}{{kind="{kind}",name="{template}"}} {values[index]}'
+                for (kind, template), values in sorted(render_profile.items())
+            ]
+
+    for key, value in transport.stats().items():
+        name = f'odp_admin_api_transport_{key}'
+        lines += [f'# TYPE {name} {"gauge" if key in ("pool_size", "in_flight", "peak_in_flight") else "counter"}']
+        lines += [f'{name} {value}']
+
+    return Response('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4')
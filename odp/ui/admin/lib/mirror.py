@@ -0,0 +1,414 @@
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from datetime import datetime, timezone
+from math import ceil
+from typing import Any, Iterator
+
+from flask import Flask, g
+
+from odp.const import ODPScope
+from odp.lib.client import ODPAPIError
+from odp.ui.admin.lib import service
+from odp.ui.admin.lib.changes import iter_modified_records
+from odp.ui.admin.lib.hooks import wrap_api
+from odp.ui.admin.lib.pagination import decode_cursor, encode_cursor
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 50
+
+SYNC_LEASE_TTL = 3600
+"""Seconds for which a process may hold the sync lease; a lease held by a
+process that died while syncing is taken over once it expires."""
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS record (
+    id TEXT PRIMARY KEY,
+    collection_id TEXT NOT NULL,
+    parent_id TEXT,
+    timestamp TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS record_keyset_idx ON record (timestamp, id);
+CREATE INDEX IF NOT EXISTS record_collection_keyset_idx ON record (collection_id, timestamp, id);
+CREATE INDEX IF NOT EXISTS record_parent_idx ON record (parent_id);
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+'''
+
+RECORD_PATH = re.compile(r'/record/(?:admin/)?(?P<id>[^/]+)(?P<sub>/.*)?')
+
+
+class RecordMirror:
+    """Local SQLite copy of the records returned by the record list API,
+    including their tags and published catalog ids.
+
+    The mirror is synced with the records modified since the latest
+    mirrored timestamp, and fully resynced periodically to drop records
+    that were deleted other than via this app. Records changed via this
+    app are re-fetched individually on the next sync, since changes to
+    a record's tags do not necessarily update its timestamp; tag and
+    catalog changes made elsewhere are therefore picked up only by the
+    next full resync.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._dirty = set()
+        self._dirty_lock = threading.Lock()
+        # the schema is created on a connection of its own, so that a
+        # process forked after this (e.g. a gunicorn worker) does not
+        # inherit an open connection
+        with closing(sqlite3.connect(self.path, timeout=30)) as db, db:
+            db.executescript(SCHEMA)
+
+    def reset(self) -> None:
+        """Discard this process's connections; for a forked process,
+        which must not use its parent's."""
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._dirty_lock = threading.Lock()
+
+    def _db(self) -> sqlite3.Connection:
+        """Return this thread's connection."""
+        if not hasattr(self._local, 'db'):
+            self._local.db = db = sqlite3.connect(self.path, timeout=30)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+        return self._local.db
+
+    def get_state(self, key: str) -> str | None:
+        row = self._db().execute('SELECT value FROM state WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_state(self, db: sqlite3.Connection, key: str, value: str) -> None:
+        db.execute('INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)', (key, value))
+
+    def upsert(self, records: list[dict]) -> None:
+        with self._write_lock, self._db() as db:
+            db.executemany(
+                'INSERT OR REPLACE INTO record (id, collection_id, parent_id, timestamp, data) VALUES (?, ?, ?, ?, ?)',
+                [(
+                    record['id'],
+                    record['collection_id'],
+                    record['parent_id'],
+                    record['timestamp'],
+                    json.dumps(record),
+                ) for record in records],
+            )
+
+    def delete(self, record_ids: list[str]) -> None:
+        with self._write_lock, self._db() as db:
+            db.executemany('DELETE FROM record WHERE id = ?', [(record_id,) for record_id in record_ids])
+
+    def mark_dirty(self, record_id: str) -> None:
+        """Re-fetch the record on the next sync."""
+        with self._dirty_lock:
+            self._dirty.add(record_id)
+
+    def claim(self) -> bool:
+        """Take the sync lease for this process, if no other process holds
+        it, so that only one worker process syncs at a time."""
+        now = time.time()
+        with self._write_lock, self._db() as db:
+            db.execute('BEGIN IMMEDIATE')
+            if lease := self.get_state('sync_lease'):
+                owner, expiry = lease.split()
+                if int(owner) != os.getpid() and float(expiry) > now:
+                    return False
+            self._set_state(db, 'sync_lease', f'{os.getpid()} {now + SYNC_LEASE_TTL}')
+            return True
+
+    def release(self) -> None:
+        with self._write_lock, self._db() as db:
+            self._set_state(db, 'sync_lease', f'{os.getpid()} 0')
+
+    def sync(self, client: Any, full: bool = False) -> None:
+        """Mirror records modified since the latest mirrored timestamp,
+        and re-fetch records marked dirty, using ``client``, which must be
+        able to read all records. With ``full``, walk the full record
+        list, and drop records not found."""
+        started = time.monotonic()
+        with self._dirty_lock:
+            dirty, self._dirty = self._dirty, set()
+
+        since = None if full else self.get_state('timestamp')
+        latest = since
+        seen = set()
+        try:
+            for records in iter_modified_records(since, client):
+                self.upsert(records)
+                seen |= {record['id'] for record in records}
+                if not latest or records[0]['timestamp'] > latest:
+                    latest = records[0]['timestamp']
+
+            for record_id in dirty - seen:
+                try:
+                    self.upsert([client.get(f'/record/{record_id}')])
+                except ODPAPIError as e:
+                    if e.status_code != 404:
+                        raise
+                    self.delete([record_id])
+
+        except Exception:
+            with self._dirty_lock:
+                self._dirty |= dirty
+            raise
+
+        with self._write_lock, self._db() as db:
+            if full:
+                mirrored = {row[0] for row in db.execute('SELECT id FROM record')}
+                db.executemany('DELETE FROM record WHERE id = ?', [(record_id,) for record_id in mirrored - seen])
+                self._set_state(db, 'resynced', str(time.time()))
+            if latest:
+                self._set_state(db, 'timestamp', latest)
+            self._set_state(db, 'synced', str(time.time()))
+
+        logger.info('Record mirror %s: %d records in %.1fs',
+                    'resynced' if full else 'synced', len(seen | dirty), time.monotonic() - started)
+
+    def _where(
+            self,
+            collection_ids: list[str] | None,
+            parent_id: str | None,
+            after: tuple[str, str] | None = None,
+    ) -> tuple[str, list]:
+        clauses = []
+        params = []
+        if after:
+            # keyset condition for ORDER BY timestamp DESC, id DESC
+            clauses += ['(timestamp, id) < (?, ?)']
+            params += list(after)
+        if collection_ids is not None:
+            clauses += [f"collection_id IN ({', '.join('?' * len(collection_ids))})"]
+            params += collection_ids
+        if parent_id:
+            clauses += ['parent_id = ?']
+            params += [parent_id]
+        return f"WHERE {' AND '.join(clauses)}" if clauses else '', params
+
+    def get_page(
+            self,
+            collection_ids: list[str] | None,
+            parent_id: str | None,
+            page: int = 1,
+            size: int = PAGE_SIZE,
+            cursor: str = None,
+    ) -> dict:
+        """Return a page of mirrored records, most recently modified first,
+        optionally limited to the given collections and/or parent record.
+
+        The page is selected by ``cursor`` -- the ``next_cursor`` of the
+        previous page -- if given, otherwise by number. A cursor selects
+        the page by keyset rather than by offset, and carries the total
+        from the first page, so cursor pages cost the same at any depth.
+        """
+        db = self._db()
+        if cursor:
+            timestamp, id, total = decode_cursor(cursor, str, str, int)
+            where, params = self._where(collection_ids, parent_id, (timestamp, id))
+            offset = 0
+        else:
+            where, params = self._where(collection_ids, parent_id)
+            total = db.execute(f'SELECT count(*) FROM record {where}', params).fetchone()[0]
+            offset = (page - 1) * size
+
+        rows = db.execute(
+            f'SELECT timestamp, id, data FROM record {where} ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?',
+            params + [size, offset],
+        ).fetchall()
+
+        return dict(
+            items=[json.loads(data) for _, _, data in rows],
+            total=total,
+            page=page,
+            pages=max(1, ceil(total / size)),
+            next_cursor=encode_cursor(rows[-1][0], rows[-1][1], total) if len(rows) == size else None,
+        )
+
+    def iter_records(self, collection_ids: list[str] | None, parent_id: str | None = None) -> Iterator[dict]:
+        """Lazily iterate over mirrored records, as for ``get_page``."""
+        where, params = self._where(collection_ids, parent_id)
+        for data, in self._db().execute(f'SELECT data FROM record {where} ORDER BY timestamp DESC, id DESC', params):
+            yield json.loads(data)
+
+    def synced(self) -> float | None:
+        """Return the time (epoch seconds) of the last sync, or None."""
+        synced = self.get_state('synced')
+        return float(synced) if synced else None
+
+    def resynced(self) -> float | None:
+        """Return the time (epoch seconds) of the last full resync, or None."""
+        resynced = self.get_state('resynced')
+        return float(resynced) if resynced else None
+
+
+_mirror: RecordMirror | None = None
+_app: Flask | None = None
+_wake = threading.Event()
+_sync_pid: int | None = None
+_sync_lock = threading.Lock()
+_sync_interval = 60
+_resync_interval = 86400
+_max_staleness = 900
+
+
+def init_app(app: Flask):
+    """Enable the record mirror if ``RECORD_MIRROR`` is set to the path
+    of its SQLite database file.
+
+    Each process starts its own sync thread on its first use of the
+    mirror, so that a gunicorn master that created the app (with
+    ``preload_app``) runs no sync thread, and each worker runs one;
+    the workers' syncs are serialized by the mirror's sync lease.
+    The sync thread makes API calls with the service client, which must
+    be able to read all records, so that none are left out of the
+    mirror; without a service client, the mirror is not enabled. The
+    mirror is used for reads only while it was synced within
+    ``RECORD_MIRROR_MAX_STALENESS`` seconds.
+    """
+    global _mirror, _app, _sync_interval, _resync_interval, _max_staleness
+    app.config.setdefault('RECORD_MIRROR', None)
+    app.config.setdefault('RECORD_MIRROR_SYNC_INTERVAL', 60)
+    app.config.setdefault('RECORD_MIRROR_RESYNC_INTERVAL', 86400)
+    app.config.setdefault('RECORD_MIRROR_MAX_STALENESS', 900)
+
+    if not (path := app.config['RECORD_MIRROR']):
+        return
+
+    if not service.enabled():
+        logger.warning('The record mirror requires a service client; RECORD_MIRROR is ignored')
+        return
+
+    _app = app
+    _sync_interval = app.config['RECORD_MIRROR_SYNC_INTERVAL']
+    _resync_interval = app.config['RECORD_MIRROR_RESYNC_INTERVAL']
+    _max_staleness = app.config['RECORD_MIRROR_MAX_STALENESS']
+
+    if _mirror is None:
+        _mirror = RecordMirror(path)
+        for method in ('post', 'put'):
+            wrap_api('mirror', method, _track_write)
+        wrap_api('mirror', 'delete', _track_delete)
+        os.register_at_fork(after_in_child=_reset)
+
+
+def usable() -> bool:
+    """Return True if the mirror is enabled and fresh enough to serve reads."""
+    if _mirror is None:
+        return False
+    _ensure_sync_thread()
+    return (synced := _mirror.synced()) is not None and time.time() - synced <= _max_staleness
+
+
+def readable_collections(collection_ids: list[str]) -> list[str] | None:
+    """Return the collections whose mirrored records the current user
+    may read, out of ``collection_ids`` (all if empty); None means any."""
+    permitted = g.user_permissions[ODPScope.RECORD_READ]
+    if permitted == '*':
+        return collection_ids or None
+    return [id for id in collection_ids or permitted if id in permitted]
+
+
+def list_records(collection_ids: list[str], parent_id: str | None, cursor: str | None) -> dict:
+    """Return a page of mirrored records that the current user may
+    read, selected by ``cursor`` (the first page if None)."""
+    return _mirror.get_page(readable_collections(collection_ids), parent_id, cursor=cursor)
+
+
+def iter_records(collection_ids: list[str], parent_id: str | None = None) -> Iterator[dict]:
+    """Lazily iterate over mirrored records that the current user may read."""
+    return _mirror.iter_records(readable_collections(collection_ids), parent_id)
+
+
+def status() -> dict:
+    """Return the times (ISO format) of the last sync and of the last
+    full resync, and the mirror's age in minutes, for display alongside
+    mirrored data. Tag and catalog changes made other than via this app
+    are as of the full resync."""
+    synced = _mirror.synced()
+    resynced = _mirror.resynced()
+    return dict(
+        synced=datetime.fromtimestamp(synced, timezone.utc).isoformat(),
+        age=int((time.time() - synced) // 60),
+        resynced=datetime.fromtimestamp(resynced, timezone.utc).isoformat() if resynced else None,
+    )
+
+
+def _track_write(func, path, *args, **kwargs):
+    result = func(path, *args, **kwargs)
+    _ensure_sync_thread()
+    if path in ('/record/', '/record/admin/'):
+        _mirror.mark_dirty(result['id'])
+        _wake.set()
+    elif match := RECORD_PATH.fullmatch(path):
+        _mirror.mark_dirty(match['id'])
+        _wake.set()
+    return result
+
+
+def _track_delete(func, path, *args, **kwargs):
+    result = func(path, *args, **kwargs)
+    _ensure_sync_thread()
+    if match := RECORD_PATH.fullmatch(path):
+        if match['sub']:
+            # e.g. a tag removal
+            _mirror.mark_dirty(match['id'])
+            _wake.set()
+        else:
+            _mirror.delete([match['id']])
+    return result
+
+
+def _ensure_sync_thread() -> None:
+    """Start this process's sync thread, if it has not been started."""
+    global _sync_pid
+    if _sync_pid == os.getpid():
+        return
+    with _sync_lock:
+        if _sync_pid != os.getpid():
+            threading.Thread(target=_sync_loop, name='odp-admin-mirror', daemon=True).start()
+            _sync_pid = os.getpid()
+
+
+def _sync_loop() -> None:
+    while True:
+        _sync_once()
+        _wake.wait(_sync_interval)
+        _wake.clear()
+
+
+def _sync_once() -> None:
+    """Sync the mirror, unless another process holds the sync lease."""
+    if not _mirror.claim():
+        return
+
+    full = time.time() - float(_mirror.get_state('resynced') or 0) >= _resync_interval
+    try:
+        with _app.app_context():
+            _mirror.sync(service.client(), full)
+    except Exception:
+        logger.exception('Record mirror sync failed')
+    finally:
+        _mirror.release()
+
+
+def _reset() -> None:
+    # a forked process (e.g. a gunicorn worker with preload_app) must not
+    # use its parent's database connections, nor inherit a held lock; it
+    # starts a sync thread of its own on first use
+    global _wake, _sync_lock
+    _wake = threading.Event()
+    _sync_lock = threading.Lock()
+    if _mirror is not None:
+        _mirror.reset()
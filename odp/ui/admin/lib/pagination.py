@@ -0,0 +1,61 @@
+import base64
+import json
+from typing import Any
+from urllib.parse import quote
+
+from flask import abort, request
+
+from odp.ui.base import api
+
+
+def get_page(path: str, api_filter: str = '', **params) -> dict:
+    """Get a page of the API listing at ``path``, as selected by the
+    request's ``cursor`` or ``page`` arg, with the (``&``-prefixed)
+    ``api_filter`` query string and any other ``params``.
+
+    A listing that supports keyset pagination returns an opaque
+    ``next_cursor`` with each page (null on the last page), which selects
+    the following page when passed back as ``cursor``. Keyset pages cost
+    the same at any depth, and rows are neither skipped nor repeated
+    when rows are inserted concurrently. Other listings are paged by
+    offset, as before.
+    """
+    path, params = page_request(path, api_filter, **params)
+    return cursor_page(api.get(path, **params))
+
+
+def page_request(path: str, api_filter: str = '', **params) -> tuple[str, dict]:
+    """Return a (path, params) request for the page that ``get_page``
+    gets, for use with ``fanout.get``; pass its result to ``cursor_page``."""
+    if cursor := request.args.get('cursor'):
+        return f'{path}?cursor={quote(cursor)}{api_filter}', params
+    return f'{path}?page={request.args.get("page", 1)}{api_filter}', params
+
+
+def cursor_page(result: dict) -> dict:
+    """Present a keyset-paged result as a single page, so that
+    ``render_table`` omits its page number links; these are replaced
+    by the ``cursor_pager`` macro's links. Offset-paged results are
+    returned as is."""
+    if 'next_cursor' not in result:
+        return result
+    return result | dict(page=1, pages=1)
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode JSON-serializable values as an opaque, URL-safe cursor."""
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, *types: type) -> list:
+    """Decode an ``encode_cursor`` cursor of values of the given types;
+    abort with 400 if it is invalid, or does not hold such values."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != len(types) or not all(
+                isinstance(value, type_) for value, type_ in zip(values, types)
+        ):
+            raise ValueError
+        return values
+    except ValueError:
+        abort(400, 'Invalid cursor')
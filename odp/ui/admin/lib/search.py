@@ -0,0 +1,338 @@
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from datetime import datetime, timezone
+from math import ceil
+from typing import Any
+
+from flask import Flask, current_app, g
+
+from odp.const import ODPRecordTag, ODPScope
+from odp.ui.admin.lib.changes import iter_modified_records
+from odp.ui.admin.lib import service
+from odp.ui.admin.lib.hooks import wrap_api
+
+logger = logging.getLogger(__name__)
+
+SEARCH_PAGE_SIZE = 50
+
+BM25_WEIGHTS = (10.0, 1.0, 4.0, 10.0, 2.0)
+"""Relative weights of the title, abstract, keywords, identifiers and
+comments columns in result ranking."""
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS record (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    collection_id TEXT,
+    timestamp TEXT NOT NULL,
+    summary TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS record_fts USING fts5(
+    title, abstract, keywords, identifiers, comments,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+'''
+
+
+class RecordSearchIndex:
+    """SQLite FTS5 index over record titles, abstracts, keywords,
+    identifiers and tag comments.
+
+    Alongside the full-text index, each record is stored as a summary
+    with the fields needed to render it in the record list. The index
+    is refreshed with the records modified since the latest indexed
+    timestamp, and rebuilt periodically to drop records that were
+    deleted other than via this app.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        # the schema is created on a connection of its own, so that a
+        # process forked after this (e.g. a gunicorn worker) does not
+        # inherit an open connection
+        with closing(sqlite3.connect(self.path, timeout=30)) as db, db:
+            db.executescript(SCHEMA)
+
+    def reset(self) -> None:
+        """Discard this process's connections; for a forked process,
+        which must not use its parent's."""
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+
+    def _db(self) -> sqlite3.Connection:
+        """Return this thread's connection."""
+        if not hasattr(self._local, 'db'):
+            self._local.db = db = sqlite3.connect(self.path, timeout=30)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+        return self._local.db
+
+    def get_state(self, key: str) -> str | None:
+        row = self._db().execute('SELECT value FROM state WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_state(self, db: sqlite3.Connection, key: str, value: str) -> None:
+        db.execute('INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)', (key, value))
+
+    def upsert(self, records: list[dict]) -> None:
+        # each statement sequence starts with a write, so that the
+        # transaction holds the database's write lock throughout, and
+        # processes sharing the index (e.g. gunicorn workers) do not race
+        with self._write_lock, self._db() as db:
+            for record in records:
+                db.execute(
+                    'INSERT INTO record (id, collection_id, timestamp, summary) VALUES (?, ?, ?, ?) '
+                    'ON CONFLICT (id) DO UPDATE SET '
+                    'collection_id = excluded.collection_id, timestamp = excluded.timestamp, summary = excluded.summary',
+                    (record['id'], record['collection_id'], record['timestamp'], json.dumps(_summary(record))),
+                )
+                rowid, = db.execute('SELECT rowid FROM record WHERE id = ?', (record['id'],)).fetchone()
+                db.execute('DELETE FROM record_fts WHERE rowid = ?', (rowid,))
+                db.execute(
+                    'INSERT INTO record_fts (rowid, title, abstract, keywords, identifiers, comments) VALUES (?, ?, ?, ?, ?, ?)',
+                    (rowid,) + _text(record),
+                )
+
+    def delete(self, record_ids: list[str]) -> None:
+        with self._write_lock, self._db() as db:
+            for record_id in record_ids:
+                db.execute('DELETE FROM record_fts WHERE rowid IN (SELECT rowid FROM record WHERE id = ?)', (record_id,))
+                db.execute('DELETE FROM record WHERE id = ?', (record_id,))
+
+    def refresh(self, client: Any, rebuild: bool = False) -> None:
+        """Index records modified since the latest indexed timestamp,
+        walking the record list from most recently modified, using
+        ``client``, which must be able to read all records. With
+        ``rebuild``, walk the full list, and drop records not found."""
+        started = time.monotonic()
+        since = None if rebuild else self.get_state('timestamp')
+        latest = since
+        seen = set()
+        for records in iter_modified_records(since, client):
+            self.upsert(records)
+            seen |= {record['id'] for record in records}
+            if not latest or records[0]['timestamp'] > latest:
+                latest = records[0]['timestamp']
+
+        with self._write_lock, self._db() as db:
+            if rebuild:
+                indexed = {row[0] for row in db.execute('SELECT id FROM record')}
+                deleted = list(indexed - seen)
+            if latest:
+                self._set_state(db, 'timestamp', latest)
+            self._set_state(db, 'refreshed', str(time.time()))
+            if rebuild:
+                self._set_state(db, 'rebuilt', str(time.time()))
+
+        if rebuild:
+            self.delete(deleted)
+        logger.info('Record search index %s: %d records in %.1fs',
+                    'rebuilt' if rebuild else 'refreshed', len(seen), time.monotonic() - started)
+
+    def search(self, query: str, collection_ids: list[str] | None, page: int, size: int = SEARCH_PAGE_SIZE) -> dict:
+        """Return a page of records matching ``query``, ranked by
+        relevance, optionally limited to the given collections."""
+        if not (expression := _match_expression(query)):
+            return dict(items=[], total=0, page=1, pages=1)
+
+        where = 'record_fts MATCH ?'
+        params = [expression]
+        if collection_ids is not None:
+            where += f" AND record.collection_id IN ({', '.join('?' * len(collection_ids))})"
+            params += collection_ids
+
+        db = self._db()
+        from_ = f'FROM record_fts JOIN record ON record.rowid = record_fts.rowid WHERE {where}'
+        total = db.execute(f'SELECT count(*) {from_}', params).fetchone()[0]
+        rows = db.execute(
+            f"SELECT record.summary {from_} ORDER BY bm25(record_fts, {', '.join(map(str, BM25_WEIGHTS))}) LIMIT ? OFFSET ?",
+            params + [size, (page - 1) * size],
+        ).fetchall()
+
+        return dict(
+            items=[json.loads(summary) for summary, in rows],
+            total=total,
+            page=page,
+            pages=max(1, ceil(total / size)),
+        )
+
+    def count(self) -> int:
+        return self._db().execute('SELECT count(*) FROM record').fetchone()[0]
+
+
+_index: RecordSearchIndex | None = None
+_refresher = ThreadPoolExecutor(max_workers=1, thread_name_prefix='odp-admin-search')
+_refreshing = threading.Lock()
+_refresh_interval = 300
+_rebuild_interval = 86400
+
+
+def init_app(app: Flask):
+    """Enable the record search index if ``RECORD_SEARCH_INDEX`` is set
+    to the path of its SQLite database file. The index is refreshed with
+    the service client, which must be able to read all records."""
+    global _index, _refresh_interval, _rebuild_interval
+    app.config.setdefault('RECORD_SEARCH_INDEX', None)
+    app.config.setdefault('RECORD_SEARCH_REFRESH_INTERVAL', 300)
+    app.config.setdefault('RECORD_SEARCH_REBUILD_INTERVAL', 86400)
+
+    if not (path := app.config['RECORD_SEARCH_INDEX']):
+        return
+
+    _refresh_interval = app.config['RECORD_SEARCH_REFRESH_INTERVAL']
+    _rebuild_interval = app.config['RECORD_SEARCH_REBUILD_INTERVAL']
+    if _index is None:
+        _index = RecordSearchIndex(path)
+        wrap_api('search', 'delete', _delete_record)
+
+
+def enabled() -> bool:
+    return _index is not None
+
+
+def search(query: str, collection_ids: list[str], page: int) -> dict:
+    """Search the index on behalf of the current user, who must have
+    the ``RECORD_READ`` scope. Results are limited to the collections
+    the user may read and, if ``collection_ids`` is non-empty, to those
+    collections. A stale index is refreshed in the background."""
+    _refresh_if_stale()
+
+    permitted = g.user_permissions[ODPScope.RECORD_READ]
+    if permitted != '*':
+        collection_ids = [id for id in collection_ids or permitted if id in permitted]
+
+    return _index.search(query, collection_ids if collection_ids or permitted != '*' else None, page)
+
+
+def status() -> dict:
+    """Return the number of indexed records and the time (ISO format)
+    of the last refresh, or None if the index has not been built."""
+    refreshed = _index.get_state('refreshed')
+    return dict(
+        count=_index.count(),
+        refreshed=datetime.fromtimestamp(float(refreshed), timezone.utc).isoformat() if refreshed else None,
+    )
+
+
+def _refresh_if_stale() -> None:
+    """Start a background refresh if one is due and not already running.
+
+    The refresh is made with the service client, in an app context, so
+    that it does not depend on the user or request that started it.
+    Without a service client, the index is not refreshed.
+    """
+    if not service.enabled():
+        return
+
+    now = time.time()
+    refreshed = float(_index.get_state('refreshed') or 0)
+    rebuilt = float(_index.get_state('rebuilt') or 0)
+    if now - refreshed < _refresh_interval and now - rebuilt < _rebuild_interval:
+        return
+
+    if not _refreshing.acquire(blocking=False):
+        return
+
+    app = current_app._get_current_object()
+
+    def refresh():
+        try:
+            with app.app_context():
+                _index.refresh(service.client(), rebuild=now - rebuilt >= _rebuild_interval)
+        except Exception:
+            logger.exception('Record search index refresh failed')
+        finally:
+            _refreshing.release()
+
+    _refresher.submit(refresh)
+
+
+def _delete_record(func, path, *args, **kwargs):
+    result = func(path, *args, **kwargs)
+    if match := re.fullmatch(r'/record/(?:admin/)?([^/]+)', path):
+        _index.delete([match.group(1)])
+    return result
+
+
+def _match_expression(query: str) -> str | None:
+    """Convert a user query to an FTS5 expression matching all of its
+    terms, treating the last as a prefix. Terms are quoted, so that
+    identifiers and FTS5 operator characters are matched literally."""
+    terms = [term.replace('"', '""') for term in query.split()]
+    if not terms:
+        return None
+    return ' '.join(f'"{term}"' for term in terms) + '*'
+
+
+def _summary(record: dict) -> dict:
+    """Return the record fields needed to render it in the record list."""
+    metadata = record.get('metadata') or {}
+    return dict(
+        id=record['id'],
+        doi=record['doi'],
+        sid=record['sid'],
+        collection_id=record['collection_id'],
+        collection_key=record['collection_key'],
+        schema_id=record['schema_id'],
+        metadata={key: metadata[key] for key in ('title', 'titles') if key in metadata},
+        validity=dict(valid=record['validity']['valid']),
+        tags=[
+            dict(tag_id=tag['tag_id'], data=dict(pass_=tag['data'].get('pass_')))
+            for tag in record['tags'] if tag['tag_id'] == ODPRecordTag.QC
+        ],
+        published_catalog_ids=record['published_catalog_ids'],
+        timestamp=record['timestamp'],
+    )
+
+
+def _text(record: dict) -> tuple[str, str, str, str, str]:
+    """Return the indexed (title, abstract, keywords, identifiers,
+    comments) text of a record, from DataCite or ISO 19115 metadata."""
+    metadata = record.get('metadata') or {}
+
+    titles = [title.get('title', '') for title in metadata.get('titles', ())]
+    if 'title' in metadata:
+        titles += [metadata['title']]
+
+    abstracts = [
+        description.get('description', '') for description in metadata.get('descriptions', ())
+        if description.get('descriptionType') == 'Abstract'
+    ]
+    if 'abstract' in metadata:
+        abstracts += [metadata['abstract']]
+
+    keywords = [subject.get('subject', '') for subject in metadata.get('subjects', ())]
+    for keyword_group in metadata.get('descriptiveKeywords', ()):
+        keywords += keyword_group.get('keywords', ())
+
+    identifiers = [record['id'], record['doi'] or '', record['sid'] or '']
+    comments = [str(tag['data']['comment']) for tag in record['tags'] if (tag.get('data') or {}).get('comment')]
+
+    return tuple(' '.join(map(str, values)) for values in (titles, abstracts, keywords, identifiers, comments))
+
+
+def _reset() -> None:
+    # a forked process (e.g. a gunicorn worker with preload_app) inherits
+    # the executor but not its thread, nor any refresh in progress; nor
+    # may it use its parent's database connections
+    global _refresher, _refreshing
+    _refresher = ThreadPoolExecutor(max_workers=1, thread_name_prefix='odp-admin-search')
+    _refreshing = threading.Lock()
+    if _index is not None:
+        _index.reset()
+
+
+os.register_at_fork(after_in_child=_reset)
@@ -0,0 +1,79 @@
+import os
+import threading
+
+import requests
+from flask import Flask
+
+from odp.config import config
+from odp.const import ODPScope
+from odp.lib.client import ODPClient
+from odp.ui.admin.lib import hooks, transport
+
+_settings: dict | None = None
+_client: hooks.BoundClient | None = None
+_lock = threading.Lock()
+
+
+def init_app(app: Flask):
+    """Configure the app's own client-credentials API client, which is
+    used for work done outside of a user's request: jobs, search index
+    and mirror syncs, storage scans and cache warm-up.
+
+    The client is configured with ``SERVICE_CLIENT_ID`` and
+    ``SERVICE_CLIENT_SECRET``, and requests ``SERVICE_CLIENT_SCOPE`` (by
+    default, all ODP scopes); without these, such work is unavailable.
+    The API attributes changes made with this client to the client, and
+    not to the user on whose behalf they are made.
+    """
+    global _settings
+    app.config.setdefault('SERVICE_CLIENT_ID', None)
+    app.config.setdefault('SERVICE_CLIENT_SECRET', None)
+    app.config.setdefault('SERVICE_CLIENT_SCOPE', [scope.value for scope in ODPScope])
+
+    if app.config['SERVICE_CLIENT_ID']:
+        _settings = dict(
+            client_id=app.config['SERVICE_CLIENT_ID'],
+            client_secret=app.config['SERVICE_CLIENT_SECRET'],
+            scope=app.config['SERVICE_CLIENT_SCOPE'],
+        )
+
+
+def enabled() -> bool:
+    return _settings is not None
+
+
+def client() -> hooks.BoundClient | None:
+    """Return this process's service client, or None if there is none.
+
+    The client is created on first use, in each process, and routes its
+    calls through the registered API wrappers (see ``hooks.bind``), and
+    its requests through the shared transport adapter.
+    Callers must have an app context.
+    """
+    global _client
+    if _settings is None:
+        return None
+
+    with _lock:
+        if _client is None:
+            odp_client = ODPClient(
+                api_url=config.ODP.API_URL,
+                hydra_url=config.HYDRA.PUBLIC.URL,
+                **_settings,
+            )
+            for value in vars(odp_client).values():
+                if isinstance(value, requests.Session):
+                    transport.mount(value)
+            _client = hooks.bind(odp_client)
+        return _client
+
+
+def _reset() -> None:
+    # a forked process (e.g. a gunicorn worker with preload_app) must not
+    # share its parent's token and connections, nor inherit a held lock
+    global _client, _lock
+    _client = None
+    _lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset)
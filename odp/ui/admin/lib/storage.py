@@ -0,0 +1,162 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from flask import Flask, current_app
+
+from odp.lib.client import ODPAPIError
+from odp.ui.admin.lib import fanout, service
+from odp.ui.admin.lib.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+SCAN_PAGE_SIZE = 500
+"""API page size used when walking an archive's resources."""
+
+
+@dataclass
+class Usage:
+    count: int = 0
+    bytes: int = 0
+
+
+@dataclass
+class StorageSummary:
+    """Resource counts and byte totals for an archive, overall and by
+    provider, mimetype and package.
+
+    Aggregates are updated as resource pages are scanned, and should
+    only be read once the summary is ``done``.
+    """
+    archive_id: str
+    started: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    finished: datetime | None = None
+    pages: int | None = None
+    pages_scanned: int = 0
+    error: str | None = None
+    total: Usage = field(default_factory=Usage)
+    no_size: int = 0
+    no_hash: int = 0
+    by_provider: dict[str, Usage] = field(default_factory=dict)
+    by_mimetype: dict[str, Usage] = field(default_factory=dict)
+    by_package: dict[str | None, Usage] = field(default_factory=dict)
+    provider_keys: dict[str, str] = field(default_factory=dict)
+    package_keys: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def done(self) -> bool:
+        return self.finished is not None
+
+    def add(self, resources: list[dict]) -> None:
+        for resource in resources:
+            size = resource['size'] or 0
+            if resource['size'] is None:
+                self.no_size += 1
+            if not resource['hash']:
+                self.no_hash += 1
+
+            provider_id = resource['provider_id']
+            package_id = resource.get('package_id')
+            self.provider_keys[provider_id] = resource['provider_key']
+            if package_id:
+                self.package_keys[package_id] = resource.get('package_key') or package_id
+
+            for usage in (
+                    self.total,
+                    self.by_provider.setdefault(provider_id, Usage()),
+                    self.by_mimetype.setdefault(resource['mimetype'] or '', Usage()),
+                    self.by_package.setdefault(package_id, Usage()),
+            ):
+                usage.count += 1
+                usage.bytes += size
+
+
+_summaries = TTLCache(maxsize=64, ttl=600)
+"""Storage summaries, keyed by archive id."""
+
+_scanner = ThreadPoolExecutor(max_workers=2, thread_name_prefix='odp-admin-storage')
+_lock = threading.Lock()
+
+
+def init_app(app: Flask):
+    app.config.setdefault('STORAGE_SUMMARY_TTL', 600)
+    _summaries.ttl = app.config['STORAGE_SUMMARY_TTL']
+
+
+def get_summary(archive_id: str, refresh: bool = False) -> StorageSummary | None:
+    """Return the storage summary for an archive, starting a scan of the
+    archive's resources in the background if there is no cached summary,
+    or if ``refresh`` is set and no scan is in progress. Return None if
+    the app has no service client, in which case summaries are
+    unavailable.
+
+    The scan is made with the service client, in an app context, and
+    covers all of the archive's resources; the summary is therefore
+    shared by all users who may view it (those with ``RESOURCE_READ_ALL``).
+    The scan walks ``/resource/all/`` pages, fetching up to
+    ``fanout.MAX_WORKERS`` pages at a time, and retains only aggregates.
+    Since pages are selected by offset, resources added or removed while
+    the scan is in progress may be missed or counted twice.
+    """
+    if not service.enabled():
+        return None
+
+    with _lock:
+        hit, summary = _summaries.get(archive_id)
+        if hit and (not refresh or not summary.done):
+            return summary
+
+        summary = StorageSummary(archive_id=archive_id)
+        _summaries.set(archive_id, summary)
+
+    _scanner.submit(_scan, current_app._get_current_object(), summary)
+    return summary
+
+
+def _scan(app: Flask, summary: StorageSummary) -> None:
+    def request(page):
+        return '/resource/all/', dict(archive_id=summary.archive_id, page=page, size=SCAN_PAGE_SIZE)
+
+    try:
+        with app.app_context():
+            client = service.client()
+            path, params = request(1)
+            result = client.get(path, **params)
+            summary.pages = result['pages']
+            summary.add(result['items'])
+            summary.pages_scanned = 1
+
+            for start in range(2, summary.pages + 1, fanout.MAX_WORKERS):
+                results = fanout.background.get(*(
+                    request(page) for page in range(start, min(start + fanout.MAX_WORKERS, summary.pages + 1))
+                ), client=client)
+                for result in results:
+                    summary.add(result['items'])
+                    summary.pages_scanned += 1
+
+                # keep an in-progress summary from expiring during a long scan
+                _summaries.set(summary.archive_id, summary)
+
+    except ODPAPIError as e:
+        summary.error = str(e.error_detail)
+    except Exception as e:
+        logger.exception('Storage summary of archive %s failed', summary.archive_id)
+        summary.error = str(e)
+    finally:
+        summary.finished = datetime.now(timezone.utc)
+        _summaries.set(summary.archive_id, summary)
+
+
+def _reset() -> None:
+    # a forked process (e.g. a gunicorn worker with preload_app) inherits
+    # the executor but not its threads, nor any scan in progress
+    global _summaries, _scanner, _lock
+    _summaries = TTLCache(maxsize=_summaries.maxsize, ttl=_summaries.ttl)
+    _scanner = ThreadPoolExecutor(max_workers=2, thread_name_prefix='odp-admin-storage')
+    _lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset)
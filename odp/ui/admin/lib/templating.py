@@ -0,0 +1,116 @@
+import os
+import threading
+import time
+
+import click
+from flask import Flask
+from jinja2 import FileSystemBytecodeCache, Template
+from jinja2.runtime import Macro
+
+_lock = threading.Lock()
+_local = threading.local()
+
+_profile: dict[tuple[str, str], list] = {}
+"""Render profile, keyed by (kind, name), of [calls, seconds, self seconds],
+where kind is 'template' or 'macro'."""
+
+_macro_invoke = Macro._invoke
+
+
+def init_app(app: Flask):
+    """With ``TEMPLATE_BYTECODE_CACHE`` enabled, cache compiled templates
+    on disk, so that worker processes load template bytecode rather than
+    parsing and compiling template source. Cached bytecode is keyed on a
+    checksum of the template source, so edited templates are recompiled.
+    Since the cache holds executable code, it is off by default, and
+    ``TEMPLATE_BYTECODE_CACHE_DIR`` must be writable only by the user the
+    app runs as; if unset, Jinja creates a private (mode 0700) per-user
+    directory under the system temp dir. The cache may be populated at
+    deployment with ``flask compile-templates``.
+
+    With ``TEMPLATE_PROFILING`` enabled, render time is attributed to
+    individual (top-level) templates and to the macros they call, and is
+    exported on ``/metrics``. Profiling patches Jinja's macro invocation
+    for the whole process, and is off by default.
+    """
+    app.config.setdefault('TEMPLATE_BYTECODE_CACHE', False)
+    app.config.setdefault('TEMPLATE_BYTECODE_CACHE_DIR', None)
+    app.config.setdefault('TEMPLATE_PROFILING', False)
+
+    if app.config['TEMPLATE_BYTECODE_CACHE']:
+        if directory := app.config['TEMPLATE_BYTECODE_CACHE_DIR']:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(directory)
+
+    if app.config['TEMPLATE_PROFILING']:
+        Macro._invoke = _profiled_macro_invoke
+        app.jinja_env.template_class = ProfiledTemplate
+
+    @app.cli.command('compile-templates')
+    def compile_templates():
+        """Populate the template bytecode cache."""
+        if app.jinja_env.bytecode_cache is None:
+            raise click.ClickException('The template bytecode cache is disabled.')
+
+        names = app.jinja_env.list_templates()
+        for name in names:
+            app.jinja_env.get_template(name)
+        click.echo(f'Compiled {len(names)} templates.')
+
+
+def profile() -> dict[tuple[str, str], tuple[int, float, float]]:
+    """Return a snapshot of the render profile, as a mapping of
+    (kind, name) to (calls, seconds, self seconds). Macro names are
+    qualified by the file in which the macro is defined, e.g.
+    ``content.j2:render_table``. Seconds are inclusive of nested
+    macro calls; self seconds are not."""
+    with _lock:
+        return {key: tuple(value) for key, value in _profile.items()}
+
+
+def _stack() -> list[float]:
+    """Per-thread stack of child render time accumulators."""
+    if not hasattr(_local, 'stack'):
+        _local.stack = []
+    return _local.stack
+
+
+def _enter() -> float:
+    _stack().append(0.0)
+    return time.perf_counter()
+
+
+def _exit(kind: str, name: str, start: float) -> None:
+    elapsed = time.perf_counter() - start
+    stack = _stack()
+    children = stack.pop()
+    if stack:
+        stack[-1] += elapsed
+
+    with _lock:
+        entry = _profile.setdefault((kind, name), [0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += elapsed
+        entry[2] += elapsed - children
+
+
+class ProfiledTemplate(Template):
+    """Template that records its render time. Includes and parent
+    templates are rendered as part of the top-level template, so only
+    top-level templates are profiled."""
+
+    def render(self, *args, **kwargs) -> str:
+        start = _enter()
+        try:
+            return super().render(*args, **kwargs)
+        finally:
+            _exit('template', self.name, start)
+
+
+def _profiled_macro_invoke(self: Macro, *args, **kwargs):
+    start = _enter()
+    try:
+        return _macro_invoke(self, *args, **kwargs)
+    finally:
+        filename = os.path.basename(self._func.__code__.co_filename)
+        _exit('macro', f'{filename}:{self.name}', start)
@@ -0,0 +1,240 @@
+import hashlib
+import logging
+import os
+import threading
+from dataclasses import dataclass
+
+import requests
+from flask import Flask
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from odp.config import config
+from odp.ui.admin.lib.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+MAX_CACHED_RESPONSE_BYTES = 5 * 1024 * 1024
+"""Responses larger than this are not kept for revalidation."""
+
+RETRY_METHODS = frozenset({'GET', 'HEAD'})
+"""Methods that are retried. PUT and DELETE, though idempotent by
+definition, are not: a retry after a lost response may act on a change
+made since, and API deletes of already deleted objects fail."""
+
+
+@dataclass
+class CachedResponse:
+    etag: str | None
+    last_modified: str | None
+    content: bytes
+    headers: dict[str, str]
+
+
+class APIAdapter(HTTPAdapter):
+    """Transport adapter for requests to the ODP API.
+
+    A single adapter is mounted on all API client sessions in the process, so
+    that its urllib3 connection pool keeps connections to the API alive
+    and reuses them across requests and threads.
+    ``timeout`` is applied to requests that do not specify one. GET and HEAD
+    requests are retried with backoff on connection errors and on 502,
+    503 and 504 responses, up to ``get_retries`` times. Pool usage is
+    tracked for ``stats``.
+
+    GET responses carrying an ``ETag`` or ``Last-Modified`` header are
+    kept in an LRU cache bounded by ``response_cache_size`` entries and
+    ``response_cache_bytes`` of content, keyed by URL and
+    ``Authorization`` header, so responses are never shared between
+    users. Subsequent GETs of the same URL are made conditional, and a
+    304 response is served with the cached body.
+    """
+
+    def __init__(
+            self,
+            *,
+            pool_size: int = 10,
+            pool_block: bool = False,
+            timeout: tuple[float, float] = (5, 60),
+            get_retries: int = 2,
+            retry_backoff: float = 0.5,
+            response_cache_size: int = 1024,
+            response_cache_bytes: int = 64 * 1024 * 1024,
+    ):
+        super().__init__(
+            pool_connections=1,
+            pool_maxsize=pool_size,
+            pool_block=pool_block,
+            max_retries=Retry(
+                total=get_retries,
+                backoff_factor=retry_backoff,
+                status_forcelist=(502, 503, 504),
+                allowed_methods=RETRY_METHODS,
+                raise_on_status=False,
+            ),
+        )
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.response_cache = TTLCache(
+            maxsize=response_cache_size,
+            ttl=86400,
+            maxweight=response_cache_bytes,
+            weight=lambda cached: len(cached.content),
+        ) if response_cache_size and response_cache_bytes else None
+        self.requests = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.saturated = 0
+        self.revalidated = 0
+        self._stats_lock = threading.Lock()
+
+    def stats(self) -> dict[str, int]:
+        """Return request and connection pool usage counters. ``saturated``
+        counts requests started while all pooled connections were in use;
+        these either wait for a connection (if ``pool_block``) or use a
+        connection that is discarded afterwards."""
+        with self._stats_lock:
+            return dict(
+                pool_size=self.pool_size,
+                requests=self.requests,
+                in_flight=self.in_flight,
+                peak_in_flight=self.peak_in_flight,
+                saturated=self.saturated,
+                revalidated=self.revalidated,
+            )
+
+    def close(self):
+        # called by every session the adapter is mounted on when that
+        # session is closed; the pool outlives the (per-request) sessions
+        pass
+
+    def reset(self) -> None:
+        """Discard pooled connections."""
+        super().close()
+
+    def send(self, request, stream=False, timeout=None, **kwargs):
+        with self._stats_lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            if self.in_flight > self.pool_size:
+                self.saturated += 1
+                if self.saturated == 1 or self.saturated % 100 == 0:
+                    logger.warning('API connection pool saturated (%d requests in flight; pool size %d)',
+                                   self.in_flight, self.pool_size)
+        try:
+            return self._send(request, stream=stream, timeout=timeout or self.timeout, **kwargs)
+        finally:
+            with self._stats_lock:
+                self.in_flight -= 1
+
+    def _send(self, request, stream=False, **kwargs):
+        if self.response_cache is None or request.method != 'GET' or stream:
+            return super().send(request, stream=stream, **kwargs)
+
+        key = request.url, _digest(request.headers.get('Authorization'))
+        hit, cached = self.response_cache.get(key)
+        if hit:
+            if cached.etag:
+                request.headers['If-None-Match'] = cached.etag
+            if cached.last_modified:
+                request.headers['If-Modified-Since'] = cached.last_modified
+
+        response = super().send(request, stream=stream, **kwargs)
+
+        if hit and response.status_code == 304:
+            with self._stats_lock:
+                self.revalidated += 1
+            response.status_code = 200
+            response.reason = 'OK'
+            response._content = cached.content
+            response.headers.update(cached.headers)
+
+        elif response.status_code == 200 and (
+                (etag := response.headers.get('ETag')) or
+                (last_modified := response.headers.get('Last-Modified'))
+        ) and len(response.content) <= MAX_CACHED_RESPONSE_BYTES:
+            cached = CachedResponse(
+                etag=etag,
+                last_modified=response.headers.get('Last-Modified') if etag else last_modified,
+                content=response.content,
+                headers={name: value for name, value in response.headers.items() if name.lower() == 'content-type'},
+            )
+            self.response_cache.set(key, cached)
+
+        return response
+
+
+_adapter: APIAdapter | None = None
+_api_url: str | None = None
+
+
+def init_app(app: Flask):
+    """Route ODP API requests through a shared ``APIAdapter``.
+
+    The adapter is mounted for the API URL on the sessions of the app's
+    ODP API clients: on each session created by the user client of
+    ``odp.ui.base`` (an authlib ``OAuth2Session``, created and closed per
+    request), via the registered OAuth client's session hook; and on the
+    session of the service client (see ``mount``). Other sessions,
+    including those used for token requests to Hydra, are unaffected.
+
+    The adapter is created once per process, with the ``API_*`` settings
+    of the first app. Under gunicorn, each worker has its own pool;
+    connections pooled by the master process before forking (e.g. by
+    cache warm-up with ``preload_app``) are discarded in the workers.
+    """
+    global _adapter, _api_url
+    app.config.setdefault('API_POOL_SIZE', 10)
+    app.config.setdefault('API_POOL_BLOCK', False)
+    app.config.setdefault('API_CONNECT_TIMEOUT', 5)
+    app.config.setdefault('API_READ_TIMEOUT', 60)
+    app.config.setdefault('API_GET_RETRIES', 2)
+    app.config.setdefault('API_RETRY_BACKOFF', 0.5)
+    app.config.setdefault('API_RESPONSE_CACHE_SIZE', 1024)
+    app.config.setdefault('API_RESPONSE_CACHE_BYTES', 64 * 1024 * 1024)
+
+    if _adapter is None:
+        _adapter = APIAdapter(
+            pool_size=app.config['API_POOL_SIZE'],
+            pool_block=app.config['API_POOL_BLOCK'],
+            timeout=(app.config['API_CONNECT_TIMEOUT'], app.config['API_READ_TIMEOUT']),
+            get_retries=app.config['API_GET_RETRIES'],
+            retry_backoff=app.config['API_RETRY_BACKOFF'],
+            response_cache_size=app.config['API_RESPONSE_CACHE_SIZE'],
+            response_cache_bytes=app.config['API_RESPONSE_CACHE_BYTES'],
+        )
+        _api_url = config.ODP.API_URL.rstrip('/') + '/'
+        os.register_at_fork(after_in_child=_adapter.reset)
+
+    if oauth := app.extensions.get('authlib.integrations.flask_client'):
+        for name in oauth._registry:
+            _mount_on_sessions(oauth.create_client(name))
+
+
+def mount(session: requests.Session) -> None:
+    """Mount the shared adapter for the API URL on ``session``."""
+    if _adapter is not None:
+        session.mount(_api_url, _adapter)
+
+
+def stats() -> dict[str, int]:
+    """Return the shared adapter's request and pool usage counters."""
+    return _adapter.stats() if _adapter else {}
+
+
+def _mount_on_sessions(oauth_client) -> None:
+    # authlib calls an OAuth client's compliance_fix on every session
+    # it creates for the client; chain ours after any configured fix
+    compliance_fix = oauth_client.compliance_fix
+
+    def mount_adapter(session):
+        if compliance_fix:
+            compliance_fix(session)
+        mount(session)
+
+    oauth_client.compliance_fix = mount_adapter
+
+
+def _digest(value: str | None) -> str | None:
+    return hashlib.sha256(value.encode()).hexdigest() if value else None
@@ -0,0 +1,67 @@
+import logging
+import os
+import re
+import tempfile
+import time
+
+from flask import Flask
+from werkzeug.datastructures import FileStorage
+
+logger = logging.getLogger(__name__)
+
+PREFIX = 'odp-admin-upload-'
+
+MAX_AGE = 86400
+"""Seconds after which an upload left in the temp directory is removed
+on startup, even if the process that saved it appears to be running."""
+
+
+def init_app(app: Flask):
+    """Remove uploads left behind by processes that have exited, e.g.
+    by jobs that were queued when the app was restarted."""
+    _sweep()
+
+
+def save(upload: FileStorage, suffix: str) -> str:
+    """Save an upload to a temporary file, and return its path. The
+    caller is responsible for removing the file once it is done with it;
+    the file name identifies this process, for removal on startup should
+    it exit first."""
+    fd, path = tempfile.mkstemp(prefix=f'{PREFIX}{os.getpid()}-', suffix=suffix)
+    with os.fdopen(fd, 'wb') as f:
+        upload.save(f)
+    return path
+
+
+def remove(path: str) -> None:
+    """Remove a saved upload, if it still exists."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _sweep() -> None:
+    tmpdir = tempfile.gettempdir()
+    for name in os.listdir(tmpdir):
+        if not (match := re.match(rf'{PREFIX}(\d+)-', name)):
+            continue
+
+        path = os.path.join(tmpdir, name)
+        try:
+            stale = not _running(int(match.group(1))) or time.time() - os.path.getmtime(path) > MAX_AGE
+            if stale:
+                os.remove(path)
+                logger.info('Removed stale upload %s', path)
+        except OSError:
+            logger.exception('Failed to remove stale upload %s', path)
+
+
+def _running(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
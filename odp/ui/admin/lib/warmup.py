@@ -0,0 +1,66 @@
+import logging
+import time
+
+from flask import Flask
+
+from odp.ui.admin.lib import cache, fanout, service
+
+logger = logging.getLogger(__name__)
+
+WARMUP_REQUESTS = (
+    ('/catalog/', {}),
+    ('/schema/', {'schema_type': 'metadata'}),
+    ('/role/', {}),
+    ('/scope/', {}),
+)
+"""Reference listings prefetched on startup, as (path, params) requests
+matching those made by views and ``populate_*_choices`` helpers."""
+
+
+def init_app(app: Flask):
+    """Prefetch shared reference listings into the reference cache, so
+    that the first requests handled by a worker find a warm cache.
+
+    Listings are fetched concurrently with the service client, and app
+    creation waits for them for up to ``WARMUP_TIMEOUT`` seconds; without
+    a service client, there is no warm-up. The calls run on a pool of
+    their own, which is shut down once they complete, so that no warm-up
+    threads are left running when, under gunicorn with ``preload_app``,
+    workers are forked from the process that created the app; the
+    workers then inherit the warm cache.
+    """
+    app.config.setdefault('WARMUP_REQUESTS', WARMUP_REQUESTS)
+    app.config.setdefault('WARMUP_TIMEOUT', 10)
+
+    if not service.enabled():
+        return
+
+    with app.app_context():
+        _warm_up(service.client(), app.config['WARMUP_REQUESTS'], app.config['WARMUP_TIMEOUT'])
+
+
+def _warm_up(client, requests: tuple[tuple[str, dict], ...], timeout: float) -> None:
+    start = time.perf_counter()
+
+    def fetch(path, params):
+        try:
+            cache.warm(path, params, client.get(path, **params))
+            return True
+        except Exception:
+            logger.exception('Cache warm-up failed for %s %s', path, params)
+            return False
+
+    pool = fanout.Pool('odp-admin-warmup', max_workers=len(requests))
+    try:
+        results = pool.run(*(
+            (path, fetch, (path, params), {})
+            for path, params in requests
+        ), timeout=timeout)
+    except TimeoutError as e:
+        logger.warning('Cache warm-up incomplete: %s', e)
+        return
+    finally:
+        pool.shutdown()
+
+    logger.info('Warmed %d of %d reference listings in %.0f ms',
+                sum(results), len(results), (time.perf_counter() - start) * 1000)
@@ -1,28 +1,76 @@
+import threading
 from importlib import import_module
 
 from flask import Flask
 
+VIEWS = (
+    'archives',
+    'catalogs',
+    'clients',
+    'collections',
+    'jobs',
+    'keywords',
+    'packages',
+    'providers',
+    'records',
+    'resources',
+    'roles',
+    'schemas',
+    'tags',
+    'users',
+    'vocabularies',
+)
+
 
 def init_app(app: Flask):
+    """Register the admin blueprints.
+
+    With ``LAZY_VIEWS`` enabled, importing the view modules (and with
+    them, the forms and WTForms) and registering their blueprints is
+    deferred until the app receives its first request, so that a worker
+    process is ready to serve as soon as it starts. The first request
+    then bears the import cost. URLs cannot be built for admin views
+    before that, or before ``load(app)`` is called.
+    """
+    app.config.setdefault('LAZY_VIEWS', False)
+
+    if app.config['LAZY_VIEWS']:
+        app.wsgi_app = _LazyViews(app, app.wsgi_app)
+    else:
+        load(app)
+
+
+def load(app: Flask):
+    """Import the view modules and register their blueprints, if this
+    has not already been done."""
+    if 'home' in app.blueprints:
+        return
+
     from . import home
 
     app.register_blueprint(home.bp)
 
-    for view in (
-            'archives',
-            'catalogs',
-            'clients',
-            'collections',
-            'keywords',
-            'packages',
-            'providers',
-            'records',
-            'resources',
-            'roles',
-            'schemas',
-            'tags',
-            'users',
-            'vocabularies'
-    ):
+    for view in VIEWS:
         mod = import_module(f'odp.ui.admin.views.{view}')
         app.register_blueprint(mod.bp, url_prefix=f'/{view}')
+
+
+class _LazyViews:
+    """WSGI middleware that loads the views before passing on the first
+    request; blueprints cannot be registered once Flask has started
+    handling requests."""
+
+    def __init__(self, app: Flask, wsgi_app):
+        self.app = app
+        self.wsgi_app = wsgi_app
+        self.loaded = False
+        self.lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        if not self.loaded:
+            with self.lock:
+                if not self.loaded:
+                    load(self.app)
+                    self.loaded = True
+
+        return self.wsgi_app(environ, start_response)
@@ -1,6 +1,7 @@
-from flask import Blueprint, render_template, request
+from flask import Blueprint, flash, redirect, render_template, request, url_for
 
 from odp.const import ODPScope
+from odp.ui.admin.lib import storage
 from odp.ui.base import api
 
 bp = Blueprint('archives', __name__)
@@ -19,3 +20,20 @@ def index():
 def detail(id):
     archive = api.get(f'/archive/{id}')
     return render_template('archive_detail.html', archive=archive)
+
+
+@bp.route('/<id>/summary')
+@api.view(ODPScope.ARCHIVE_READ, ODPScope.RESOURCE_READ_ALL)
+def summary(id):
+    """Storage summary of an archive's resources. The summary is
+    computed in the background; the page reloads until it is done."""
+    archive = api.get(f'/archive/{id}')
+    if not (storage_summary := storage.get_summary(id, refresh=request.args.get('refresh') == '1')):
+        flash('Storage summaries are not available.', category='error')
+        return redirect(url_for('.detail', id=id))
+
+    return render_template(
+        'archive_summary.html',
+        archive=archive,
+        summary=storage_summary,
+    )
@@ -1,34 +1,111 @@
-from flask import Blueprint, flash, g, redirect, render_template, request, url_for
+from datetime import date
 
-from odp.const import ODPCollectionTag, ODPScope, ODPVocabulary
+from flask import Blueprint, abort, flash, g, redirect, render_template, request, url_for
+
+from odp.const import ODPCollectionTag, ODPRecordTag, ODPScope, ODPVocabulary
 from odp.lib.client import ODPAPIError
-from odp.ui.admin.forms import CollectionForm, CollectionTagInfrastructureForm, CollectionTagProjectForm
+from odp.ui.admin.forms import (
+    AuditFilterForm, CollectionBulkTagForm, CollectionForm, CollectionTagInfrastructureForm, CollectionTagProjectForm,
+    RecordBulkTagForm,
+)
+from odp.ui.admin.lib import audit, fanout, jobs, mirror
 from odp.ui.base import api
 from odp.ui.base.lib import tags, utils
 from odp.ui.base.templates import Button, ButtonTheme, create_btn, delete_btn, edit_btn
 
 bp = Blueprint('collections', __name__)
 
+BULK_TAG_SCOPES = {
+    ODPCollectionTag.PUBLISHED: ODPScope.COLLECTION_PUBLISH,
+    ODPCollectionTag.FROZEN: ODPScope.COLLECTION_FREEZE,
+}
+"""Tags that may be applied in bulk, and the scopes required to do so."""
+
+RECORD_STATS_PAGE_SIZE = 200
+"""Number of records aggregated per record-stats request."""
+
 
 @bp.route('/')
 @api.view(ODPScope.COLLECTION_READ)
 def index():
     page = request.args.get('page', 1)
     collections = api.get('/collection/', page=page, sort='key')
+
+    bulk_tag_form = None
+    if any(scope in g.user_permissions for scope in BULK_TAG_SCOPES.values()):
+        bulk_tag_form = CollectionBulkTagForm()
+
     return render_template(
         'collection_index.html',
         collections=collections,
+        bulk_tag_form=bulk_tag_form,
         buttons=[
             create_btn(scope=ODPScope.COLLECTION_ADMIN),
         ]
     )
 
 
+@bp.route('/bulk-tag', methods=('POST',))
+@api.view(ODPScope.COLLECTION_READ)
+def bulk_tag():
+    """Apply or remove a singleton tag on the selected collections, in a job."""
+    form = CollectionBulkTagForm(request.form)
+    collection_ids = request.form.getlist('collection_id')
+
+    if not form.validate():
+        for errors in form.errors.values():
+            for error in errors:
+                flash(error, category='error')
+        return redirect(url_for('.index'))
+
+    tag_id = form.tag_id.data
+    scope = BULK_TAG_SCOPES[tag_id]
+    if scope not in g.user_permissions:
+        flash(f'You do not have permission to set {tag_id} tags.', category='error')
+        return redirect(url_for('.index'))
+
+    if not collection_ids:
+        flash('No collections selected.', category='warning')
+        return redirect(url_for('.index'))
+
+    if not (grant := jobs.grant()):
+        flash('Bulk tagging is not available.', category='error')
+        return redirect(url_for('.index'))
+
+    if form.action.data == 'apply':
+        def func(collection_id):
+            grant.authorize(scope, collection_id)
+            grant.client.post(f'/collection/{collection_id}/tag', dict(tag_id=tag_id, data={}))
+
+        title = f'Apply {tag_id} tag to collections'
+
+    else:
+        def func(collection_id):
+            grant.authorize(scope, collection_id)
+            api_route = '/collection/'
+            if grant.permits(ODPScope.COLLECTION_ADMIN, collection_id):
+                # the admin route removes a tag set by another user
+                api_route += 'admin/'
+
+            collection = grant.client.get(f'/collection/{collection_id}')
+            if collection_tag := tags.get_tag_instance(collection, tag_id):
+                grant.client.delete(f"{api_route}{collection_id}/tag/{collection_tag['id']}")
+
+        title = f'Remove {tag_id} tag from collections'
+
+    # removal re-reads the collection's tags, so an item may safely be
+    # retried; applying a tag (a POST) may not be repeated
+    job = jobs.submit(title, collection_ids, func, total=len(collection_ids), retry=form.action.data == 'remove')
+    return redirect(url_for('jobs.detail', id=job.id))
+
+
 @bp.route('/<id>')
 @api.view(ODPScope.COLLECTION_READ)
 def detail(id):
-    collection = api.get(f'/collection/{id}')
-    audit_records = api.get(f'/collection/{id}/audit')
+    collection, audit_records = fanout.get(
+        f'/collection/{id}',
+        audit.recent_request(f'/collection/{id}/audit'),
+    )
 
     publish_btn = Button(
         label='Publish',
@@ -83,7 +160,7 @@ def detail(id):
         infrastructure_tag_enabled=ODPScope.COLLECTION_INFRASTRUCTURE in g.user_permissions,
         project_tags=tags.get_tag_instances(collection, ODPCollectionTag.PROJECT),
         project_tag_enabled=ODPScope.COLLECTION_PROJECT in g.user_permissions,
-        audit_records=audit_records,
+        audit_records=audit.recent(audit_records),
         buttons=[
             edit_btn(object_id=id, scope=ODPScope.COLLECTION_ADMIN),
             publish_btn,
@@ -94,6 +171,94 @@ def detail(id):
     )
 
 
+@bp.route('/<id>/operations')
+@api.view(ODPScope.COLLECTION_READ)
+def operations(id):
+    """Record summary and bulk record operations for a collection.
+
+    Record counts are aggregated in the browser from successive
+    calls to ``record_stats``, or are computed here from the local
+    record mirror, if it is usable."""
+    collection = api.get(f'/collection/{id}')
+    catalogs = api.get('/catalog/')
+
+    counts = None
+    mirror_status = None
+    if mirror.usable() and not request.args.get('live') and mirror.readable_collections([id]):
+        counts = _record_counts(mirror.iter_records([id]))
+        mirror_status = mirror.status()
+
+    bulk_tag_form = None
+    if any(scope in g.user_permissions for scope in (
+            ODPScope.RECORD_QC, ODPScope.RECORD_NOSEARCH, ODPScope.RECORD_RETRACT,
+    )):
+        bulk_tag_form = RecordBulkTagForm()
+
+    return render_template(
+        'collection_operations.html',
+        collection=collection,
+        catalog_ids=[catalog['id'] for catalog in catalogs['items']],
+        bulk_tag_form=bulk_tag_form,
+        counts=counts,
+        mirror_status=mirror_status,
+    )
+
+
+@bp.route('/<id>/record-stats')
+# no @api.view because this is called via ajax
+def record_stats(id):
+    """Endpoint returning record counts for one page of a collection's records."""
+    page = request.args.get('page', 1, type=int)
+    try:
+        records = api.get('/record/', collection_id=id, page=page, size=RECORD_STATS_PAGE_SIZE)
+    except ODPAPIError as e:
+        abort(e.status_code, e.error_detail)
+
+    return dict(
+        page=records['page'],
+        pages=records['pages'],
+        total=records['total'],
+        counts=_record_counts(records['items']),
+    )
+
+
+def _record_counts(records) -> dict:
+    """Return validity, QC, tag and publication counts for ``records``."""
+    today = date.today().isoformat()
+    counts = dict(
+        records=0, valid=0, invalid=0, qc_passed=0, qc_failed=0, qc_none=0,
+        embargoed=0, notsearchable=0, retracted=0, published={},
+    )
+    for record in records:
+        counts['records'] += 1
+        counts['valid' if record['validity']['valid'] else 'invalid'] += 1
+
+        qc_results = [tag['data']['pass_'] for tag in record['tags'] if tag['tag_id'] == ODPRecordTag.QC]
+        if not qc_results:
+            counts['qc_none'] += 1
+        elif all(qc_results):
+            counts['qc_passed'] += 1
+        else:
+            counts['qc_failed'] += 1
+
+        if any(
+                tag['tag_id'] == ODPRecordTag.EMBARGO and
+                (tag['data'].get('start') or '') <= today <= (tag['data'].get('end') or '9999')
+                for tag in record['tags']
+        ):
+            counts['embargoed'] += 1
+
+        if tags.get_tag_instance(record, ODPRecordTag.NOTSEARCHABLE):
+            counts['notsearchable'] += 1
+        if tags.get_tag_instance(record, ODPRecordTag.RETRACTED):
+            counts['retracted'] += 1
+
+        for catalog_id in record['published_catalog_ids']:
+            counts['published'][catalog_id] = counts['published'].get(catalog_id, 0) + 1
+
+    return counts
+
+
 @bp.route('/new', methods=('GET', 'POST'))
 @api.view(ODPScope.COLLECTION_ADMIN)
 def create():
@@ -243,6 +408,20 @@ def get_new_doi(id):
         return e.error_detail
 
 
+@bp.route('/<id>/audit')
+@api.view(ODPScope.COLLECTION_READ)
+def audit_index(id):
+    collection = api.get(f'/collection/{id}')
+    audit_records, ui_filter = audit.get_page(f'/collection/{id}/audit', 'collection')
+    return render_template(
+        'collection_audit_index.html',
+        collection=collection,
+        audit_records=audit_records,
+        filter_=ui_filter,
+        filter_form=AuditFilterForm(request.args),
+    )
+
+
 @bp.route('/<id>/audit/<collection_audit_id>')
 @api.view(ODPScope.COLLECTION_READ)
 def audit_detail(id, collection_audit_id):
@@ -0,0 +1,50 @@
+from flask import Blueprint, flash, redirect, render_template, url_for
+
+from odp.ui.admin.lib import jobs
+from odp.ui.base import api
+
+bp = Blueprint('jobs', __name__)
+
+JOB_NOT_FOUND = ('Job not found. Jobs are held in the memory of the server process that runs them, '
+                 'and are lost on restart; with more than one server process, they are not found '
+                 'by requests handled by the others.')
+
+
+@bp.route('/')
+@api.view()
+def index():
+    return render_template('job_index.html', jobs=jobs.list_jobs())
+
+
+@bp.route('/<id>')
+@api.view()
+def detail(id):
+    if not (job := jobs.get(id)):
+        flash(JOB_NOT_FOUND, category='error')
+        return redirect(url_for('.index'))
+
+    return render_template('job_detail.html', job=job)
+
+
+@bp.route('/<id>/cancel', methods=('POST',))
+@api.view()
+def cancel(id):
+    if not (job := jobs.get(id)):
+        flash(JOB_NOT_FOUND, category='error')
+        return redirect(url_for('.index'))
+
+    if not job.done:
+        job.cancel()
+        flash(f'Job <b>{job.title}</b> has been cancelled.', category='success')
+
+    return redirect(url_for('.detail', id=id))
+
+
+@bp.route('/<id>/status')
+# no @api.view because this is called via ajax
+def status(id):
+    """Endpoint for polling job progress."""
+    if not (job := jobs.get(id)):
+        return {'error': JOB_NOT_FOUND}, 404
+
+    return job.to_dict()
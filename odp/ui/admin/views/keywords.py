@@ -1,6 +1,7 @@
 from flask import Blueprint, render_template, request
 
 from odp.const import ODPScope
+from odp.ui.admin.lib import pagination
 from odp.ui.base import api
 from odp.ui.base.templates import create_btn, delete_btn, edit_btn
 
@@ -11,7 +12,6 @@ bp = Blueprint('keywords', __name__)
 @api.view(ODPScope.KEYWORD_READ_ALL)
 def index():
     vocabulary_ids = request.args.getlist('vocabulary')
-    page = request.args.get('page', 1)
 
     api_filter = ''
     ui_filter = ''
@@ -19,7 +19,7 @@ def index():
         api_filter += f'&vocabulary_id={vocabulary_id}'
         ui_filter += f'&vocabulary={vocabulary_id}'
 
-    keywords = api.get(f'/keyword/?page={page}{api_filter}')
+    keywords = pagination.get_page('/keyword/', api_filter)
 
     return render_template(
         'keyword_index.html',
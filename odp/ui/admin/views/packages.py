@@ -2,26 +2,27 @@ from flask import Blueprint, abort, flash, redirect, render_template, request, u
 
 from odp.const import ODPPackageTag, ODPScope
 from odp.lib.client import ODPAPIError
-from odp.ui.admin.forms import PackageForm
+from odp.ui.admin.forms import PackageForm, ResourcePickerForm
+from odp.ui.admin.lib import fanout, membership, pagination
 from odp.ui.base import api
-from odp.ui.base.forms import ResourceSearchForm
 from odp.ui.base.lib import tags, utils
 from odp.ui.base.templates import create_btn, delete_btn, edit_btn
 
 bp = Blueprint('packages', __name__)
 
+RESOURCE_PICKER_PAGE_SIZE = 100
+RESOURCE_PICKER_MAX_SCAN = 10  # max API pages scanned per picker request
+
 
 @bp.route('/')
 @api.view(ODPScope.PACKAGE_READ_ALL)
 def index():
-    page = request.args.get('page', 1)
     provider_id = request.args.get('provider')
     ui_filter = f'&provider={provider_id}' if provider_id else ''
 
-    packages = api.get(
+    packages = pagination.get_page(
         '/package/all/',
         provider_id=provider_id,
-        page=page,
     )
 
     return render_template(
@@ -37,8 +38,15 @@ def index():
 @bp.route('/<id>')
 @api.view(ODPScope.PACKAGE_READ_ALL)
 def detail(id):
-    package = api.get(f'/package/all/{id}')
-    resources = utils.pagify(package['resources'])
+    # the package detail response embeds all of the package's resources,
+    # so its cost still grows with the package; the API offers no lighter
+    # read of a single package's fields and tags. Only the resources
+    # rendered here are paged
+    package, resources = fanout.get(
+        f'/package/all/{id}',
+        pagination.page_request('/resource/all/', package_id=id),
+    )
+    resources = pagination.cursor_page(resources)
 
     doi_tag = tags.get_tag_instance(package, ODPPackageTag.DOI)
     contrib_tags = tags.get_tag_instances(package, ODPPackageTag.CONTRIBUTOR)
@@ -60,17 +68,19 @@ def detail(id):
 @api.view(ODPScope.PACKAGE_ADMIN)
 def create():
     form = PackageForm(request.form)
+    del form.remove_resource_ids
     utils.populate_provider_choices(form.provider_id, include_none=True)
+    form.add_resource_ids.choices = _resource_choices(form.add_resource_ids.data)
 
-    resource_search_form = ResourceSearchForm()
-    utils.populate_provider_choices(resource_search_form.resource_provider_id, include_none=True)
+    resource_picker_form = ResourcePickerForm()
+    utils.populate_provider_choices(resource_picker_form.resource_provider_id, include_none=True)
 
     if request.method == 'POST' and form.validate():
         try:
             package = api.post('/package/admin/', dict(
                 provider_id=form.provider_id.data,
                 title=form.title.data,
-                resource_ids=form.resource_ids.data,
+                resource_ids=form.add_resource_ids.data,
             ))
             flash(f"Package <b>{package['title']}</b> has been created.", category='success')
             return redirect(url_for('.detail', id=package['id']))
@@ -82,17 +92,21 @@ def create():
     return render_template(
         'package_edit.html',
         form=form,
-        resource_search_form=resource_search_form,
+        resource_picker_form=resource_picker_form,
     )
 
 
 @bp.route('/<id>/edit', methods=('GET', 'POST'))
 @api.view(ODPScope.PACKAGE_ADMIN)
 def edit(id):
+    # as for detail, this read embeds all of the package's resources; it
+    # is needed in any case for the package's complete resource_ids, which
+    # the API requires on update
     package = api.get(f'/package/all/{id}')
 
-    # separate get/post form instantiation to resolve
-    # ambiguity of missing vs empty multiselect field
+    # resource membership is edited as additions to and removals from the
+    # package's current resources, so that the form lists only the first
+    # page of the package's resources; further pages are loaded on demand
     if request.method == 'POST':
         form = PackageForm(request.form)
     else:
@@ -100,21 +114,28 @@ def edit(id):
 
     utils.populate_provider_choices(form.provider_id)
 
-    # formatting of checkbox labels must match that of addResources() in the template
-    form.resource_ids.choices = [
-        (res['id'], f"{res['title']} [{res['filename']} | {res['size']} | {res['mimetype']}]")
-        for res in package['resources']
+    package_resources = _get_package_resources(id, 1)
+    listed_ids = {res['id'] for res in package_resources['items']}
+    form.remove_resource_ids.choices = [
+        (res['id'], _resource_label(res)) for res in package_resources['items']
+    ] + [
+        (res_id, res_id) for res_id in form.remove_resource_ids.data or () if res_id not in listed_ids
     ]
+    form.add_resource_ids.choices = _resource_choices(form.add_resource_ids.data)
 
-    resource_search_form = ResourceSearchForm()
-    utils.populate_provider_choices(resource_search_form.resource_provider_id)
+    resource_picker_form = ResourcePickerForm()
+    utils.populate_provider_choices(resource_picker_form.resource_provider_id)
 
     if request.method == 'POST' and form.validate():
         try:
             api.put(f'/package/admin/{id}', dict(
                 provider_id=form.provider_id.data,
                 title=(title := form.title.data),
-                resource_ids=form.resource_ids.data,
+                resource_ids=membership.apply(
+                    package['resource_ids'],
+                    add=form.add_resource_ids.data,
+                    remove=form.remove_resource_ids.data,
+                ),
             ))
             flash(f'Package <b>{title}</b> has been updated.', category='success')
             return redirect(url_for('.detail', id=id))
@@ -126,8 +147,9 @@ def edit(id):
     return render_template(
         'package_edit.html',
         package=package,
+        package_resources=package_resources,
         form=form,
-        resource_search_form=resource_search_form,
+        resource_picker_form=resource_picker_form,
     )
 
 
@@ -139,17 +161,113 @@ def delete(id):
     return redirect(url_for('.index'))
 
 
+@bp.route('/<id>/package-resources')
+# no @api.view because this is called via ajax
+def fetch_package_resources(id):
+    """Endpoint for loading further pages of a package's current
+    resources into the edit form's removal list."""
+    try:
+        result = _get_package_resources(id, request.args.get('page', 1, type=int))
+    except ODPAPIError as e:
+        abort(e.status_code, e.error_detail)
+
+    return dict(
+        items=[{'id': res['id'], 'label': _resource_label(res)} for res in result['items']],
+        page=result['page'],
+        pages=result['pages'],
+        total=result['total'],
+    )
+
+
+def _get_package_resources(package_id, page):
+    return api.get(
+        '/resource/all/',
+        package_id=package_id,
+        page=page,
+        size=RESOURCE_PICKER_PAGE_SIZE,
+    )
+
+
+def _resource_choices(selected_ids: list[str] | None) -> list[tuple[str, str]]:
+    """Return checkbox choices for resources added in the popup but not
+    yet saved, labelled as they were in the popup.
+
+    The edit form posts each added resource's label alongside its id, as
+    ``resource-label-<id>``, so that re-rendering the form requires no
+    resource lookups. Labels are for display only; an id posted without
+    a label is shown as is.
+    """
+    return [
+        (res_id, request.form.get(f'resource-label-{res_id}') or res_id)
+        for res_id in selected_ids or ()
+    ]
+
+
+def _resource_label(resource):
+    # formatting must match that of resourceLabel() in the edit template
+    return f"{resource['title']} [{resource['filename']} | {resource['size']} | {resource['mimetype']}]"
+
+
 @bp.route('/fetch-resources/<provider_id>')
 # no @api.view because this is called via ajax
 def fetch_resources(provider_id):
-    """Endpoint for populating resource selection popup."""
-    include_packaged = request.args.get('include_packaged')
+    """Endpoint for populating resource selection popup.
+
+    Returns up to ``RESOURCE_PICKER_PAGE_SIZE`` of the provider's resources
+    matching the filename, mimetype and size filters, along with a cursor
+    from which to continue the search (null when there are no more).
+    Filters are applied here while walking API pages, and a single request
+    scans at most ``RESOURCE_PICKER_MAX_SCAN`` pages, so it may return fewer
+    items than requested with a non-null cursor.
+    """
     try:
-        return api.get(
-            '/resource/all/',
-            provider_id=provider_id,
-            exclude_packaged=not include_packaged,
-            size=0,
+        page, offset = map(int, request.args.get('cursor', '1.0').split('.'))
+    except ValueError:
+        abort(400, 'Invalid cursor')
+
+    include_packaged = request.args.get('include_packaged')
+    filename = request.args.get('filename', '').lower()
+    mimetype = request.args.get('mimetype', '').lower()
+    min_size = request.args.get('min_size', type=int)
+    max_size = request.args.get('max_size', type=int)
+
+    def match(resource):
+        return (
+                (not filename or filename in (resource['filename'] or '').lower()) and
+                (not mimetype or (resource['mimetype'] or '').lower().startswith(mimetype)) and
+                (min_size is None or (resource['size'] or 0) >= min_size) and
+                (max_size is None or (resource['size'] or 0) <= max_size)
         )
+
+    items = []
+    cursor = None
+    try:
+        for _ in range(RESOURCE_PICKER_MAX_SCAN):
+            result = api.get(
+                '/resource/all/',
+                provider_id=provider_id,
+                exclude_packaged=not include_packaged,
+                page=page,
+                size=RESOURCE_PICKER_PAGE_SIZE,
+            )
+            for index, resource in enumerate(result['items'][offset:], start=offset):
+                if match(resource):
+                    items += [{
+                        key: resource[key] for key in ('id', 'title', 'filename', 'size', 'mimetype')
+                    }]
+                    if len(items) == RESOURCE_PICKER_PAGE_SIZE:
+                        cursor = f'{page}.{index + 1}'
+                        break
+
+            if cursor or page >= result['pages']:
+                break
+
+            page += 1
+            offset = 0
+        else:
+            cursor = f'{page}.0'
+
     except ODPAPIError as e:
         abort(e.status_code, e.error_detail)
+
+    return dict(items=items, cursor=cursor)
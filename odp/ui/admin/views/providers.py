@@ -1,14 +1,19 @@
+from math import ceil
+
 from flask import Blueprint, abort, flash, redirect, render_template, request, url_for
 
 from odp.const import ODPScope
 from odp.lib.client import ODPAPIError
-from odp.ui.admin.forms import ProviderForm, UserFilterForm
+from odp.ui.admin.forms import AuditFilterForm, ProviderForm, UserFilterForm
+from odp.ui.admin.lib import audit, fanout, membership
 from odp.ui.base import api
 from odp.ui.base.lib import utils
 from odp.ui.base.templates import create_btn, delete_btn, edit_btn
 
 bp = Blueprint('providers', __name__)
 
+USER_PICKER_PAGE_SIZE = 50
+
 
 @bp.route('/')
 @api.view(ODPScope.PROVIDER_READ_ALL)
@@ -27,12 +32,14 @@ def index():
 @bp.route('/<id>')
 @api.view(ODPScope.PROVIDER_READ_ALL)
 def detail(id):
-    provider = api.get(f'/provider/all/{id}')
-    audit_records = api.get(f'/provider/{id}/audit')
+    provider, audit_records = fanout.get(
+        f'/provider/all/{id}',
+        audit.recent_request(f'/provider/{id}/audit'),
+    )
     return render_template(
         'provider_detail.html',
         provider=provider,
-        audit_records=audit_records,
+        audit_records=audit.recent(audit_records),
         buttons=[
             edit_btn(object_id=id, scope=ODPScope.PROVIDER_ADMIN),
             delete_btn(object_id=id, scope=ODPScope.PROVIDER_ADMIN, prompt_args=(id,)),
@@ -40,6 +47,20 @@ def detail(id):
     )
 
 
+@bp.route('/<id>/audit')
+@api.view(ODPScope.PROVIDER_READ_ALL)
+def audit_index(id):
+    provider = api.get(f'/provider/all/{id}')
+    audit_records, ui_filter = audit.get_page(f'/provider/{id}/audit', 'provider')
+    return render_template(
+        'provider_audit_index.html',
+        provider=provider,
+        audit_records=audit_records,
+        filter_=ui_filter,
+        filter_form=AuditFilterForm(request.args),
+    )
+
+
 @bp.route('/<id>/audit/<audit_id>')
 @api.view(ODPScope.PROVIDER_READ)
 def audit_detail(id, audit_id):
@@ -51,6 +72,8 @@ def audit_detail(id, audit_id):
 @api.view(ODPScope.PROVIDER_ADMIN)
 def create():
     form = ProviderForm(request.form)
+    form.add_user_ids.choices = _user_choices(form.add_user_ids.data)
+    del form.remove_user_ids
     user_filter_form = UserFilterForm()
     utils.populate_role_choices(user_filter_form.role, include_none=True)
 
@@ -59,7 +82,7 @@ def create():
             provider = api.post('/provider/', dict(
                 key=(key := form.key.data),
                 name=form.name.data,
-                user_ids=form.user_ids.data,
+                user_ids=form.add_user_ids.data,
             ))
             flash(f'Provider {key} has been created.', category='success')
             return redirect(url_for('.detail', id=provider['id']))
@@ -80,8 +103,8 @@ def create():
 def edit(id):
     provider = api.get(f'/provider/all/{id}')
 
-    # separate get/post form instantiation to resolve
-    # ambiguity of missing vs empty multiselect field
+    # user membership is edited as additions to and removals from the
+    # provider's current users, and saved after a preview of the changes
     if request.method == 'POST':
         form = ProviderForm(request.form)
     else:
@@ -90,19 +113,35 @@ def edit(id):
     user_filter_form = UserFilterForm()
     utils.populate_role_choices(user_filter_form.role, include_none=True)
 
-    users = api.get(f'/user/', provider_id=id, size=0)  # don't paginate
-    # formatting of checkbox labels must match that of addUsers() in the template
-    form.user_ids.choices = [
-        (user['id'], f"{user['name']} | {user['email']}")
-        for user in users['items']
+    # only the first page of current users is listed for removal; further
+    # pages, or users matching a search, are loaded on demand
+    members = _member_page(provider, 1)
+    listed_ids = {user_id for user_id, _ in members['items']}
+    form.remove_user_ids.choices = members['items'] + [
+        (user_id, provider['user_names'].get(user_id, user_id))
+        for user_id in form.remove_user_ids.data or () if user_id not in listed_ids
     ]
+    form.add_user_ids.choices = _user_choices(form.add_user_ids.data)
 
     if request.method == 'POST' and form.validate():
+        if not membership.confirmed():
+            return render_template(
+                'membership_preview.html',
+                title=f"Provider: {provider['name']}",
+                changes=membership.field_changes(form, provider, 'key', 'name'),
+                deltas=[
+                    membership.delta('Users', provider['user_names'], form.add_user_ids, form.remove_user_ids),
+                ],
+            )
         try:
             api.put(f'/provider/{id}', dict(
                 key=(key := form.key.data),
                 name=form.name.data,
-                user_ids=form.user_ids.data,
+                user_ids=membership.apply(
+                    provider['user_names'],
+                    add=form.add_user_ids.data,
+                    remove=form.remove_user_ids.data,
+                ),
             ))
             flash(f'Provider {key} has been updated.', category='success')
             return redirect(url_for('.detail', id=id))
@@ -114,6 +153,7 @@ def edit(id):
     return render_template(
         'provider_edit.html',
         provider=provider,
+        members=members,
         form=form,
         user_filter_form=user_filter_form,
     )
@@ -130,13 +170,65 @@ def delete(id):
 @bp.route('/fetch-users')
 # no @api.view because this is called via ajax
 def fetch_users():
-    """Endpoint for populating user selection popup."""
+    """Endpoint for populating user selection popup, one page at a time."""
     try:
         return api.get(
             '/user/',
             text_query=request.args.get('q'),
             role_id=request.args.get('role'),
-            size=0,
+            page=request.args.get('page', 1),
+            size=USER_PICKER_PAGE_SIZE,
         )
     except ODPAPIError as e:
         abort(e.status_code, e.error_detail)
+
+
+@bp.route('/<id>/members')
+# no @api.view because this is called via ajax
+def fetch_members(id):
+    """Endpoint for loading further pages of a provider's current users,
+    optionally matching a search on name, into the edit form's removal list."""
+    try:
+        provider = api.get(f'/provider/all/{id}')
+    except ODPAPIError as e:
+        abort(e.status_code, e.error_detail)
+
+    result = _member_page(provider, request.args.get('page', 1, type=int), request.args.get('q'))
+    return result | dict(items=[{'id': user_id, 'label': name} for user_id, name in result['items']])
+
+
+def _member_page(provider: dict, page: int, q: str = None) -> dict:
+    """Return a page of the provider's current users, as (id, name)
+    choices ordered by name, optionally limited to names containing ``q``.
+
+    The provider detail includes the names of all its users, so this
+    requires no user lookups; paging limits only what is rendered.
+    """
+    members = sorted(provider['user_names'].items(), key=lambda item: (item[1] or '').lower())
+    if q := (q or '').strip().lower():
+        members = [(user_id, name) for user_id, name in members if q in (name or '').lower()]
+
+    start = (page - 1) * USER_PICKER_PAGE_SIZE
+    return dict(
+        items=members[start:start + USER_PICKER_PAGE_SIZE],
+        total=len(members),
+        page=page,
+        pages=max(1, ceil(len(members) / USER_PICKER_PAGE_SIZE)),
+    )
+
+
+def _user_choices(selected_ids: list[str] | None) -> list[tuple[str, str]]:
+    """Return checkbox choices for users added in the popup but not yet
+    saved, labelled as they were in the popup.
+
+    The edit form posts each added user's label alongside its id, as
+    ``user-label-<id>``, so that re-rendering the form -- or a preview of
+    the changes -- requires no user lookups. Labels are for display only;
+    an id posted without a label is shown as is.
+
+    Formatting of checkbox labels must match that of addUsers() in the template.
+    """
+    return [
+        (user_id, request.form.get(f'user-label-{user_id}') or user_id)
+        for user_id in selected_ids or ()
+    ]
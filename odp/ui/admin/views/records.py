@@ -1,52 +1,101 @@
+import csv
+import io
 import json
+import os
+import re
+import zipfile
+from urllib.parse import quote
 
-from flask import Blueprint, flash, g, redirect, render_template, request, url_for
+from flask import Blueprint, Response, abort, flash, g, redirect, render_template, request, stream_with_context, url_for
+from werkzeug.datastructures import CombinedMultiDict
 
-from odp.const import ODPCollectionTag, ODPRecordTag, ODPScope
+from odp.const import DOI_REGEX, ODPCollectionTag, ODPRecordTag, ODPScope, SID_REGEX
 from odp.lib.client import ODPAPIError
-from odp.ui.admin.forms import RecordFilterForm, RecordForm, RecordTagEmbargoForm, RecordTagNoteForm, RecordTagQCForm
+from odp.ui.admin.forms import (
+    AuditFilterForm, RecordBulkDeleteForm, RecordBulkTagForm, RecordFilterForm, RecordForm, RecordImportForm, RecordTagEmbargoForm,
+    RecordTagNoteForm, RecordTagQCForm,
+)
+from odp.ui.admin.lib import audit, fanout, jobs, mirror, pagination, search, uploads
 from odp.ui.base import api
 from odp.ui.base.lib import tags, utils
 from odp.ui.base.templates import Button, ButtonTheme, create_btn, delete_btn, edit_btn
 
 bp = Blueprint('records', __name__)
 
+BULK_TAG_SCOPES = {
+    ODPRecordTag.QC: ODPScope.RECORD_QC,
+    ODPRecordTag.EMBARGO: ODPScope.RECORD_EMBARGO,
+    ODPRecordTag.NOTSEARCHABLE: ODPScope.RECORD_NOSEARCH,
+    ODPRecordTag.RETRACTED: ODPScope.RECORD_RETRACT,
+}
+"""Tags that may be applied in bulk, and the scopes required to do so."""
+
+BULK_PAGE_SIZE = 100
+"""API page size used when iterating over all records matching a filter."""
+
+IMPORT_SUFFIXES = ('.json', '.jsonl', '.ndjson')
+"""Importable file types, other than zip files of these."""
+
+IMPORT_MAX_JSON_SIZE = 16 * 1024 ** 2
+"""Maximum size in bytes of a JSON (not JSON Lines) import file or zip
+member; such a file is parsed whole, whereas JSON Lines are parsed a line
+at a time."""
+
+IMPORT_MAX_ZIP_MEMBERS = 1000
+"""Maximum number of importable files in an import zip."""
+
+IMPORT_MAX_ZIP_SIZE = 1024 ** 3
+"""Maximum total uncompressed size in bytes of the importable files in
+an import zip."""
+
+EXPORT_FIELDS = (
+    'id', 'doi', 'sid', 'title', 'collection_id', 'collection_key', 'schema_id',
+    'valid', 'published_catalog_ids', 'timestamp',
+)
+"""Columns of a CSV record export."""
+
 
 @bp.route('/')
 @api.view(ODPScope.RECORD_READ)
 def index():
-    page = request.args.get('page', 1)
-    id_q = request.args.get('id_q')
-    title_q = request.args.get('title_q')
-    collection_ids = request.args.getlist('collection')
-    parent_id = request.args.get('parent')
-
-    api_filter = ''
-    ui_filter = ''
-    if id_q:
-        api_filter += f'&identifier_q={id_q}'
-        ui_filter += f'&id_q={id_q}'
-    if title_q:
-        api_filter += f'&title_q={title_q}'
-        ui_filter += f'&title_q={title_q}'
-    for collection_id in collection_ids:
-        api_filter += f'&collection_id={collection_id}'
-        ui_filter += f'&collection={collection_id}'
-    if parent_id:
-        api_filter += f'&parent_id={parent_id}'
-        ui_filter += f'&parent={parent_id}'
+    api_filter, ui_filter = _filters(request.args)
 
     filter_form = RecordFilterForm(request.args)
     # utils.populate_collection_choices(filter_form.collection)  # unused
 
-    records = api.get(f'/record/?page={page}{api_filter}')
+    # search mode: full-text search of the local index, if enabled
+    search_status = None
+    mirror_status = None
+    if search.enabled() and (search_q := request.args.get('q')):
+        records = search.search(search_q, request.args.getlist('collection'), request.args.get('page', 1, type=int))
+        ui_filter += f'&q={quote(search_q)}'
+        search_status = search.status()
+    elif _use_mirror(request.args):
+        records = pagination.cursor_page(mirror.list_records(
+            request.args.getlist('collection'), request.args.get('parent'), request.args.get('cursor'),
+        ))
+        mirror_status = mirror.status()
+    else:
+        records = pagination.get_page('/record/', api_filter)
+
     catalogs = api.get('/catalog/')
 
+    bulk_tag_form = None
+    bulk_delete_enabled = ODPScope.RECORD_WRITE in g.user_permissions
+    if bulk_delete_enabled or any(scope in g.user_permissions for scope in BULK_TAG_SCOPES.values()):
+        bulk_tag_form = RecordBulkTagForm()
+
     return render_template(
         'record_index.html',
         records=records,
         filter_=ui_filter,
         filter_form=filter_form,
+        search_enabled=search.enabled(),
+        search_status=search_status,
+        mirror_status=mirror_status,
+        bulk_tag_form=bulk_tag_form,
+        bulk_delete_enabled=bulk_delete_enabled,
+        import_enabled=ODPScope.RECORD_WRITE in g.user_permissions,
         buttons=[
             create_btn(scope=ODPScope.RECORD_WRITE),
         ],
@@ -56,13 +105,217 @@ def index():
     )
 
 
+@bp.route('/bulk-tag', methods=('POST',))
+@api.view(ODPScope.RECORD_READ)
+def bulk_tag():
+    """Apply or remove a tag on selected records, or on all records
+    matching the filter from which the form was submitted, in a job."""
+    form = RecordBulkTagForm(request.form)
+    api_filter, ui_filter = _filters(request.form)
+    index_url = url_for('.index') + '?' + ui_filter.lstrip('&')
+
+    if not form.validate():
+        for errors in form.errors.values():
+            for error in errors:
+                flash(error, category='error')
+        return redirect(index_url)
+
+    tag_id = form.tag_id.data
+    scope = BULK_TAG_SCOPES[tag_id]
+    if scope not in g.user_permissions:
+        flash(f'You do not have permission to set {tag_id} tags.', category='error')
+        return redirect(index_url)
+
+    if not (grant := jobs.grant()):
+        flash('Bulk tagging is not available.', category='error')
+        return redirect(index_url)
+
+    if form.select_all.data:
+        record_ids = _iter_record_ids(grant, api_filter)
+        total = None
+    elif record_ids := request.form.getlist('record_id'):
+        total = len(record_ids)
+    else:
+        flash('No records selected.', category='warning')
+        return redirect(index_url)
+
+    if form.action.data == 'apply':
+        if tag_id == ODPRecordTag.QC:
+            data = {'pass_': form.pass_.data, 'comment': form.comment.data}
+        elif tag_id == ODPRecordTag.EMBARGO:
+            data = {
+                'start': form.start.data.isoformat(),
+                'end': form.end.data.isoformat() if form.end.data else None,
+                'comment': form.comment.data,
+            }
+        else:
+            data = {}
+
+        def func(record_id):
+            record = grant.client.get(f'/record/{record_id}')
+            grant.authorize(scope, record['collection_id'])
+            grant.client.post(f'/record/{record_id}/tag', dict(tag_id=tag_id, data=data))
+
+        title = f'Apply {tag_id} tag to records'
+
+    else:
+        api_route = '/record/'
+        if ODPScope.RECORD_ADMIN in g.user_permissions:
+            api_route += 'admin/'
+
+        def func(record_id):
+            record = grant.client.get(f'/record/{record_id}')
+            grant.authorize(scope, record['collection_id'])
+            for record_tag in tags.get_tag_instances(record, tag_id)['items']:
+                grant.client.delete(f"{api_route}{record_id}/tag/{record_tag['id']}")
+
+        title = f'Remove {tag_id} tag from records'
+
+    # removal re-reads the record's tags, so an item may safely be retried;
+    # applying a tag (a POST) may not be repeated
+    job = jobs.submit(title, record_ids, func, total=total, retry=form.action.data == 'remove')
+    return redirect(url_for('jobs.detail', id=job.id))
+
+
+@bp.route('/bulk-delete', methods=('POST',))
+@api.view(ODPScope.RECORD_WRITE)
+def bulk_delete():
+    """Delete selected records, or all records matching the filter
+    from which the form was submitted, in a job.
+
+    Deleting all records matching a filter requires a filter, and is
+    confirmed on a page showing the filter and the number of matching
+    records.
+    """
+    form = RecordBulkDeleteForm(request.form)
+    api_filter, ui_filter = _filters(request.form)
+    index_url = url_for('.index') + '?' + ui_filter.lstrip('&')
+
+    if not form.validate():
+        for errors in form.errors.values():
+            for error in errors:
+                flash(error, category='error')
+        return redirect(index_url)
+
+    if not (grant := jobs.grant()):
+        flash('Bulk deletion is not available.', category='error')
+        return redirect(index_url)
+
+    if form.select_all.data:
+        if not api_filter:
+            flash('Filter the records to delete before selecting all records.', category='error')
+            return redirect(index_url)
+
+        if 'confirm' not in request.form:
+            return render_template(
+                'record_bulk_delete.html',
+                filters=_filter_descriptions(request.form),
+                total=api.get(f'/record/?page=1&size=1{api_filter}')['total'],
+                index_url=index_url,
+            )
+
+        # deleting records shifts later pages of the listing,
+        # so all ids are collected before any are deleted
+        record_ids = _collect(_iter_record_ids(grant, api_filter))
+        total = None
+    elif record_ids := request.form.getlist('record_id'):
+        total = len(record_ids)
+    else:
+        flash('No records selected.', category='warning')
+        return redirect(index_url)
+
+    api_route = '/record/'
+    scope = ODPScope.RECORD_WRITE
+    if ODPScope.RECORD_ADMIN in g.user_permissions:
+        api_route += 'admin/'
+        scope = ODPScope.RECORD_ADMIN
+
+    def func(record_id):
+        record = grant.client.get(f'/record/{record_id}')
+        grant.authorize(scope, record['collection_id'])
+        grant.client.delete(api_route + record_id)
+
+    job = jobs.submit('Delete records', record_ids, func, total=total, retry=True)
+    return redirect(url_for('jobs.detail', id=job.id))
+
+
+@bp.route('/export')
+@api.view(ODPScope.RECORD_READ)
+def export():
+    """Stream all records matching the index filter params, as CSV
+    (``format=csv``, the default) or JSON Lines (``format=jsonl``).
+
+    API pages are fetched as the response is written, so memory use is
+    independent of the number of records. The first page is fetched
+    before the response starts, so that API errors are handled as usual.
+    An error on a later page ends the export with an error line (a CSV
+    comment, or a JSON object with an ``error`` key), and then aborts
+    the response, so that the download is not mistaken for complete.
+    Records are read from the local mirror instead, if it is usable.
+    """
+    export_format = request.args.get('format', 'csv')
+    if export_format not in ('csv', 'jsonl'):
+        abort(400, 'Unsupported export format')
+
+    api_filter, _ = _filters(request.args)
+    if _use_mirror(request.args):
+        records = mirror.iter_records(request.args.getlist('collection'), request.args.get('parent'))
+    else:
+        records = _iter_records(api_filter)
+    first_record = next(records, None)
+
+    def generate_csv():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        def row(values):
+            writer.writerow(values)
+            line = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            return line
+
+        yield row(EXPORT_FIELDS)
+        if first_record:
+            yield row(_export_row(first_record))
+            try:
+                for record in records:
+                    yield row(_export_row(record))
+            except Exception as e:
+                yield f'# ERROR: export incomplete: {_export_error(e)}\n'
+                raise
+
+    def generate_jsonl():
+        if first_record:
+            yield json.dumps(first_record) + '\n'
+            try:
+                for record in records:
+                    yield json.dumps(record) + '\n'
+            except Exception as e:
+                yield json.dumps({'error': f'export incomplete: {_export_error(e)}'}) + '\n'
+                raise
+
+    if export_format == 'csv':
+        generate, mimetype = generate_csv, 'text/csv'
+    else:
+        generate, mimetype = generate_jsonl, 'application/x-ndjson'
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename=records.{export_format}'},
+    )
+
+
 @bp.route('/<id>')
 @api.view(ODPScope.RECORD_READ)
 def detail(id):
-    record = api.get(f'/record/{id}')
-    catalog_records = api.get(f'/record/{id}/catalog')
-    audit_records = api.get(f'/record/{id}/audit')
-    catalogs = api.get('/catalog/')
+    # catalogue records, audit log and metadata are loaded on tab activation;
+    # the catalog list is normally served from the reference cache
+    record, catalogs = fanout.get(
+        f'/record/{id}',
+        '/catalog/',
+    )
 
     nosearch_btn = Button(
         label='No search',
@@ -105,8 +358,6 @@ def detail(id):
         embargo_tag_enabled=ODPScope.RECORD_EMBARGO in g.user_permissions,
         note_tags=tags.get_tag_instances(record, ODPRecordTag.NOTE),
         note_tag_enabled=ODPScope.RECORD_NOTE in g.user_permissions,
-        catalog_records=catalog_records,
-        audit_records=audit_records,
         buttons=[
             edit_btn(object_id=id, scope=ODPScope.RECORD_WRITE),
             nosearch_btn,
@@ -121,6 +372,43 @@ def detail(id):
     )
 
 
+@bp.route('/<id>/fragment/metadata')
+# no @api.view because this is called via ajax
+def metadata_fragment(id):
+    """Endpoint for lazy loading the record detail Metadata tab."""
+    try:
+        record = api.get(f'/record/{id}')
+    except ODPAPIError as e:
+        abort(e.status_code, e.error_detail)
+
+    return render_template('record_metadata.html', record=record)
+
+
+@bp.route('/<id>/fragment/catalog')
+# no @api.view because this is called via ajax
+def catalog_fragment(id):
+    """Endpoint for lazy loading the record detail Catalogue Records tab."""
+    try:
+        catalog_records = api.get(f'/record/{id}/catalog')
+    except ODPAPIError as e:
+        abort(e.status_code, e.error_detail)
+
+    return render_template('record_catalog_records.html', record_id=id, catalog_records=catalog_records)
+
+
+@bp.route('/<id>/fragment/audit')
+# no @api.view because this is called via ajax
+def audit_fragment(id):
+    """Endpoint for lazy loading the record detail Audit Log tab."""
+    try:
+        path, params = audit.recent_request(f'/record/{id}/audit')
+        audit_records = audit.recent(api.get(path, **params))
+    except ODPAPIError as e:
+        abort(e.status_code, e.error_detail)
+
+    return render_template('record_audit_log.html', record_id=id, audit_records=audit_records)
+
+
 @bp.route('/new', methods=('GET', 'POST'))
 @api.view(ODPScope.RECORD_WRITE)
 def create():
@@ -151,6 +439,82 @@ def create():
     return render_template('record_edit.html', form=form)
 
 
+@bp.route('/import', methods=('GET', 'POST'))
+@api.view(ODPScope.RECORD_WRITE)
+def import_():
+    """Create records from an uploaded file of metadata documents, in a job.
+
+    The file may be a JSON object or array, JSON Lines, or a zip of such
+    files. Each document is either a metadata object, taking its DOI from
+    ``metadata['doi']``, or an object with ``metadata`` and optional
+    ``doi`` and ``sid`` keys. The upload is saved to a temporary file,
+    from which documents are read lazily by the job; each one is parsed,
+    validated and posted by the job's worker pool. The file is removed
+    when the job finishes or is cancelled, or, failing that, when the
+    app next starts.
+
+    JSON files (including zip members) are limited to
+    ``IMPORT_MAX_JSON_SIZE``, since they are parsed whole; larger sets of
+    documents must be uploaded as JSON Lines. Zip files are limited to
+    ``IMPORT_MAX_ZIP_MEMBERS`` importable files, of
+    ``IMPORT_MAX_ZIP_SIZE`` in total.
+    """
+    form = RecordImportForm(CombinedMultiDict((request.form, request.files)))
+    utils.populate_collection_choices(form.collection_id, include_none=True)
+    utils.populate_metadata_schema_choices(form.schema_id)
+
+    if request.method == 'POST' and form.validate():
+        upload = request.files['file']
+        suffix = os.path.splitext(upload.filename)[1].lower()
+        if suffix not in IMPORT_SUFFIXES + ('.zip',):
+            flash('Unsupported file type.', category='error')
+            return render_template('record_import.html', form=form)
+
+        api_route = '/record/'
+        scope = ODPScope.RECORD_WRITE
+        if ODPScope.RECORD_ADMIN in g.user_permissions:
+            api_route += 'admin/'
+            scope = ODPScope.RECORD_ADMIN
+
+        collection_id = form.collection_id.data
+        if not (grant := jobs.grant()):
+            flash('Record import is not available.', category='error')
+            return render_template('record_import.html', form=form)
+
+        if not grant.permits(scope, collection_id):
+            flash('You do not have permission to create records in this collection.', category='error')
+            return render_template('record_import.html', form=form)
+
+        path = uploads.save(upload, suffix)
+        if error := _check_import_file(path, suffix):
+            uploads.remove(path)
+            flash(error, category='error')
+            return render_template('record_import.html', form=form)
+
+        schema_id = form.schema_id.data
+        validate_only = form.validate_only.data
+
+        def func(document):
+            _, text = document
+            record = _import_record(text)
+            if validate_only:
+                return 'valid'
+
+            record = grant.client.post(api_route, record | dict(collection_id=collection_id, schema_id=schema_id))
+            return record['doi'] or record['sid']
+
+        job = jobs.submit(
+            f"{'Validate' if validate_only else 'Import'} records from {upload.filename}",
+            _iter_import_documents(path, upload.filename),
+            func,
+            label=lambda document: document[0],
+            cleanup=lambda: uploads.remove(path),
+        )
+        return redirect(url_for('jobs.detail', id=job.id))
+
+    return render_template('record_import.html', form=form)
+
+
 @bp.route('/<id>/edit', methods=('GET', 'POST'))
 @api.view(ODPScope.RECORD_WRITE)
 def edit(id):
@@ -371,6 +735,20 @@ def catalog_detail(id, catalog_id):
     return render_template('record_catalog_detail.html', catalog_record=catalog_record)
 
 
+@bp.route('/<id>/audit')
+@api.view(ODPScope.RECORD_READ)
+def audit_index(id):
+    record = api.get(f'/record/{id}')
+    audit_records, ui_filter = audit.get_page(f'/record/{id}/audit', 'record')
+    return render_template(
+        'record_audit_index.html',
+        record=record,
+        audit_records=audit_records,
+        filter_=ui_filter,
+        filter_form=AuditFilterForm(request.args),
+    )
+
+
 @bp.route('/<id>/audit/<record_audit_id>')
 @api.view(ODPScope.RECORD_READ)
 def audit_detail(id, record_audit_id):
@@ -383,3 +761,199 @@ def audit_detail(id, record_audit_id):
 def tag_audit_detail(id, record_tag_audit_id):
     record_tag_audit = api.get(f'/record/{id}/record_tag_audit/{record_tag_audit_id}')
     return render_template('record_tag_audit_detail.html', audit=record_tag_audit)
+
+
+def _filters(args) -> tuple[str, str]:
+    """Return the API and UI query string filters for the record
+    filter params in ``args`` (request args or form data)."""
+    id_q = args.get('id_q')
+    title_q = args.get('title_q')
+    collection_ids = args.getlist('collection')
+    parent_id = args.get('parent')
+
+    api_filter = ''
+    ui_filter = ''
+    if id_q:
+        api_filter += f'&identifier_q={id_q}'
+        ui_filter += f'&id_q={id_q}'
+    if title_q:
+        api_filter += f'&title_q={title_q}'
+        ui_filter += f'&title_q={title_q}'
+    for collection_id in collection_ids:
+        api_filter += f'&collection_id={collection_id}'
+        ui_filter += f'&collection={collection_id}'
+    if parent_id:
+        api_filter += f'&parent_id={parent_id}'
+        ui_filter += f'&parent={parent_id}'
+    if args.get('live'):
+        ui_filter += '&live=1'
+
+    return api_filter, ui_filter
+
+
+def _filter_descriptions(args) -> list[tuple[str, str]]:
+    """Return (label, value) descriptions of the record filter params
+    in ``args``, as applied by ``_filters``."""
+    descriptions = []
+    if id_q := args.get('id_q'):
+        descriptions += [('ID / DOI', id_q)]
+    if title_q := args.get('title_q'):
+        descriptions += [('Title', title_q)]
+    for collection_id in args.getlist('collection'):
+        descriptions += [('Collection', collection_id)]
+    if parent_id := args.get('parent'):
+        descriptions += [('Parent record', parent_id)]
+    return descriptions
+
+
+def _use_mirror(args) -> bool:
+    """Return True if records matching the filter params in ``args``
+    may be read from the local mirror; text queries are left to the API,
+    and ``live`` bypasses the mirror."""
+    return mirror.usable() and not (args.get('live') or args.get('id_q') or args.get('title_q'))
+
+
+def _iter_records(api_filter: str, client=api):
+    """Lazily page through all records matching ``api_filter``, using
+    ``client`` (by default, the current user's API client)."""
+    page = 1
+    while True:
+        result = client.get(f'/record/?page={page}&size={BULK_PAGE_SIZE}{api_filter}')
+        yield from result['items']
+        if page >= result['pages']:
+            break
+        page += 1
+
+
+def _iter_record_ids(grant: jobs.Grant, api_filter: str):
+    """Lazily page through the ids of all records matching ``api_filter``
+    that the grant's user may read."""
+    for record in _iter_records(api_filter, grant.client):
+        if grant.permits(ODPScope.RECORD_READ, record['collection_id']):
+            yield record['id']
+
+
+def _collect(items):
+    """Exhaust ``items`` before yielding any of them; the job that
+    consumes this generator does so in its own thread."""
+    yield from list(items)
+
+
+def _export_error(e: Exception) -> str:
+    if isinstance(e, ODPAPIError):
+        return f'{e.status_code}: {e.error_detail}'
+    return 'internal error'
+
+
+def _export_row(record: dict) -> list:
+    metadata = record['metadata'] or {}
+    title = metadata.get('title')
+    if title is None and (titles := metadata.get('titles')):
+        title = titles[0].get('title')
+
+    return [
+        record['id'],
+        record['doi'],
+        record['sid'],
+        title,
+        record['collection_id'],
+        record['collection_key'],
+        record['schema_id'],
+        record['validity']['valid'],
+        ';'.join(record['published_catalog_ids']),
+        record['timestamp'],
+    ]
+
+
+def _check_import_file(path: str, suffix: str) -> str | None:
+    """Return an error message if a saved import file exceeds the import
+    limits, or is not a valid zip file."""
+    max_json_mb = IMPORT_MAX_JSON_SIZE // 1024 ** 2
+    if suffix == '.json' and os.path.getsize(path) > IMPORT_MAX_JSON_SIZE:
+        return f'JSON files are limited to {max_json_mb} MB; upload larger files as JSON Lines.'
+
+    if suffix == '.zip':
+        try:
+            with zipfile.ZipFile(path) as zf:
+                members = [info for info in zf.infolist() if _importable(info)]
+        except zipfile.BadZipFile:
+            return 'Invalid zip file.'
+
+        if len(members) > IMPORT_MAX_ZIP_MEMBERS:
+            return f'Zip files are limited to {IMPORT_MAX_ZIP_MEMBERS} files.'
+        if sum(info.file_size for info in members) > IMPORT_MAX_ZIP_SIZE:
+            return f'Zip files are limited to {IMPORT_MAX_ZIP_SIZE // 1024 ** 2} MB uncompressed.'
+        if any(info.filename.lower().endswith('.json') and info.file_size > IMPORT_MAX_JSON_SIZE for info in members):
+            return f'JSON files are limited to {max_json_mb} MB; upload larger files as JSON Lines.'
+
+
+def _importable(info: zipfile.ZipInfo) -> bool:
+    return not info.is_dir() and info.filename.lower().endswith(IMPORT_SUFFIXES)
+
+
+def _iter_import_documents(path: str, filename: str):
+    """Lazily read (label, JSON text) documents from an uploaded import file,
+    which has passed ``_check_import_file``."""
+
+    def iter_lines(name, lines):
+        for lineno, line in enumerate(lines, start=1):
+            if line := line.strip():
+                yield f'{name}:{lineno}', line
+
+    def iter_file(name, f):
+        if name.lower().endswith(('.jsonl', '.ndjson')):
+            yield from iter_lines(name, io.TextIOWrapper(f, encoding='utf-8'))
+            return
+
+        try:
+            content = json.load(f)
+        except ValueError as e:
+            yield name, e
+            return
+
+        for index, document in enumerate(content if isinstance(content, list) else [content], start=1):
+            yield f'{name}[{index}]', document
+
+    if filename.lower().endswith('.zip'):
+        with zipfile.ZipFile(path) as zf:
+            for info in zf.infolist():
+                if _importable(info):
+                    with zf.open(info) as f:
+                        yield from iter_file(info.filename, f)
+    else:
+        with open(path, 'rb') as f:
+            yield from iter_file(filename, f)
+
+
+def _import_record(document: str | dict | ValueError) -> dict:
+    """Parse and validate an import document, returning the doi, sid and
+    metadata of the record to create; raise JobItemError if invalid."""
+    if isinstance(document, ValueError):
+        raise jobs.JobItemError(f'Invalid JSON: {document}')
+
+    if isinstance(document, str):
+        try:
+            document = json.loads(document)
+        except ValueError as e:
+            raise jobs.JobItemError(f'Invalid JSON: {e}')
+
+    if not isinstance(document, dict):
+        raise jobs.JobItemError('Document must be a JSON object.')
+
+    if isinstance(document.get('metadata'), dict):
+        metadata = document['metadata']
+        doi = document.get('doi') or metadata.get('doi')
+        sid = document.get('sid')
+    else:
+        metadata = document
+        doi = metadata.get('doi')
+        sid = None
+
+    if doi and not re.match(DOI_REGEX, doi):
+        raise jobs.JobItemError(f'Invalid DOI: {doi}')
+    if sid and not re.match(SID_REGEX, sid):
+        raise jobs.JobItemError(f'Invalid SID: {sid}')
+    if not doi and not sid:
+        raise jobs.JobItemError('SID is required if there is no DOI.')
+
+    return dict(doi=doi or None, sid=sid or None, metadata=metadata)
@@ -1,6 +1,7 @@
 from flask import Blueprint, render_template, request
 
 from odp.const import ODPScope
+from odp.ui.admin.lib import pagination
 from odp.ui.base import api
 
 bp = Blueprint('resources', __name__)
@@ -9,7 +10,6 @@ bp = Blueprint('resources', __name__)
 @bp.route('/')
 @api.view(ODPScope.RESOURCE_READ_ALL)
 def index():
-    page = request.args.get('page', 1)
     archive_id = request.args.get('archive')
     package_id = request.args.get('package')
     provider_id = request.args.get('provider')
@@ -22,9 +22,8 @@ def index():
     if provider_id:
         ui_filter += f'&provider={provider_id}'
 
-    resources = api.get(
+    resources = pagination.get_page(
         '/resource/all/',
-        page=page,
         archive_id=archive_id,
         package_id=package_id,
         provider_id=provider_id,
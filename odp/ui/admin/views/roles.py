@@ -3,6 +3,7 @@ from flask import Blueprint, flash, redirect, render_template, request, url_for
 from odp.const import ODPScope
 from odp.lib.client import ODPAPIError
 from odp.ui.admin.forms import RoleForm
+from odp.ui.admin.lib import membership
 from odp.ui.base import api
 from odp.ui.base.lib import utils
 from odp.ui.base.templates import create_btn, delete_btn, edit_btn
@@ -42,16 +43,18 @@ def detail(id):
 @api.view(ODPScope.ROLE_ADMIN)
 def create():
     form = RoleForm(request.form)
-    utils.populate_collection_choices(form.collection_ids)
-    utils.populate_scope_choices(form.scope_ids, ('odp', 'client'))
+    del form.remove_collection_ids
+    del form.remove_scope_ids
+    utils.populate_collection_choices(form.add_collection_ids)
+    utils.populate_scope_choices(form.add_scope_ids, ('odp', 'client'))
 
     if request.method == 'POST' and form.validate():
         try:
             api.post('/role/', dict(
                 id=(id := form.id.data),
                 collection_specific=form.collection_specific.data,
-                collection_ids=form.collection_ids.data,
-                scope_ids=form.scope_ids.data,
+                collection_ids=form.add_collection_ids.data,
+                scope_ids=form.add_scope_ids.data,
             ))
             flash(f'Role {id} has been created.', category='success')
             return redirect(url_for('.detail', id=id))
@@ -68,23 +71,46 @@ def create():
 def edit(id):
     role = api.get(f'/role/{id}')
 
-    # separate get/post form instantiation to resolve
-    # ambiguity of missing vs empty multiselect field
+    # collection and scope membership is edited as additions to and removals
+    # from the role's current collections and scopes, and saved after a
+    # preview of the changes
     if request.method == 'POST':
         form = RoleForm(request.form)
     else:
-        form = RoleForm(data=role | {'collection_ids': list(role['collection_keys'])})
+        form = RoleForm(data=role)
 
-    utils.populate_collection_choices(form.collection_ids)
-    utils.populate_scope_choices(form.scope_ids, ('odp', 'client'))
+    utils.populate_collection_choices(form.add_collection_ids)
+    utils.populate_scope_choices(form.add_scope_ids, ('odp', 'client'))
+    membership.split_choices(form.add_collection_ids, form.remove_collection_ids, role['collection_keys'])
+    membership.split_choices(form.add_scope_ids, form.remove_scope_ids, role['scope_ids'])
 
     if request.method == 'POST' and form.validate():
+        if not membership.confirmed():
+            return render_template(
+                'membership_preview.html',
+                title=f'Role: {id}',
+                changes=membership.field_changes(form, role, 'collection_specific'),
+                deltas=[
+                    membership.delta('Collections', role['collection_keys'],
+                                     form.add_collection_ids, form.remove_collection_ids),
+                    membership.delta('Scopes', role['scope_ids'],
+                                     form.add_scope_ids, form.remove_scope_ids),
+                ],
+            )
         try:
             api.put('/role/', dict(
                 id=id,
                 collection_specific=form.collection_specific.data,
-                collection_ids=form.collection_ids.data,
-                scope_ids=form.scope_ids.data,
+                collection_ids=membership.apply(
+                    role['collection_keys'],
+                    add=form.add_collection_ids.data,
+                    remove=form.remove_collection_ids.data,
+                ),
+                scope_ids=membership.apply(
+                    role['scope_ids'],
+                    add=form.add_scope_ids.data,
+                    remove=form.remove_scope_ids.data,
+                ),
             ))
             flash(f'Role {id} has been updated.', category='success')
             return redirect(url_for('.detail', id=id))
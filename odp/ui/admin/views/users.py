@@ -3,6 +3,7 @@ from flask import Blueprint, flash, redirect, render_template, request, url_for
 from odp.const import ODPScope
 from odp.lib.client import ODPAPIError
 from odp.ui.admin.forms import UserFilterForm, UserForm
+from odp.ui.admin.lib import pagination
 from odp.ui.base import api
 from odp.ui.base.lib import utils
 from odp.ui.base.templates import delete_btn, edit_btn
@@ -13,7 +14,6 @@ bp = Blueprint('users', __name__)
 @bp.route('/')
 @api.view(ODPScope.USER_READ)
 def index():
-    page = request.args.get('page', 1)
     text_q = request.args.get('q')
     provider_id = request.args.get('provider')
     role_id = request.args.get('role')
@@ -34,7 +34,7 @@ def index():
     utils.populate_provider_choices(filter_form.provider, include_none=True)
     utils.populate_role_choices(filter_form.role, include_none=True)
 
-    users = api.get(f'/user/?page={page}{api_filter}')
+    users = pagination.get_page('/user/', api_filter)
 
     return render_template(
         'user_index.html',
@@ -0,0 +1,50 @@
+import pytest
+
+from benchmarks.fakeapi import PACKAGE, RECORD, FakeAPI, _page, make_id
+from odp.lib.client import ODPAPIError
+
+
+def items(start, stop):
+    return list(range(start, stop))
+
+
+def test_page_default_size():
+    result = _page(items, 120, None, None)
+    assert result == dict(items=list(range(50)), total=120, page=1, pages=3)
+
+
+def test_page_last_page():
+    result = _page(items, 120, '3', '50')
+    assert result['items'] == list(range(100, 120))
+    assert result['pages'] == 3
+
+
+@pytest.mark.parametrize('size', [0, '0'])
+def test_page_size_zero_returns_all(size):
+    result = _page(items, 120, '2', size)
+    assert result == dict(items=list(range(120)), total=120, page=1, pages=1)
+
+
+def test_page_empty():
+    assert _page(items, 0, None, '0') == dict(items=[], total=0, page=1, pages=1)
+
+
+def test_get_routes_by_path_and_params():
+    api = FakeAPI(records=10, packages=3, package_resources=5)
+    assert api._get('/record/', page=1, size=4)['items'][0]['id'] == make_id(RECORD, 0)
+    assert api._get('/record/?page=3&size=4')['items'] == [api.record(8), api.record(9)]
+    assert api._get(f'/package/all/{make_id(PACKAGE, 2)}')['id'] == make_id(PACKAGE, 2)
+
+
+def test_get_unknown_object():
+    api = FakeAPI(records=10)
+    with pytest.raises(ODPAPIError):
+        api._get(f'/record/{make_id(RECORD, 10)}')
+
+
+def test_run_resolves_view_urls():
+    from benchmarks import run
+
+    api = FakeAPI(records=10, packages=3, providers=2)
+    for endpoint, url_values in run.VIEWS.items():
+        assert url_values(api), endpoint
@@ -0,0 +1,59 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+from benchmarks import importtime
+
+STDERR = '''\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:      1500 |       4000 | flask
+import time:       800 |        800 |   flask.app
+import time:      2000 |       2000 | wtforms
+'''
+
+
+@pytest.fixture
+def startup(monkeypatch):
+    timings = dict(create_app=100.0, load_views=50.0)
+
+    def run(args, **kwargs):
+        assert args[:3] == [sys.executable, '-X', 'importtime']
+        return subprocess.CompletedProcess(args, 0, stdout=json.dumps(timings) + '\n', stderr=STDERR)
+
+    monkeypatch.setattr(importtime.subprocess, 'run', run)
+    return timings
+
+
+def test_measure_parses_importtime_output(startup):
+    timings, imports = importtime.measure()
+    assert timings == startup
+    assert imports == [
+        ('_io', 120, 120),
+        ('flask', 1500, 4000),
+        ('flask.app', 800, 800),
+        ('wtforms', 2000, 2000),
+    ]
+
+
+def test_baseline_comparison(startup, tmp_path, monkeypatch, capsys):
+    output = tmp_path / 'startup.json'
+    monkeypatch.setattr(sys, 'argv', ['importtime', '--output', str(output)])
+    assert importtime.main() == 0
+    assert json.loads(output.read_text())['packages'] == {'_io': 0.12, 'flask': 2.3, 'wtforms': 2.0}
+
+    monkeypatch.setattr(sys, 'argv', ['importtime', '--baseline', str(output)])
+    assert importtime.main() == 0
+
+    startup['load_views'] = 61.0
+    assert importtime.main() == 1
+    assert 'load_views: 61.0 ms exceeds baseline 50.0 ms' in capsys.readouterr().out
+
+
+def test_startup_script_compiles():
+    """Views are loaded, and timed, separately from app creation."""
+    code = compile(importtime.STARTUP, '<startup>', 'exec')
+    assert 'create_app' in code.co_names
+    assert importtime.STARTUP.index('views.load(app)') > importtime.STARTUP.index('create_app()')
@@ -0,0 +1,95 @@
+from datetime import date, timedelta
+
+import pytest
+from flask import Flask
+from werkzeug.exceptions import HTTPException
+
+from odp.ui.admin.lib import audit
+
+
+def entries(n, start=date(2024, 6, 30), table='record'):
+    """Return n audit entries, one per day, most recent first."""
+    return [
+        dict(audit_id=i, table=table, timestamp=f'{start - timedelta(days=i)}T12:00:00+00:00')
+        for i in range(n)
+    ]
+
+
+@pytest.fixture
+def audit_log(monkeypatch):
+    """Serve an audit log in API pages, recording the pages requested."""
+    log = []
+    requested = []
+
+    def get(path, page, size, sort):
+        assert sort == audit.AUDIT_SORT
+        requested.append(page)
+        return dict(
+            items=log[(page - 1) * size:page * size],
+            total=len(log),
+            page=page,
+            pages=max(1, -(-len(log) // size)),
+        )
+
+    monkeypatch.setattr(audit.api, 'get', get)
+    monkeypatch.setattr(audit, 'SCAN_PAGE_SIZE', 10)
+    monkeypatch.setattr(audit, 'MAX_SCAN_PAGES', 3)
+    return log, requested
+
+
+def get_page(**args):
+    with Flask(__name__).test_request_context(query_string=args):
+        return audit.get_page('/record/r1/audit', 'record')
+
+
+def test_unfiltered_single_call(audit_log):
+    log, requested = audit_log
+    log += entries(25)
+    result, ui_filter = get_page(page=2, size=25)
+    assert requested == [2]
+    assert ui_filter == '&size=25'
+
+
+def test_type_filter(audit_log):
+    log, _ = audit_log
+    log += entries(5) + entries(5, start=date(2024, 6, 25), table='record_tag')
+    result, ui_filter = get_page(type='tag', size=25)
+    assert [e['table'] for e in result['items']] == ['record_tag'] * 5
+    assert result['total'] == 5
+    assert not result['truncated']
+    assert ui_filter == '&size=25&type=tag'
+
+
+def test_date_range_stops_at_since(audit_log):
+    log, requested = audit_log
+    log += entries(25)
+    result, _ = get_page(since='2024-06-25', until='2024-06-28', size=25)
+    assert [e['audit_id'] for e in result['items']] == [2, 3, 4, 5]
+    assert requested == [1]
+    assert not result['truncated']
+
+
+def test_paging_within_filtered_results(audit_log):
+    log, _ = audit_log
+    log += entries(28)
+    result, _ = get_page(type='entity', size=25, page=2)
+    assert [e['audit_id'] for e in result['items']] == [25, 26, 27]
+    assert result['total'] == 28
+    assert result['pages'] == 2
+
+
+def test_scan_is_capped(audit_log):
+    log, requested = audit_log
+    log += entries(50)
+    result, _ = get_page(type='entity', size=25)
+    assert requested == [1, 2, 3]
+    assert result['total'] == 30
+    assert result['truncated']
+
+
+def test_unsorted_log_is_rejected(audit_log):
+    log, _ = audit_log
+    log += list(reversed(entries(5)))
+    with pytest.raises(HTTPException) as excinfo:
+        get_page(since='2024-06-01')
+    assert excinfo.value.code == 502
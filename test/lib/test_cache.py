@@ -0,0 +1,124 @@
+import pytest
+from flask import Flask, g
+
+from odp.const import ODPScope
+from odp.ui.admin.lib import cache
+from odp.ui.admin.lib.cache import TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, 'monotonic', lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def user_request():
+    app = Flask(__name__)
+    with app.test_request_context():
+        g.user_permissions = {ODPScope.COLLECTION_READ: ['c1'], ODPScope.ROLE_READ: '*'}
+        yield
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    cache.reference_cache.clear()
+    yield
+    cache.reference_cache.clear()
+
+
+def test_ttl_expiry(clock):
+    c = TTLCache(maxsize=10, ttl=60)
+    c.set('a', 1)
+    assert c.get('a') == (True, 1)
+    clock[0] += 61
+    assert c.get('a') == (False, None)
+
+
+def test_lru_eviction():
+    c = TTLCache(maxsize=2, ttl=60)
+    c.set('a', 1)
+    c.set('b', 2)
+    c.get('a')
+    c.set('c', 3)
+    assert c.get('a') == (True, 1)
+    assert c.get('b') == (False, None)
+    assert c.get('c') == (True, 3)
+
+
+def test_weight_bound():
+    c = TTLCache(maxsize=10, ttl=60, maxweight=10, weight=len)
+    c.set('a', 'xxxx')
+    c.set('b', 'xxxx')
+    c.get('a')
+    c.set('c', 'xxxx')
+    assert c.get('a') == (True, 'xxxx')
+    assert c.get('b') == (False, None)
+    assert c.weight == 8
+
+    c.set('a', 'x')
+    assert c.weight == 5
+
+    c.set('d', 'x' * 11)
+    assert c.get('d') == (False, None)
+    assert c.weight == 5
+
+    c.invalidate(lambda key: key == 'c')
+    assert c.weight == 1
+
+
+def test_invalidate_predicate():
+    c = TTLCache(maxsize=10, ttl=60)
+    c.set(('x', 1), 1)
+    c.set(('y', 1), 2)
+    c.invalidate(lambda key: key[0] == 'x')
+    assert c.get(('x', 1)) == (False, None)
+    assert c.get(('y', 1)) == (True, 2)
+
+
+@pytest.mark.parametrize('write_path, invalidated', [
+    ('/collection/c1', {'/collection/', '/provider/'}),
+    ('/provider/p1', {'/collection/', '/provider/'}),
+    ('/role/r1', {'/role/'}),
+    ('/record/r1', set()),
+])
+def test_write_invalidates_dependent_listings(write_path, invalidated):
+    for path in ('/collection/', '/provider/', '/role/'):
+        cache.reference_cache.set(('perms', path, ()), [])
+
+    cache.invalidate(write_path)
+
+    for path in ('/collection/', '/provider/', '/role/'):
+        assert cache.reference_cache.get(('perms', path, ()))[0] == (path not in invalidated)
+
+
+def test_cached_get_returns_copies(user_request):
+    calls = []
+
+    def get(path, **params):
+        calls.append(path)
+        return {'items': [{'id': 'c1'}]}
+
+    result = cache._cached_get(get, '/collection/')
+    result['items'].clear()
+    again = cache._cached_get(get, '/collection/')
+    again['items'][0]['id'] = 'changed'
+
+    assert cache._cached_get(get, '/collection/') == {'items': [{'id': 'c1'}]}
+    assert calls == ['/collection/']
+
+
+def test_shared_listing_requires_scope(user_request):
+    cache.warm('/role/', {}, ['shared'])
+    assert cache._cached_get(lambda path, **params: ['api'], '/role/') == ['shared']
+
+    cache.warm('/scope/', {}, ['shared'])
+    assert cache._cached_get(lambda path, **params: ['api'], '/scope/') == ['api']
+
+
+def test_paged_and_non_reference_gets_bypass_cache(user_request):
+    results = iter(range(10))
+    get = lambda path, **params: next(results)
+    assert cache._cached_get(get, '/collection/', page=2) != cache._cached_get(get, '/collection/', page=2)
+    assert cache._cached_get(get, '/record/') != cache._cached_get(get, '/record/')
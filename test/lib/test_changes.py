@@ -0,0 +1,58 @@
+from math import ceil
+
+import pytest
+
+from odp.ui.admin.lib import changes
+
+
+class RecordList:
+    """Client serving records, in the given order, from the record list."""
+
+    def __init__(self, timestamps):
+        self.records = [dict(id=f'r{n}', timestamp=timestamp) for n, timestamp in enumerate(timestamps)]
+        self.pages = []
+
+    def get(self, path, page, size, sort):
+        assert (path, sort) == ('/record/', 'timestamp desc')
+        self.pages += [page]
+        return dict(
+            items=self.records[(page - 1) * size:page * size],
+            total=len(self.records),
+            page=page,
+            pages=max(1, ceil(len(self.records) / size)),
+        )
+
+
+@pytest.fixture(autouse=True)
+def page_size(monkeypatch):
+    monkeypatch.setattr(changes, 'PAGE_SIZE', 2)
+
+
+def timestamps(pages):
+    return [[record['timestamp'] for record in records] for records in pages]
+
+
+def test_walk_all():
+    client = RecordList(['5', '4', '3', '2', '1'])
+    assert timestamps(changes.iter_modified_records(None, client)) == [['5', '4'], ['3', '2'], ['1']]
+
+
+def test_walk_stops_at_since():
+    client = RecordList(['5', '4', '3', '3', '2', '1'])
+    assert timestamps(changes.iter_modified_records('3', client)) == [['5', '4'], ['3', '3']]
+    assert client.pages == [1, 2, 3]
+
+
+def test_walk_nothing_new():
+    client = RecordList(['5', '4'])
+    assert list(changes.iter_modified_records('6', client)) == []
+    assert client.pages == [1]
+
+
+@pytest.mark.parametrize('order', [
+    ['1', '2', '3'],
+    ['5', '4', '6'],
+])
+def test_walk_requires_descending_order(order):
+    with pytest.raises(changes.OrderError):
+        list(changes.iter_modified_records(None, RecordList(order)))
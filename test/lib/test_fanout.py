@@ -0,0 +1,113 @@
+import os
+import threading
+import time
+
+import pytest
+
+from odp.ui.admin.lib import fanout
+
+
+def test_results_in_argument_order():
+    def call(value, delay):
+        time.sleep(delay)
+        return value
+
+    assert fanout.run(
+        ('a', call, ('a', 0.05), {}),
+        ('b', call, ('b', 0), {}),
+        ('c', call, ('c', 0.02), {}),
+    ) == ('a', 'b', 'c')
+
+
+def test_first_failure_in_argument_order_is_raised():
+    def fail(exc, delay):
+        time.sleep(delay)
+        raise exc
+
+    with pytest.raises(KeyError):
+        fanout.run(
+            ('a', fail, (KeyError('a'), 0.05), {}),
+            ('b', fail, (ValueError('b'), 0.05), {}),
+        )
+
+
+def test_earlier_failure_raised_when_later_fails_first():
+    def fail(exc, delay):
+        time.sleep(delay)
+        raise exc
+
+    with pytest.raises(KeyError):
+        fanout.run(
+            ('a', fail, (KeyError('a'), 0.1), {}),
+            ('b', fail, (ValueError('b'), 0), {}),
+        )
+
+
+def test_timeout():
+    release = threading.Event()
+    try:
+        with pytest.raises(TimeoutError):
+            fanout.run(('slow', release.wait, (), {}), timeout=0.1)
+    finally:
+        release.set()
+
+
+def test_background_work_does_not_starve_page_requests():
+    release = threading.Event()
+    try:
+        for _ in range(fanout.background.max_workers * 2):
+            fanout.background.submit('blocked', release.wait)
+
+        assert fanout.run(('page', lambda: 'done', (), {}), timeout=1) == ('done',)
+    finally:
+        release.set()
+
+
+def test_get_with_client():
+    class Client:
+        def get(self, path, **params):
+            return path, params
+
+    assert fanout.background.get('/a/', ('/b/', {'page': 2}), client=Client()) == (
+        ('/a/', {}),
+        ('/b/', {'page': 2}),
+    )
+
+
+def test_shutdown_releases_threads():
+    pool = fanout.Pool('test-shutdown', max_workers=2)
+    assert pool.run(('a', str, (1,), {}), ('b', str, (2,), {})) == ('1', '2')
+    pool.shutdown()
+    deadline = time.monotonic() + 5
+    while any(t.name.startswith('test-shutdown') for t in threading.enumerate()):
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_pools_usable_after_fork():
+    from flask import Flask
+
+    from odp.ui.admin.lib import jobs, search, storage
+
+    jobs.init_app(Flask(__name__))
+    jobs._runner.submit(time.sleep, 0.01).result()
+    # start the pools' threads, which a forked child does not inherit
+    fanout.background.run(*(('warm', time.sleep, (0.01,), {}) for _ in range(fanout.MAX_WORKERS)))
+    fanout.pages.run(('warm', time.sleep, (0.01,), {}))
+    search._refresher.submit(time.sleep, 0.01).result()
+    storage._scanner.submit(time.sleep, 0.01).result()
+
+    if not (pid := os.fork()):
+        status = 1
+        try:
+            assert fanout.background.run(('a', str, (1,), {}), timeout=5) == ('1',)
+            assert fanout.pages.run(('a', str, (1,), {}), timeout=5) == ('1',)
+            assert search._refresher.submit(str, 1).result(timeout=5) == '1'
+            assert storage._scanner.submit(str, 1).result(timeout=5) == '1'
+            assert jobs._runner.submit(str, 1).result(timeout=5) == '1'
+            status = 0
+        finally:
+            os._exit(status)
+
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
@@ -0,0 +1,66 @@
+import pytest
+
+from odp.ui.admin.lib import hooks
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    wrappers = {}
+    monkeypatch.setattr(hooks, '_wrappers', wrappers)
+    return wrappers
+
+
+def tracer(name, trace):
+    def wrapper(func, path, *args, **kwargs):
+        trace.append(name)
+        return func(path, *args, **kwargs)
+
+    return wrapper
+
+
+def test_layers_apply_in_declared_order(registry):
+    trace = []
+    # register in the reverse of the declared order
+    for layer in reversed(hooks.LAYERS):
+        registry.setdefault(layer, {})['get'] = tracer(layer, trace)
+
+    result = hooks.call(lambda path: trace.append('api') or path, 'get', '/x/')
+
+    assert result == '/x/'
+    assert trace == list(hooks.LAYERS) + ['api']
+
+
+def test_only_wrappers_for_method_apply(registry):
+    trace = []
+    registry['cache'] = {'get': tracer('cache', trace)}
+    registry['mirror'] = {'post': tracer('mirror', trace)}
+
+    hooks.call(lambda path, data: None, 'post', '/record/', {})
+
+    assert trace == ['mirror']
+
+
+def test_unknown_layer(registry):
+    with pytest.raises(ValueError):
+        hooks.wrap_api('unknown', 'get', tracer('unknown', []))
+
+
+def test_bound_client_calls_pass_through_wrappers(registry):
+    trace = []
+    registry['cache'] = {'get': tracer('cache', trace), 'delete': tracer('cache', trace)}
+
+    class Client:
+        def get(self, path, **params):
+            return 'get', path, params
+
+        def post(self, path, data, **params):
+            return 'post', path, data
+
+        def delete(self, path, **params):
+            return 'delete', path
+
+    client = hooks.bind(Client())
+    assert client.get('/catalog/', page=1) == ('get', '/catalog/', {'page': 1})
+    assert client.post('/record/', {'a': 1}) == ('post', '/record/', {'a': 1})
+    assert client.delete('/record/r1') == ('delete', '/record/r1')
+    assert trace == ['cache', 'cache']
@@ -0,0 +1,187 @@
+import threading
+import time
+
+import pytest
+from flask import Flask, g, has_request_context
+
+from odp.const import ODPScope
+from odp.lib.client import ODPAPIError
+from odp.ui.admin.lib import jobs, service
+
+
+class User:
+    id = 'u1'
+
+
+@pytest.fixture
+def app(monkeypatch):
+    app = Flask(__name__)
+    jobs.init_app(app)
+    monkeypatch.setattr(jobs, 'current_user', User())
+    monkeypatch.setattr(jobs, 'RETRY_BACKOFF', 0.01)
+    return app
+
+
+def wait_done(job, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not job.done:
+        assert time.monotonic() < deadline, 'job did not finish'
+        time.sleep(0.01)
+    return job
+
+
+def test_grant_permits():
+    grant = jobs.Grant(client=None, permissions={
+        ODPScope.RECORD_READ: '*',
+        ODPScope.RECORD_WRITE: ['c1'],
+    })
+    assert grant.permits(ODPScope.RECORD_READ, 'c2')
+    assert grant.permits(ODPScope.RECORD_WRITE, 'c1')
+    assert grant.permits(ODPScope.RECORD_WRITE)
+    assert not grant.permits(ODPScope.RECORD_WRITE, 'c2')
+    assert not grant.permits(ODPScope.RECORD_ADMIN)
+
+    grant.authorize(ODPScope.RECORD_WRITE, 'c1')
+    with pytest.raises(jobs.JobItemError):
+        grant.authorize(ODPScope.RECORD_WRITE, 'c2')
+
+
+def test_grant_requires_service_client(app, monkeypatch):
+    monkeypatch.setattr(service, 'client', lambda: None)
+    with app.test_request_context():
+        g.user_permissions = {ODPScope.RECORD_READ: '*'}
+        assert jobs.grant() is None
+
+
+def test_grant_snapshots_permissions(app, monkeypatch):
+    client = object()
+    monkeypatch.setattr(service, 'client', lambda: client)
+    with app.test_request_context():
+        g.user_permissions = {ODPScope.RECORD_WRITE: ['c1']}
+        grant = jobs.grant()
+        g.user_permissions[ODPScope.RECORD_WRITE].append('c2')
+
+    assert grant.client is client
+    assert grant.permissions == {ODPScope.RECORD_WRITE: ['c1']}
+
+
+def test_items_run_in_own_app_contexts(app):
+    seen = []
+    lock = threading.Lock()
+
+    def func(item):
+        with lock:
+            seen.append((item, has_request_context(), g.get('item')))
+        g.item = item
+
+    with app.test_request_context():
+        g.item = 'request'
+        job = jobs.submit('test', range(20), func)
+
+    wait_done(job)
+    assert job.status == 'completed'
+    assert job.succeeded == job.total == 20
+    assert sorted(seen) == [(item, False, None) for item in range(20)]
+
+
+def test_failures_and_retries(app):
+    attempts = {}
+
+    def func(item):
+        attempts[item] = attempts.get(item, 0) + 1
+        if item == 'transient' and attempts[item] < 3:
+            raise ODPAPIError(503, 'Unavailable')
+        if item == 'forbidden':
+            raise ODPAPIError(403, 'Forbidden')
+        if item == 'invalid':
+            raise jobs.JobItemError('Invalid')
+        return item.upper()
+
+    with app.test_request_context():
+        job = jobs.submit('test', ['ok', 'transient', 'forbidden', 'invalid'], func, retry=True)
+
+    wait_done(job)
+    assert job.status == 'completed'
+    assert job.succeeded == 2
+    assert job.retried == 2
+    assert sorted(job.failures) == [('forbidden', '403: Forbidden'), ('invalid', 'Invalid')]
+    assert sorted(job.results) == [('ok', 'OK'), ('transient', 'TRANSIENT')]
+
+
+def test_no_retries_unless_requested(app):
+    attempts = []
+
+    def func(item):
+        attempts.append(item)
+        raise ODPAPIError(503, 'Unavailable')
+
+    with app.test_request_context():
+        job = jobs.submit('test', ['transient'], func)
+
+    wait_done(job)
+    assert attempts == ['transient']
+    assert job.retried == 0
+    assert job.failures == [('transient', '503: Unavailable')]
+
+
+def test_item_enumeration_failure(app):
+    def items():
+        yield 1
+        raise ODPAPIError(500, 'Paging failed')
+
+    with app.test_request_context():
+        job = jobs.submit('test', items(), lambda item: None)
+
+    wait_done(job)
+    assert job.status == 'failed'
+    assert job.error == '500: Paging failed'
+
+
+def test_cancel(app):
+    started = threading.Event()
+    release = threading.Event()
+
+    def func(item):
+        started.set()
+        release.wait(5)
+
+    with app.test_request_context():
+        job = jobs.submit('test', range(100), func)
+
+    started.wait(5)
+    job.cancel()
+    release.set()
+    wait_done(job)
+    assert job.status == 'cancelled'
+    assert job.processed < 100
+
+
+def test_cleanup_after_completion(app):
+    cleaned = threading.Event()
+    with app.test_request_context():
+        job = jobs.submit('test', range(3), lambda item: None, cleanup=cleaned.set)
+
+    wait_done(job)
+    assert cleaned.wait(5)
+
+
+def test_cleanup_when_cancelled_before_start(app):
+    closed = []
+
+    def items():
+        try:
+            yield 1
+        finally:
+            closed.append(True)
+
+    cleaned = []
+    generator = items()
+    job = jobs.Job(id='j1', title='test', user_id='u1')
+    job.cancel()
+    jobs._run(app, job, generator, lambda item: None, str, False, lambda: cleaned.append(True))
+
+    assert job.status == 'cancelled'
+    assert cleaned == [True]
+    # the generator never started, so it has nothing to clean up itself
+    assert closed == []
+    assert generator.gi_frame is None
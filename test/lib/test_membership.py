@@ -0,0 +1,44 @@
+from odp.ui.admin.lib import membership
+
+
+def test_apply():
+    assert membership.apply(['a', 'b', 'c'], add=['d', 'b', 'e', 'd'], remove=['b', 'x']) == ['a', 'c', 'd', 'e']
+
+
+def test_apply_nothing():
+    assert membership.apply(['a', 'b'], add=None, remove=None) == ['a', 'b']
+    assert membership.apply([], add=[], remove=['a']) == []
+
+
+def test_apply_keeps_concurrent_changes():
+    # a member added by someone else since the form was rendered is kept
+    assert membership.apply(['a', 'b', 'new'], add=['c'], remove=['a']) == ['b', 'new', 'c']
+
+
+class Field:
+    def __init__(self, data, choices=()):
+        self.data = data
+        self.choices = list(choices)
+
+
+def test_delta():
+    add = Field(['u3', 'u1', 'u3'], [('u3', 'Carol')])
+    remove = Field(['u2', 'u9'], [('u2', 'Bob')])
+    delta = membership.delta('Users', ['u1', 'u2'], add, remove)
+    assert delta.added == [('u3', 'Carol')]
+    assert delta.removed == [('u2', 'Bob')]
+    assert delta
+
+
+def test_empty_delta():
+    delta = membership.delta('Users', ['u1'], Field(['u1']), Field(None))
+    assert (delta.added, delta.removed) == ([], [])
+    assert not delta
+
+
+def test_split_choices():
+    add = Field(None, [('a', 'A'), ('b', 'B'), ('c', 'C')])
+    remove = Field(None)
+    membership.split_choices(add, remove, ['b'])
+    assert add.choices == [('a', 'A'), ('c', 'C')]
+    assert remove.choices == [('b', 'B')]
@@ -0,0 +1,87 @@
+import pytest
+from flask import Flask, Response, g, stream_with_context
+
+from odp.ui.admin.lib import hooks, memo
+from odp.ui.admin.views import records
+from odp.ui.base import api
+
+
+@pytest.fixture
+def app(monkeypatch):
+    """An app with memoization wrapped around a fake API GET, which
+    records the paths it is called with and the memo size at the time."""
+    calls = []
+
+    def get(path, **params):
+        calls.append((path, len(g.get('api_memo') or ())))
+        return app.respond(path, **params)
+
+    monkeypatch.setattr(hooks, '_wrappers', {})
+    monkeypatch.setattr(hooks, '_originals', {})
+    monkeypatch.setattr(api, 'get', get)
+    monkeypatch.setattr(api, 'post', lambda path, data, **params: None)
+
+    app = Flask(__name__)
+    memo.init_app(app)
+    app.calls = calls
+    app.respond = lambda path, **params: {'path': path, 'items': [{'id': 1}]}
+    return app
+
+
+def test_identical_gets_are_memoized(app):
+    @app.route('/')
+    def view():
+        first = api.get('/catalog/')
+        first['items'].append({'id': 2})
+        second = api.get('/catalog/')
+        api.get('/catalog/', page=2)
+        return second
+
+    response = app.test_client().get('/')
+    assert response.json == {'path': '/catalog/', 'items': [{'id': 1}]}
+    assert [path for path, _ in app.calls] == ['/catalog/', '/catalog/']
+
+
+def test_memo_stops_after_write(app):
+    @app.route('/', methods=('POST',))
+    def view():
+        api.get('/record/r1')
+        api.post('/record/r1/tag', {})
+        api.get('/record/r1')
+        return ''
+
+    app.test_client().post('/')
+    assert len(app.calls) == 2
+
+
+def test_memo_is_released_when_streaming(app):
+    @app.route('/stream')
+    def view():
+        def generate():
+            for page in range(1, 101):
+                yield str(api.get('/record/', page=page)['path'])
+
+        api.get('/record/', page=0)
+        return Response(stream_with_context(generate()))
+
+    app.test_client().get('/stream').get_data()
+    assert len(app.calls) == 101
+    assert max(memo_size for _, memo_size in app.calls[1:]) == 0
+
+
+def test_export_memory_is_flat(app, monkeypatch):
+    """Pages fetched while streaming an export are not retained."""
+    pages = 50
+    record = dict(
+        id='r1', doi=None, sid='s1', metadata={}, collection_id='c1', collection_key='C1', schema_id='s',
+        validity=dict(valid=True), published_catalog_ids=[], timestamp='2024-01-01T00:00:00+00:00',
+    )
+
+    app.respond = lambda path, **params: dict(items=[record], page=len(app.calls), pages=pages, total=pages)
+    monkeypatch.setattr(records.mirror, 'usable', lambda: False)
+    app.add_url_rule('/export', view_func=records.export)
+
+    response = app.test_client().get('/export?format=jsonl')
+    assert len(response.get_data().splitlines()) == pages
+    assert len(app.calls) == pages
+    assert max(memo_size for _, memo_size in app.calls) <= 1
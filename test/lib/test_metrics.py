@@ -0,0 +1,50 @@
+import pytest
+from flask import Flask
+
+from odp.ui.admin.lib import hooks, metrics
+from odp.ui.base import api
+
+
+@pytest.fixture
+def make_app(monkeypatch):
+    monkeypatch.setattr(hooks, '_wrappers', {})
+    monkeypatch.setattr(hooks, '_originals', {})
+    for method in ('get', 'post', 'put', 'delete'):
+        monkeypatch.setattr(api, method, getattr(api, method))
+
+    def make_app(**config):
+        app = Flask(__name__)
+        app.config.update(config)
+        metrics.init_app(app)
+
+        @app.route('/page')
+        def page():
+            return 'page'
+
+        return app
+
+    return make_app
+
+
+def test_metrics_off_by_default(make_app):
+    client = make_app().test_client()
+    assert client.get('/page').headers['Server-Timing']
+    assert client.get('/metrics').status_code == 404
+
+
+def test_metrics_require_token(make_app):
+    assert make_app(METRICS_ENABLED=True).test_client().get('/metrics').status_code == 404
+
+    client = make_app(METRICS_ENABLED=True, METRICS_TOKEN='secret').test_client()
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Basic secret'}).status_code == 401
+
+
+def test_metrics(make_app):
+    client = make_app(METRICS_ENABLED=True, METRICS_TOKEN='secret').test_client()
+    client.get('/page')
+
+    response = client.get('/metrics', headers={'Authorization': 'Bearer secret'})
+    assert response.status_code == 200
+    assert 'odp_admin_request_duration_seconds_count{endpoint="page"}' in response.text
@@ -0,0 +1,184 @@
+import os
+from datetime import datetime, timezone
+from math import ceil
+
+import pytest
+from flask import Flask, g, has_app_context, has_request_context
+from werkzeug.exceptions import BadRequest
+
+from benchmarks.fakeapi import FakeAPI
+from odp.const import ODPScope
+from odp.lib.client import ODPAPIError
+from odp.ui.admin.lib import mirror, service
+from odp.ui.admin.lib.pagination import encode_cursor
+
+fake = FakeAPI(records=20, collections=2)
+
+
+def record(i, **changes):
+    return fake.record(i) | changes
+
+
+class Client:
+    """Client serving the record list, most recently modified first,
+    and individual records, noting the Flask contexts in which it is
+    called."""
+
+    def __init__(self, records):
+        self.records = sorted(records, key=lambda r: r['timestamp'], reverse=True)
+        self.contexts = []
+
+    def get(self, path, **params):
+        self.contexts += [(has_app_context(), has_request_context())]
+        if path == '/record/':
+            assert params['sort'] == 'timestamp desc'
+            page, size = params['page'], params['size']
+            return dict(
+                items=self.records[(page - 1) * size:page * size],
+                total=len(self.records),
+                page=page,
+                pages=max(1, ceil(len(self.records) / size)),
+            )
+        record_id = path.removeprefix('/record/')
+        if found := [r for r in self.records if r['id'] == record_id]:
+            return found[0]
+        raise ODPAPIError(404, {'detail': 'Not Found'})
+
+
+@pytest.fixture
+def store(tmp_path):
+    return mirror.RecordMirror(str(tmp_path / 'mirror.db'))
+
+
+def ids(records):
+    return [r['id'] for r in records]
+
+
+def test_schema_keeps_existing_indexes(tmp_path):
+    path = str(tmp_path / 'mirror.db')
+    store = mirror.RecordMirror(path)
+    store._db().execute('CREATE INDEX record_timestamp_idx ON record (timestamp)')
+    mirror.RecordMirror(path)
+    indexes = {row[0] for row in store._db().execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert 'record_timestamp_idx' in indexes
+    assert 'record_keyset_idx' in indexes
+
+
+def test_sync_and_resync(store):
+    client = Client([record(i) for i in range(5)])
+    store.sync(client)
+    assert ids(store.iter_records(None)) == ids(client.records)
+    assert store.get_state('timestamp') == record(4)['timestamp']
+
+    client.records = client.records[1:]
+    store.sync(client)
+    assert len(list(store.iter_records(None))) == 5
+
+    store.sync(client, full=True)
+    assert ids(store.iter_records(None)) == ids(client.records)
+
+
+def test_sync_refetches_dirty_records(store):
+    client = Client([record(i) for i in range(3)])
+    store.sync(client)
+
+    client.records[2] = record(0, tags=[])
+    store.mark_dirty(record(0)['id'])
+    store.mark_dirty(record(19)['id'])
+    store.sync(client)
+    assert [r['tags'] for r in store.iter_records(None) if r['id'] == record(0)['id']] == [[]]
+    assert record(19)['id'] not in ids(store.iter_records(None))
+
+
+def test_failed_sync_keeps_dirty_records(store):
+    class FailingClient(Client):
+        def get(self, path, **params):
+            raise ODPAPIError(503, {'detail': 'Unavailable'})
+
+    store.mark_dirty('r1')
+    with pytest.raises(ODPAPIError):
+        store.sync(FailingClient([]))
+    assert store._dirty == {'r1'}
+
+
+def test_keyset_pages(store):
+    store.upsert([record(i) for i in range(7)])
+    first = store.get_page(None, None, size=3)
+    second = store.get_page(None, None, size=3, cursor=first['next_cursor'])
+    third = store.get_page(None, None, size=3, cursor=second['next_cursor'])
+    assert ids(first['items'] + second['items'] + third['items']) == ids(record(i) for i in reversed(range(7)))
+    assert third['next_cursor'] is None
+    assert first['total'] == second['total'] == 7
+
+
+def test_sync_with_service_client(store, monkeypatch):
+    client = Client([record(i) for i in range(3)])
+    monkeypatch.setattr(mirror, '_mirror', store)
+    monkeypatch.setattr(mirror, '_app', Flask(__name__))
+    monkeypatch.setattr(service, 'client', lambda: client)
+
+    mirror._sync_once()
+    assert len(list(store.iter_records(None))) == 3
+    assert set(client.contexts) == {(True, False)}
+    assert store.get_state('resynced') is not None
+    assert store.get_state('sync_lease').endswith(' 0')
+
+
+def test_sync_thread_started_on_first_use_in_each_process(store, monkeypatch):
+    started = []
+    monkeypatch.setattr(mirror, '_mirror', store)
+    monkeypatch.setattr(mirror, '_sync_pid', None)
+    monkeypatch.setattr(mirror, '_sync_loop', lambda: started.append(os.getpid()))
+
+    assert not mirror.usable()
+    assert not mirror.usable()
+    assert started == [os.getpid()]
+
+    # as in a process forked after the thread was started
+    monkeypatch.setattr(mirror, '_sync_pid', -1)
+    mirror.usable()
+    assert started == [os.getpid(), os.getpid()]
+
+
+def test_forked_process_opens_its_own_connection(store, monkeypatch):
+    monkeypatch.setattr(mirror, '_mirror', store)
+    parent_db = store._db()
+    mirror._reset()
+    assert store._db() is not parent_db
+
+
+def test_status_shows_resync_time(store, monkeypatch):
+    monkeypatch.setattr(mirror, '_mirror', store)
+    store.sync(Client([record(i) for i in range(3)]), full=True)
+    resynced = store.resynced()
+    store.sync(Client([record(i) for i in range(4)]))
+
+    status = mirror.status()
+    assert status['age'] == 0
+    assert status['resynced'] == datetime.fromtimestamp(resynced, timezone.utc).isoformat()
+    assert status['synced'] >= status['resynced']
+
+
+def test_requires_service_client(monkeypatch, tmp_path):
+    monkeypatch.setattr(mirror, '_mirror', None)
+    monkeypatch.setattr(service, 'enabled', lambda: False)
+    app = Flask(__name__)
+    app.config['RECORD_MIRROR'] = str(tmp_path / 'mirror.db')
+    mirror.init_app(app)
+    assert mirror._mirror is None
+
+
+def test_readable_collections():
+    with Flask(__name__).test_request_context():
+        g.user_permissions = {ODPScope.RECORD_READ: '*'}
+        assert mirror.readable_collections([]) is None
+        assert mirror.readable_collections(['c1']) == ['c1']
+
+        g.user_permissions = {ODPScope.RECORD_READ: ['c1', 'c2']}
+        assert mirror.readable_collections([]) == ['c1', 'c2']
+        assert mirror.readable_collections(['c2', 'c3']) == ['c2']
+
+
+def test_invalid_cursor(store):
+    with Flask(__name__).test_request_context(), pytest.raises(BadRequest):
+        store.get_page(None, None, cursor=encode_cursor('t', 'r1'))
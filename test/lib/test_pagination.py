@@ -0,0 +1,61 @@
+import base64
+import json
+
+import pytest
+from flask import Flask
+from werkzeug.exceptions import BadRequest
+
+from odp.ui.admin.lib import pagination
+from odp.ui.base import api
+
+
+@pytest.fixture
+def app():
+    return Flask(__name__)
+
+
+def raw_cursor(value) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip('=')
+
+
+def test_cursor_round_trip():
+    cursor = pagination.encode_cursor('2024-01-01T00:00:00+00:00', 'r1', 1234)
+    assert '=' not in cursor
+    assert pagination.decode_cursor(cursor, str, str, int) == ['2024-01-01T00:00:00+00:00', 'r1', 1234]
+
+
+@pytest.mark.parametrize('cursor', [
+    'not a cursor',
+    '!!!!',
+    'é',
+    raw_cursor('timestamp'),
+    raw_cursor({'timestamp': 't'}),
+    raw_cursor(['t', 'r1']),
+    raw_cursor(['t', 'r1', 1, 2]),
+    raw_cursor(['t', 'r1', '1234']),
+    raw_cursor([None, 'r1', 1234]),
+])
+def test_invalid_cursor(app, cursor):
+    with app.test_request_context(), pytest.raises(BadRequest):
+        pagination.decode_cursor(cursor, str, str, int)
+
+
+def test_cursor_page():
+    offset_page = dict(items=[1], total=10, page=2, pages=10)
+    assert pagination.cursor_page(offset_page) is offset_page
+
+    keyset_page = dict(items=[1], total=10, page=1, pages=10, next_cursor='c')
+    assert pagination.cursor_page(keyset_page) == dict(items=[1], total=10, page=1, pages=1, next_cursor='c')
+
+
+@pytest.mark.parametrize('query, path', [
+    ('', '/record/?page=1&collection_id=c1'),
+    ('?page=3', '/record/?page=3&collection_id=c1'),
+    ('?cursor=a%2Bb', '/record/?cursor=a%2Bb&collection_id=c1'),
+])
+def test_get_page(app, monkeypatch, query, path):
+    calls = []
+    monkeypatch.setattr(api, 'get', lambda path, **params: calls.append((path, params)) or dict(items=[]))
+    with app.test_request_context(f'/records/{query}'):
+        pagination.get_page('/record/', '&collection_id=c1', sort='timestamp desc')
+    assert calls == [(path, dict(sort='timestamp desc'))]
@@ -0,0 +1,163 @@
+import os
+import threading
+from math import ceil
+
+import pytest
+from flask import Flask, g, has_app_context, has_request_context
+
+from benchmarks.fakeapi import FakeAPI
+from odp.const import ODPRecordTag, ODPScope
+from odp.ui.admin.lib import search, service
+
+fake = FakeAPI(records=20, collections=2)
+
+
+def record(i, **changes):
+    return fake.record(i) | changes
+
+
+class Client:
+    """Client serving the record list, most recently modified first,
+    and noting the Flask contexts in which it is called."""
+
+    def __init__(self, records):
+        self.records = sorted(records, key=lambda r: r['timestamp'], reverse=True)
+        self.contexts = []
+
+    def get(self, path, page, size, sort):
+        assert (path, sort) == ('/record/', 'timestamp desc')
+        self.contexts += [(has_app_context(), has_request_context())]
+        return dict(
+            items=self.records[(page - 1) * size:page * size],
+            total=len(self.records),
+            page=page,
+            pages=max(1, ceil(len(self.records) / size)),
+        )
+
+
+@pytest.fixture
+def index(tmp_path):
+    return search.RecordSearchIndex(str(tmp_path / 'search.db'))
+
+
+def test_search_text_and_identifiers(index):
+    index.upsert([record(1), record(2, metadata=dict(titles=[dict(title='Kelp forest survey')]))])
+    assert [r['id'] for r in index.search('kelp fo', None, 1)['items']] == [record(2)['id']]
+    assert [r['id'] for r in index.search(record(1)['doi'], None, 1)['items']] == [record(1)['id']]
+    assert index.search('"', None, 1)['total'] == 0
+
+
+def test_search_limited_to_collections(index):
+    index.upsert([record(1), record(2)])
+    result = index.search('synthetic', [record(2)['collection_id']], 1)
+    assert [r['id'] for r in result['items']] == [record(2)['id']]
+
+
+def test_summary_keeps_qc_tags(index):
+    tags = [
+        dict(tag_id=ODPRecordTag.QC, data=dict(pass_=True, comment='Checked')),
+        dict(tag_id=ODPRecordTag.EMBARGO, data=dict(start='2024-01-01', comment='Pending')),
+    ]
+    index.upsert([record(1, tags=tags)])
+    summary, = index.search('checked', None, 1)['items']
+    assert summary['tags'] == [dict(tag_id=ODPRecordTag.QC, data=dict(pass_=True))]
+
+
+def test_concurrent_upserts_from_processes_sharing_the_index(tmp_path):
+    # separate index objects stand in for gunicorn workers sharing the file
+    indexes = [search.RecordSearchIndex(str(tmp_path / 'search.db')) for _ in range(4)]
+    records = [record(i) for i in range(20)]
+    errors = []
+
+    def upsert(index):
+        try:
+            for _ in range(5):
+                index.upsert(records)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=upsert, args=(index,)) for index in indexes]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert indexes[0].count() == 20
+    assert indexes[0].search(record(3)['id'], None, 1)['total'] == 1
+
+
+def test_forked_process_opens_its_own_connection(index, monkeypatch):
+    monkeypatch.setattr(search, '_index', index)
+    index.upsert([record(1)])
+    parent_db = index._db()
+
+    if not (pid := os.fork()):
+        status = 1
+        try:
+            assert index._db() is not parent_db
+            assert index.count() == 1
+            status = 0
+        finally:
+            os._exit(status)
+
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+    assert index._db() is parent_db
+
+
+def test_refresh_and_rebuild(index):
+    client = Client([record(i) for i in range(5)])
+    index.refresh(client)
+    assert index.count() == 5
+    assert index.get_state('timestamp') == record(4)['timestamp']
+
+    client.records = [record(9, metadata=dict(titles=[dict(title='Estuary')]))] + client.records[1:]
+    index.refresh(client)
+    assert index.count() == 6
+    assert index.search('estuary', None, 1)['total'] == 1
+
+    index.refresh(client, rebuild=True)
+    assert index.count() == 5
+    assert record(4)['id'] not in {r['id'] for r in index.search('synthetic', None, 1)['items']}
+
+
+def test_refresh_with_service_client(index, monkeypatch):
+    client = Client([record(i) for i in range(3)])
+    monkeypatch.setattr(search, '_index', index)
+    monkeypatch.setattr(service, 'enabled', lambda: True)
+    monkeypatch.setattr(service, 'client', lambda: client)
+
+    refreshed = threading.Event()
+    refresh = index.refresh
+    monkeypatch.setattr(index, 'refresh', lambda *args, **kwargs: (refresh(*args, **kwargs), refreshed.set()))
+
+    app = Flask(__name__)
+    with app.test_request_context():
+        g.user_permissions = {ODPScope.RECORD_READ: ['c1']}
+        search.search('synthetic', [], 1)
+
+    assert refreshed.wait(5)
+    assert index.count() == 3
+    assert set(client.contexts) == {(True, False)}
+
+
+def test_no_refresh_without_service_client(index, monkeypatch):
+    monkeypatch.setattr(search, '_index', index)
+    monkeypatch.setattr(service, 'enabled', lambda: False)
+    monkeypatch.setattr(index, 'refresh', lambda *args, **kwargs: pytest.fail('refreshed'))
+
+    with Flask(__name__).test_request_context():
+        g.user_permissions = {ODPScope.RECORD_READ: '*'}
+        assert search.search('synthetic', [], 1)['total'] == 0
+
+
+def test_search_limited_to_permitted_collections(index, monkeypatch):
+    monkeypatch.setattr(search, '_index', index)
+    monkeypatch.setattr(service, 'enabled', lambda: False)
+    index.upsert([record(1), record(2)])
+
+    with Flask(__name__).test_request_context():
+        g.user_permissions = {ODPScope.RECORD_READ: [record(1)['collection_id']]}
+        assert [r['id'] for r in search.search('synthetic', [], 1)['items']] == [record(1)['id']]
+        assert search.search('synthetic', [record(2)['collection_id']], 1)['total'] == 0
@@ -0,0 +1,101 @@
+import time
+from math import ceil
+
+import pytest
+from flask import Flask, has_app_context, has_request_context
+
+from odp.lib.client import ODPAPIError
+from odp.ui.admin.lib import service, storage
+
+
+class Client:
+    """Client serving an archive's resources, noting the Flask contexts
+    in which it is called."""
+
+    def __init__(self, resources, fail_page=None):
+        self.resources = resources
+        self.fail_page = fail_page
+        self.contexts = []
+
+    def get(self, path, archive_id, page, size):
+        assert path == '/resource/all/'
+        self.contexts += [(has_app_context(), has_request_context())]
+        if page == self.fail_page:
+            raise ODPAPIError(503, 'Unavailable')
+        items = [r for r in self.resources if r['archive_id'] == archive_id]
+        return dict(
+            items=items[(page - 1) * size:page * size],
+            total=len(items),
+            page=page,
+            pages=max(1, ceil(len(items) / size)),
+        )
+
+
+def resource(i, archive_id='a1', **changes):
+    return dict(
+        archive_id=archive_id,
+        provider_id=f'p{i % 2}',
+        provider_key=f'provider-{i % 2}',
+        package_id=f'k{i % 3}' if i % 3 else None,
+        package_key=f'package-{i % 3}',
+        mimetype='text/csv' if i % 2 else 'image/tiff',
+        size=100 * i,
+        hash=f'h{i}',
+    ) | changes
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setattr(storage, '_summaries', storage.TTLCache(maxsize=8, ttl=600))
+    monkeypatch.setattr(storage, 'SCAN_PAGE_SIZE', 3)
+    monkeypatch.setattr(service, 'enabled', lambda: True)
+    return Flask(__name__)
+
+
+def use_client(monkeypatch, client):
+    monkeypatch.setattr(service, 'client', lambda: client)
+    return client
+
+
+def summarize(app, archive_id='a1', refresh=False, timeout=5):
+    with app.test_request_context():
+        summary = storage.get_summary(archive_id, refresh=refresh)
+    deadline = time.monotonic() + timeout
+    while not summary.done:
+        assert time.monotonic() < deadline, 'scan did not finish'
+        time.sleep(0.01)
+    return summary
+
+
+def test_scan_with_service_client(app, monkeypatch):
+    client = use_client(monkeypatch, Client([resource(i) for i in range(1, 11)] + [resource(99, 'a2')]))
+    summary = summarize(app)
+
+    assert summary.error is None
+    assert (summary.pages, summary.pages_scanned) == (4, 4)
+    assert (summary.total.count, summary.total.bytes) == (10, 5500)
+    assert summary.by_mimetype['text/csv'].count == 5
+    assert summary.by_package[None].count == 3
+    assert summary.provider_keys == {'p0': 'provider-0', 'p1': 'provider-1'}
+    assert set(client.contexts) == {(True, False)}
+
+
+def test_summary_shared_by_archive(app, monkeypatch):
+    use_client(monkeypatch, Client([resource(1)]))
+    first = summarize(app)
+    assert summarize(app) is first
+    assert summarize(app, refresh=True) is not first
+    assert summarize(app, 'a2') is not first
+
+
+def test_scan_error(app, monkeypatch):
+    use_client(monkeypatch, Client([resource(i) for i in range(1, 11)], fail_page=3))
+    summary = summarize(app)
+    assert summary.error == 'Unavailable'
+    assert summary.pages_scanned == 1
+
+
+def test_unavailable_without_service_client(app, monkeypatch):
+    monkeypatch.setattr(service, 'enabled', lambda: False)
+    with app.test_request_context():
+        assert storage.get_summary('a1') is None
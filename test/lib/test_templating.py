@@ -0,0 +1,77 @@
+import pytest
+from flask import Flask, render_template_string
+from jinja2 import FileSystemLoader
+from jinja2.runtime import Macro
+
+from odp.ui.admin.lib import templating
+
+TEMPLATES = {
+    'macros.j2': '{% macro cell(value) %}<td>{{ value }}</td>{% endmacro %}',
+    'table.html': '{% from "macros.j2" import cell %}{% for v in values %}{{ cell(v) }}{% endfor %}',
+    'broken.html': '{% from "macros.j2" import cell %}{{ cell(1) }}{{ fail() }}',
+}
+
+
+@pytest.fixture
+def make_app(monkeypatch, tmp_path):
+    templates = tmp_path / 'templates'
+    templates.mkdir()
+    for name, source in TEMPLATES.items():
+        (templates / name).write_text(source)
+
+    monkeypatch.setattr(Macro, '_invoke', templating._macro_invoke)
+    monkeypatch.setattr(templating, '_profile', {})
+    monkeypatch.setattr(templating, '_local', templating.threading.local())
+
+    def make_app(**config):
+        app = Flask(__name__)
+        app.config.update(config)
+        app.jinja_loader = FileSystemLoader(templates)
+        templating.init_app(app)
+        return app
+
+    return make_app
+
+
+def render(app, name, **context):
+    with app.test_request_context():
+        return app.jinja_env.get_template(name).render(**context)
+
+
+def test_bytecode_cache_off_by_default(make_app):
+    assert make_app().jinja_env.bytecode_cache is None
+
+
+def test_bytecode_cache_directory_is_private(make_app, tmp_path):
+    directory = tmp_path / 'bytecode'
+    app = make_app(TEMPLATE_BYTECODE_CACHE=True, TEMPLATE_BYTECODE_CACHE_DIR=str(directory))
+    assert render(app, 'table.html', values=[1]) == '<td>1</td>'
+    assert directory.stat().st_mode & 0o077 == 0
+    assert list(directory.iterdir())
+
+
+def test_profile_templates_and_macros(make_app):
+    app = make_app(TEMPLATE_PROFILING=True)
+    render(app, 'table.html', values=[1, 2, 3])
+    with app.test_request_context():
+        render_template_string('{{ 1 }}')
+
+    profile = templating.profile()
+    assert profile[('template', 'table.html')][0] == 1
+    assert profile[('macro', 'macros.j2:cell')][0] == 3
+    calls, seconds, self_seconds = profile[('template', 'table.html')]
+    assert self_seconds <= seconds
+    assert ('template', 'macros.j2') not in profile
+
+
+def test_profile_unwinds_failed_render(make_app):
+    app = make_app(TEMPLATE_PROFILING=True)
+    with pytest.raises(TypeError):
+        render(app, 'broken.html', fail=None)
+
+    assert templating._stack() == []
+    assert templating.profile()[('template', 'broken.html')][0] == 1
+
+    render(app, 'table.html', values=[1])
+    assert templating._stack() == []
+    assert templating.profile()[('template', 'table.html')][0] == 1
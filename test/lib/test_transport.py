@@ -0,0 +1,170 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+from authlib.integrations.flask_client import OAuth
+from authlib.integrations.requests_client import OAuth2Session
+from flask import Flask
+
+from odp.ui.admin.lib import transport
+from odp.ui.admin.lib.transport import APIAdapter
+
+
+class StubAPI(ThreadingHTTPServer):
+    """A local HTTP server standing in for the ODP API. ``responses`` maps
+    (method, path) to a list of (status, headers, body) responses, served
+    in turn (the last repeatedly); requests are recorded in ``log``."""
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), StubHandler)
+        self.responses = {}
+        self.log = []
+        self.url = f'http://127.0.0.1:{self.server_port}/api/'
+
+    def respond(self, method, path):
+        responses = self.responses.get((method, path)) or [(404, {}, b'')]
+        return responses.pop(0) if len(responses) > 1 else responses[0]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def _handle(self):
+        if length := int(self.headers.get('Content-Length') or 0):
+            self.rfile.read(length)
+        self.server.log.append((self.command, self.path, dict(self.headers)))
+        status, headers, body = self.server.respond(self.command, self.path)
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_HEAD = do_PUT = do_POST = do_DELETE = _handle
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_api():
+    server = StubAPI()
+    thread = threading.Thread(target=server.serve_forever, kwargs=dict(poll_interval=0.01), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def session_for(stub_api, **kwargs):
+    adapter = APIAdapter(retry_backoff=0, **kwargs)
+    session = requests.Session()
+    session.mount(stub_api.url, adapter)
+    return session, adapter
+
+
+def test_revalidation(stub_api):
+    stub_api.responses['GET', '/api/catalog/'] = [
+        (200, {'ETag': '"v1"', 'Content-Type': 'application/json'}, b'{"items": [1]}'),
+        (304, {'ETag': '"v1"'}, b''),
+    ]
+    session, adapter = session_for(stub_api)
+    headers = {'Authorization': 'Bearer user1'}
+
+    first = session.get(stub_api.url + 'catalog/', headers=headers)
+    second = session.get(stub_api.url + 'catalog/', headers=headers)
+
+    assert first.json() == second.json() == {'items': [1]}
+    assert second.status_code == 200
+    assert second.json() is not first.json()
+    assert stub_api.log[1][2]['If-None-Match'] == '"v1"'
+    assert adapter.stats()['revalidated'] == 1
+
+
+def test_revalidation_is_per_user(stub_api):
+    stub_api.responses['GET', '/api/catalog/'] = [
+        (200, {'ETag': '"v1"'}, b'{}'),
+    ]
+    session, _ = session_for(stub_api)
+    session.get(stub_api.url + 'catalog/', headers={'Authorization': 'Bearer user1'})
+    session.get(stub_api.url + 'catalog/', headers={'Authorization': 'Bearer user2'})
+
+    assert 'If-None-Match' not in stub_api.log[1][2]
+
+
+def test_response_cache_is_bounded_by_bytes(stub_api):
+    for n in range(4):
+        stub_api.responses['GET', f'/api/r/{n}'] = [(200, {'ETag': '"v"'}, b'x' * 100)]
+    session, adapter = session_for(stub_api, response_cache_bytes=250)
+
+    for n in range(4):
+        session.get(stub_api.url + f'r/{n}')
+
+    assert adapter.response_cache.weight == 200
+    assert not adapter.response_cache.get((stub_api.url + 'r/0', None))[0]
+    assert adapter.response_cache.get((stub_api.url + 'r/3', None))[0]
+
+
+def test_adapter_is_mounted_on_oauth_client_sessions(monkeypatch):
+    adapter = APIAdapter()
+    monkeypatch.setattr(transport, '_adapter', adapter)
+    monkeypatch.setattr(transport, '_api_url', 'http://odp.test/api/')
+    app = Flask(__name__)
+    oauth = OAuth(app)
+    oauth.register('hydra', client_id='ui', client_secret='secret',
+                   access_token_url='http://hydra.test/oauth2/token')
+    transport.init_app(app)
+
+    with oauth.hydra._get_oauth_client() as session:
+        assert session.get_adapter('http://odp.test/api/record/') is adapter
+        assert session.get_adapter('http://hydra.test/oauth2/token') is not adapter
+    assert OAuth2Session().get_adapter('http://odp.test/api/record/') is not adapter
+    assert requests.Session().get_adapter('http://odp.test/api/record/') is not adapter
+
+
+def test_closing_a_session_keeps_the_pool(stub_api):
+    stub_api.responses['GET', '/api/catalog/'] = [(200, {}, b'{}')]
+    adapter = APIAdapter(retry_backoff=0)
+    for _ in range(2):
+        with requests.Session() as session:
+            session.mount(stub_api.url, adapter)
+            session.get(stub_api.url + 'catalog/')
+
+    assert len(adapter.poolmanager.pools) == 1
+    assert adapter.stats()['requests'] == 2
+    adapter.reset()
+    assert len(adapter.poolmanager.pools) == 0
+
+
+def test_get_is_retried(stub_api):
+    stub_api.responses['GET', '/api/record/r1'] = [
+        (503, {}, b''),
+        (502, {}, b''),
+        (200, {}, b'{"id": "r1"}'),
+    ]
+    session, _ = session_for(stub_api, get_retries=2)
+    response = session.get(stub_api.url + 'record/r1')
+
+    assert response.json() == {'id': 'r1'}
+    assert len(stub_api.log) == 3
+
+
+def test_retries_are_limited(stub_api):
+    stub_api.responses['GET', '/api/record/r1'] = [(503, {}, b'')]
+    session, _ = session_for(stub_api, get_retries=2)
+
+    assert session.get(stub_api.url + 'record/r1').status_code == 503
+    assert len(stub_api.log) == 3
+
+
+@pytest.mark.parametrize('method', ['PUT', 'DELETE', 'POST'])
+def test_writes_are_not_retried(stub_api, method):
+    stub_api.responses[method, '/api/record/r1'] = [
+        (503, {}, b''),
+        (200, {}, b'{}'),
+    ]
+    session, _ = session_for(stub_api, get_retries=2)
+    response = session.request(method, stub_api.url + 'record/r1', json={})
+
+    assert response.status_code == 503
+    assert len(stub_api.log) == 1
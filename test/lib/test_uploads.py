@@ -0,0 +1,53 @@
+import io
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+from werkzeug.datastructures import FileStorage
+
+from odp.ui.admin.lib import uploads
+
+
+@pytest.fixture(autouse=True)
+def tmpdir(monkeypatch, tmp_path):
+    monkeypatch.setattr(uploads.tempfile, 'tempdir', str(tmp_path))
+    return tmp_path
+
+
+def dead_pid():
+    process = subprocess.Popen([sys.executable, '-c', ''])
+    process.wait()
+    return process.pid
+
+
+def test_save_and_remove(tmpdir):
+    path = uploads.save(FileStorage(io.BytesIO(b'{}'), filename='x.json'), '.json')
+    assert os.path.dirname(path) == str(tmpdir)
+    assert os.path.basename(path).startswith(f'{uploads.PREFIX}{os.getpid()}-')
+    assert path.endswith('.json')
+    with open(path, 'rb') as f:
+        assert f.read() == b'{}'
+
+    uploads.remove(path)
+    assert not os.path.exists(path)
+    uploads.remove(path)
+
+
+def test_sweep(tmpdir):
+    live = tmpdir / f'{uploads.PREFIX}{os.getpid()}-live.json'
+    old = tmpdir / f'{uploads.PREFIX}{os.getpid()}-old.json'
+    orphan = tmpdir / f'{uploads.PREFIX}{dead_pid()}-orphan.json'
+    other = tmpdir / 'other.json'
+    for path in (live, old, orphan, other):
+        path.write_text('{}')
+    stale = time.time() - uploads.MAX_AGE - 1
+    os.utime(old, (stale, stale))
+
+    uploads._sweep()
+
+    assert live.exists()
+    assert other.exists()
+    assert not old.exists()
+    assert not orphan.exists()
@@ -0,0 +1,76 @@
+import threading
+
+import pytest
+from flask import Flask, has_app_context
+
+from odp.ui.admin.lib import cache, service, warmup
+
+
+class Client:
+    def __init__(self, fail=(), block=None):
+        self.fail = fail
+        self.block = block
+        self.calls = []
+
+    def get(self, path, **params):
+        assert has_app_context()
+        self.calls += [(path, params)]
+        if self.block:
+            self.block.wait(5)
+        if path in self.fail:
+            raise RuntimeError(path)
+        return dict(items=[path], total=1, page=1, pages=1)
+
+
+@pytest.fixture
+def make_app(monkeypatch):
+    monkeypatch.setattr(cache, 'reference_cache', cache.TTLCache(maxsize=16, ttl=60))
+
+    def make_app(client, **config):
+        monkeypatch.setattr(service, 'enabled', lambda: client is not None)
+        monkeypatch.setattr(service, 'client', lambda: client)
+        app = Flask(__name__)
+        app.config.update(config)
+        warmup.init_app(app)
+        return app
+
+    return make_app
+
+
+def warmed(path, params):
+    return cache.reference_cache.get(cache._key(cache.SHARED, path, params))
+
+
+def warmup_threads():
+    return [t for t in threading.enumerate() if t.name.startswith('odp-admin-warmup')]
+
+
+def test_warm_up_before_app_is_returned(make_app):
+    client = Client(fail=('/role/',))
+    make_app(client)
+
+    assert sorted(client.calls) == sorted(warmup.WARMUP_REQUESTS)
+    assert warmed('/catalog/', {}) == (True, dict(items=['/catalog/'], total=1, page=1, pages=1))
+    assert warmed('/schema/', {'schema_type': 'metadata'})[0]
+    assert not warmed('/role/', {})[0]
+
+
+def test_no_warm_up_without_service_client(make_app):
+    make_app(None)
+    assert cache.reference_cache.weight == 0
+
+
+def test_warm_up_threads_are_released(make_app):
+    make_app(Client())
+    for thread in warmup_threads():
+        thread.join(5)
+    assert not warmup_threads()
+
+
+def test_warm_up_timeout(make_app):
+    release = threading.Event()
+    try:
+        make_app(Client(block=release), WARMUP_TIMEOUT=0.1)
+        assert not warmed('/catalog/', {})[0]
+    finally:
+        release.set()
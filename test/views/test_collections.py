@@ -0,0 +1,100 @@
+from datetime import date, timedelta
+
+import pytest
+from flask import Flask, g
+
+from odp.const import ODPCollectionTag, ODPRecordTag, ODPScope
+from odp.ui.admin.views import collections
+
+
+def record(valid=True, tags=(), catalog_ids=()):
+    return dict(validity=dict(valid=valid), tags=list(tags), published_catalog_ids=list(catalog_ids))
+
+
+def tag(tag_id, **data):
+    return dict(id=f'{tag_id}-tag', tag_id=tag_id, data=data)
+
+
+@pytest.fixture
+def record_page(monkeypatch):
+    requested = []
+    page = dict(items=[], page=1, pages=3, total=0)
+
+    def get(path, **params):
+        requested.append((path, params))
+        return page
+
+    monkeypatch.setattr(collections.api, 'get', get)
+    return page, requested
+
+
+def test_record_stats(record_page):
+    page, requested = record_page
+    today = date.today()
+    page['items'] += [
+        record(tags=[tag(ODPRecordTag.QC, pass_=True)], catalog_ids=['SAEON']),
+        record(tags=[tag(ODPRecordTag.QC, pass_=True), tag(ODPRecordTag.QC, pass_=False)]),
+        record(valid=False, tags=[
+            tag(ODPRecordTag.EMBARGO, start=(today - timedelta(days=1)).isoformat(), end=None),
+            tag(ODPRecordTag.NOTSEARCHABLE),
+        ], catalog_ids=['SAEON', 'DataCite']),
+        record(tags=[
+            tag(ODPRecordTag.EMBARGO, start=None, end=(today - timedelta(days=1)).isoformat()),
+            tag(ODPRecordTag.RETRACTED),
+        ]),
+    ]
+    page['total'] = 450
+
+    with Flask(__name__).test_request_context(query_string={'page': 2}):
+        result = collections.record_stats('c1')
+
+    assert requested == [('/record/', dict(collection_id='c1', page=2, size=collections.RECORD_STATS_PAGE_SIZE))]
+    assert result['pages'] == 3
+    assert result['total'] == 450
+    assert result['counts'] == dict(
+        records=4, valid=3, invalid=1, qc_passed=1, qc_failed=1, qc_none=2,
+        embargoed=1, notsearchable=1, retracted=1, published={'SAEON': 2, 'DataCite': 1},
+    )
+
+
+class FakeCollectionAPI:
+    def __init__(self):
+        self.deleted = []
+
+    def get(self, path, **params):
+        return dict(id=path.rsplit('/', 1)[1], tags=[tag(ODPCollectionTag.PUBLISHED)])
+
+    def delete(self, path, **params):
+        self.deleted.append(path)
+
+
+def test_bulk_untag_uses_admin_route_where_permitted(monkeypatch):
+    app = Flask(__name__)
+    fake = FakeCollectionAPI()
+    permissions = {ODPScope.COLLECTION_PUBLISH: '*', ODPScope.COLLECTION_ADMIN: ['c1']}
+    grant = collections.jobs.Grant(fake, permissions)
+    submitted = []
+    monkeypatch.setattr(collections.jobs, 'grant', lambda: grant)
+
+    def submit(title, items, func, **kwargs):
+        submitted.append((items, func, kwargs))
+        return collections.jobs.Job(id='j1', title=title, user_id='u1')
+
+    monkeypatch.setattr(collections.jobs, 'submit', submit)
+    monkeypatch.setattr(collections, 'redirect', lambda url: ('redirect', url))
+    monkeypatch.setattr(collections, 'url_for', lambda endpoint, **values: f'/{endpoint}')
+
+    data = dict(tag_id=ODPCollectionTag.PUBLISHED.value, action='remove', collection_id=['c1', 'c2'])
+    with app.test_request_context(method='POST', data=data):
+        g.user_permissions = permissions
+        collections.bulk_tag()
+
+    (items, func, kwargs), = submitted
+    for collection_id in items:
+        func(collection_id)
+
+    assert kwargs['retry']
+    assert fake.deleted == [
+        f'/collection/admin/c1/tag/{ODPCollectionTag.PUBLISHED}-tag',
+        f'/collection/c2/tag/{ODPCollectionTag.PUBLISHED}-tag',
+    ]
@@ -0,0 +1,29 @@
+import pytest
+from flask import Flask, get_flashed_messages
+
+from odp.ui.admin.views import jobs
+
+
+@pytest.fixture
+def app(monkeypatch):
+    app = Flask(__name__)
+    app.secret_key = 'test'
+    monkeypatch.setattr(jobs.jobs, 'get', lambda job_id: None)
+    monkeypatch.setattr(jobs, 'redirect', lambda url: ('redirect', url))
+    monkeypatch.setattr(jobs, 'url_for', lambda endpoint, **values: f'/{endpoint}')
+    return app
+
+
+@pytest.mark.parametrize('endpoint, method', [
+    (jobs.detail, 'GET'),
+    (jobs.cancel, 'POST'),
+])
+def test_unknown_job_is_explained(app, endpoint, method):
+    with app.test_request_context(method=method):
+        assert endpoint('j1') == ('redirect', '/.index')
+        assert get_flashed_messages() == [jobs.JOB_NOT_FOUND]
+
+
+def test_unknown_job_status_is_explained(app):
+    with app.test_request_context():
+        assert jobs.status('j1') == ({'error': jobs.JOB_NOT_FOUND}, 404)
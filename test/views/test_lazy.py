@@ -0,0 +1,70 @@
+import threading
+
+import pytest
+from flask import Flask
+
+from odp.ui.admin import views
+
+
+@pytest.fixture
+def make_app(monkeypatch):
+    loads = []
+    load = views.load
+
+    def counting_load(app):
+        loads.append(app)
+        load(app)
+
+    monkeypatch.setattr(views, 'load', counting_load)
+
+    def make_app(**config):
+        app = Flask(__name__)
+        app.config.update(config)
+        views.init_app(app)
+        return app
+
+    make_app.loads = loads
+    return make_app
+
+
+def test_views_load_eagerly_by_default(make_app):
+    app = make_app()
+    assert 'home' in app.blueprints
+    assert {'records', 'providers', 'packages'} <= set(app.blueprints)
+
+
+def test_lazy_views_load_on_first_request(make_app):
+    app = make_app(LAZY_VIEWS=True)
+    assert 'home' not in app.blueprints
+    assert not make_app.loads
+
+    client = app.test_client()
+    client.get('/nowhere')
+    assert 'records' in app.blueprints
+    client.get('/nowhere')
+    assert make_app.loads == [app]
+
+
+def test_lazy_views_load_once_under_concurrent_requests(make_app):
+    app = make_app(LAZY_VIEWS=True)
+    barrier = threading.Barrier(8)
+
+    def first_request():
+        barrier.wait()
+        app.test_client().get('/nowhere')
+
+    threads = [threading.Thread(target=first_request) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert make_app.loads == [app]
+
+
+def test_load_is_idempotent():
+    app = Flask(__name__)
+    views.load(app)
+    blueprints = dict(app.blueprints)
+    views.load(app)
+    assert app.blueprints == blueprints
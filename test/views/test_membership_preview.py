@@ -0,0 +1,43 @@
+from pathlib import Path
+
+import pytest
+from flask import Flask, render_template
+from jinja2 import ChoiceLoader, DictLoader, FileSystemLoader
+
+import odp.ui.admin
+from odp.ui.admin.lib.membership import Delta
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.jinja_loader = ChoiceLoader([
+        # stand-in for the odp-ui base template
+        DictLoader({'admin_base.html': '{% block web_title %}{% endblock %}{% block content %}{% endblock %}'}),
+        FileSystemLoader(Path(odp.ui.admin.__file__).parent / 'templates'),
+    ])
+    return app
+
+
+def render(app, **context):
+    with app.test_request_context('/providers/p1/edit', method='POST', data={'key': 'provider-1'}):
+        return render_template('membership_preview.html', title='Provider', **context)
+
+
+def test_confirm_with_changes(app):
+    html = render(app, changes=[], deltas=[Delta('Users', added=[('u1', 'Alice')], removed=[])])
+    assert 'name="confirm"' in html
+    assert '+ Alice' in html
+    assert 'No changes' not in html
+
+
+def test_no_confirm_without_changes(app):
+    html = render(app, changes=[], deltas=[Delta('Users', added=[], removed=[])])
+    assert 'name="confirm"' not in html
+    assert 'No changes have been made.' in html
+    assert 'Back' in html
+
+
+def test_confirm_with_field_changes_only(app):
+    html = render(app, changes=[('Name', 'Old', 'New')], deltas=[Delta('Users', added=[], removed=[])])
+    assert 'name="confirm"' in html
@@ -0,0 +1,188 @@
+import threading
+
+import pytest
+from flask import Flask
+from werkzeug.exceptions import BadRequest, HTTPException
+
+from odp.lib.client import ODPAPIError
+from odp.ui.admin.views import packages
+
+
+def resource(n, mimetype='text/csv', size=100):
+    return dict(id=f'r{n}', title=f'Resource {n}', filename=f'file{n}.csv', mimetype=mimetype, size=size)
+
+
+@pytest.fixture
+def resource_pages(monkeypatch):
+    """Serve API pages of ``packages.RESOURCE_PICKER_PAGE_SIZE`` resources,
+    recording the pages requested."""
+    resources = []
+    requested = []
+
+    def get(path, page, size, **params):
+        assert path == '/resource/all/'
+        requested.append(page)
+        return dict(
+            items=resources[(page - 1) * size:page * size],
+            pages=max(1, -(-len(resources) // size)),
+        )
+
+    monkeypatch.setattr(packages.api, 'get', get)
+    monkeypatch.setattr(packages, 'RESOURCE_PICKER_PAGE_SIZE', 3)
+    monkeypatch.setattr(packages, 'RESOURCE_PICKER_MAX_SCAN', 2)
+    return resources, requested
+
+
+def fetch(**args):
+    with Flask(__name__).test_request_context(query_string=args):
+        return packages.fetch_resources('p1')
+
+
+def test_fetch_resources_pages_with_cursor(resource_pages):
+    resources, requested = resource_pages
+    resources += [resource(n) for n in range(5)]
+
+    result = fetch()
+    assert [item['id'] for item in result['items']] == ['r0', 'r1', 'r2']
+    assert result['cursor'] == '1.3'
+
+    result = fetch(cursor=result['cursor'])
+    assert [item['id'] for item in result['items']] == ['r3', 'r4']
+    assert result['cursor'] is None
+
+
+def test_fetch_resources_filters(resource_pages):
+    resources, _ = resource_pages
+    resources += [
+        resource(0, mimetype='image/png'),
+        resource(1, size=10),
+        resource(2, size=1000),
+        resource(3),
+    ]
+    result = fetch(mimetype='text/', min_size=50, max_size=500)
+    assert [item['id'] for item in result['items']] == ['r3']
+    assert set(result['items'][0]) == {'id', 'title', 'filename', 'size', 'mimetype'}
+
+
+def test_fetch_resources_scan_is_capped(resource_pages):
+    resources, requested = resource_pages
+    resources += [resource(n, mimetype='image/png') for n in range(9)]
+
+    result = fetch(mimetype='text/')
+    assert result == dict(items=[], cursor='3.0')
+    assert requested == [1, 2]
+
+
+def test_fetch_resources_invalid_cursor(resource_pages):
+    with pytest.raises(BadRequest):
+        fetch(cursor='x')
+
+
+def test_fetch_resources_api_error(monkeypatch):
+    def get(path, **params):
+        raise ODPAPIError(403, 'Forbidden')
+
+    monkeypatch.setattr(packages.api, 'get', get)
+    with pytest.raises(HTTPException) as excinfo:
+        fetch()
+    assert excinfo.value.code == 403
+
+
+@pytest.fixture
+def package_api(monkeypatch):
+    """Serve a package of 5 resources, recording GETs and PUTs."""
+    resources = [resource(n) for n in range(5)]
+    package = dict(id='k1', title='Package', provider_id='p1', resource_ids=[r['id'] for r in resources], tags=[])
+    calls = []
+
+    def get(path, **params):
+        calls.append(('GET', path, params))
+        if path == '/package/all/k1':
+            return package
+        assert path == '/resource/all/' and params['package_id'] == 'k1'
+        page, size = params['page'], params['size']
+        return dict(
+            items=resources[(page - 1) * size:page * size],
+            total=len(resources),
+            page=page,
+            pages=-(-len(resources) // size),
+        )
+
+    def put(path, data, **params):
+        calls.append(('PUT', path, data))
+
+    monkeypatch.setattr(packages.api, 'get', get)
+    monkeypatch.setattr(packages.api, 'put', put)
+    monkeypatch.setattr(packages, 'RESOURCE_PICKER_PAGE_SIZE', 2)
+    monkeypatch.setattr(packages, 'render_template', lambda template, **context: context)
+    monkeypatch.setattr(packages, 'flash', lambda *args, **kwargs: None)
+    monkeypatch.setattr(packages.utils, 'populate_provider_choices',
+                        lambda field, include_none=False: setattr(field, 'choices', [('p1', 'Provider 1')]))
+    return calls
+
+
+def test_edit_lists_first_page_of_resources(package_api):
+    with Flask(__name__).test_request_context():
+        context = packages.edit('k1')
+
+    assert [choice[0] for choice in context['form'].remove_resource_ids.choices] == ['r0', 'r1']
+    assert context['package_resources']['pages'] == 3
+
+
+def test_edit_applies_membership_delta(package_api):
+    app = Flask(__name__)
+    app.register_blueprint(packages.bp, url_prefix='/packages')
+    with app.test_request_context('/packages/k1/edit', method='POST', data=dict(
+            title='Package',
+            provider_id='p1',
+            add_resource_ids=['r9'],
+            remove_resource_ids=['r1', 'r4'],
+    )):
+        packages.edit('k1')
+
+    assert ('PUT', '/package/admin/k1', dict(
+        provider_id='p1',
+        title='Package',
+        resource_ids=['r0', 'r2', 'r3', 'r9'],
+    )) in package_api
+
+
+def test_fetch_package_resources(package_api):
+    with Flask(__name__).test_request_context(query_string=dict(page=3)):
+        result = packages.fetch_package_resources('k1')
+
+    assert result == dict(items=[dict(id='r4', label=packages._resource_label(resource(4)))], page=3, pages=3, total=5)
+
+
+def test_edit_rerenders_added_resource_labels(package_api):
+    with Flask(__name__).test_request_context(method='POST', data={
+        'title': '',
+        'provider_id': 'p1',
+        'add_resource_ids': ['r8', 'r9'],
+        'resource-label-r9': packages._resource_label(resource(9)),
+    }):
+        context = packages.edit('k1')
+
+    assert context['form'].add_resource_ids.choices == [('r8', 'r8'), ('r9', packages._resource_label(resource(9)))]
+    assert not [call for call in package_api if call[0] == 'PUT']
+
+
+def test_detail_fetches_package_and_resources_concurrently(monkeypatch):
+    barrier = threading.Barrier(2, timeout=5)
+    package = dict(id='k1', title='Package', tags=[])
+
+    def get(path, **params):
+        # each request waits for the other, so that serial requests fail
+        barrier.wait()
+        if path == '/package/all/k1':
+            return package
+        assert (path, params) == ('/resource/all/?page=1', dict(package_id='k1'))
+        return dict(items=[resource(0)], total=1, page=1, pages=1)
+
+    monkeypatch.setattr(packages.api, 'get', get)
+    monkeypatch.setattr(packages, 'render_template', lambda template, **context: context)
+    with Flask(__name__).test_request_context():
+        context = packages.detail('k1')
+
+    assert context['package'] is package
+    assert context['resources']['items'] == [resource(0)]
@@ -0,0 +1,111 @@
+import pytest
+from flask import Flask
+
+from odp.ui.admin.views import providers
+
+
+def test_user_choices_use_posted_labels(monkeypatch):
+    def get(*args, **kwargs):
+        raise AssertionError('unexpected API call')
+
+    monkeypatch.setattr(providers.api, 'get', get)
+    app = Flask(__name__)
+    with app.test_request_context(method='POST', data={
+        'add_user_ids': ['u1', 'u2'],
+        'user-label-u1': 'Alice | alice@example.org',
+    }):
+        assert providers._user_choices(['u1', 'u2']) == [
+            ('u1', 'Alice | alice@example.org'),
+            ('u2', 'u2'),
+        ]
+
+
+def test_user_choices_none_selected():
+    app = Flask(__name__)
+    with app.test_request_context():
+        assert providers._user_choices(None) == []
+
+
+def provider(users=120):
+    return dict(
+        id='p1',
+        key='provider-1',
+        name='Provider 1',
+        user_names={f'u{n}': f'User {n:03d}' for n in reversed(range(users))},
+    )
+
+
+def test_member_pages():
+    first = providers._member_page(provider(), 1)
+    assert first['items'][:2] == [('u0', 'User 000'), ('u1', 'User 001')]
+    assert (len(first['items']), first['total'], first['pages']) == (50, 120, 3)
+    assert providers._member_page(provider(), 3)['items'][-1] == ('u119', 'User 119')
+
+
+def test_member_search():
+    result = providers._member_page(provider(), 1, ' user 11 ')
+    assert [user_id for user_id, _ in result['items']] == [f'u{n}' for n in range(110, 120)]
+    assert (result['total'], result['pages']) == (10, 1)
+
+
+@pytest.fixture
+def provider_api(monkeypatch):
+    calls = []
+
+    def get(path, **params):
+        calls.append(('GET', path))
+        assert path == '/provider/all/p1'
+        return provider()
+
+    def put(path, data, **params):
+        calls.append(('PUT', path, data))
+
+    monkeypatch.setattr(providers.api, 'get', get)
+    monkeypatch.setattr(providers.api, 'put', put)
+    monkeypatch.setattr(providers, 'render_template', lambda template, **context: (template, context))
+    monkeypatch.setattr(providers, 'flash', lambda *args, **kwargs: None)
+    app = Flask(__name__)
+    app.register_blueprint(providers.bp, url_prefix='/providers')
+    return app, calls
+
+
+def test_fetch_members(provider_api):
+    app, _ = provider_api
+    with app.test_request_context('/providers/p1/members?page=2&q=user'):
+        result = providers.fetch_members('p1')
+    assert result['items'][0] == {'id': 'u50', 'label': 'User 050'}
+    assert (result['page'], result['pages'], result['total']) == (2, 3, 120)
+
+
+def test_edit_lists_first_page_of_members(provider_api):
+    app, _ = provider_api
+    with app.test_request_context('/providers/p1/edit'):
+        template, context = providers.edit('p1')
+    assert template == 'provider_edit.html'
+    assert len(context['form'].remove_user_ids.choices) == 50
+    assert context['members']['total'] == 120
+
+
+def test_edit_preview_and_confirm(provider_api):
+    app, calls = provider_api
+    data = {
+        'key': 'provider-1',
+        'name': 'Provider 1',
+        'add_user_ids': ['new'],
+        'user-label-new': 'New User',
+        'remove_user_ids': ['u1', 'u100'],
+    }
+    with app.test_request_context('/providers/p1/edit', method='POST', data=data):
+        template, context = providers.edit('p1')
+    assert template == 'membership_preview.html'
+    assert context['changes'] == []
+    delta, = context['deltas']
+    assert delta.added == [('new', 'New User')]
+    assert delta.removed == [('u1', 'User 001'), ('u100', 'User 100')]
+
+    with app.test_request_context('/providers/p1/edit', method='POST', data=data | {'confirm': '1'}):
+        providers.edit('p1')
+    _, _, put = calls[-1]
+    assert 'u1' not in put['user_ids'] and 'u100' not in put['user_ids']
+    assert put['user_ids'][-1] == 'new'
+    assert len(put['user_ids']) == 119
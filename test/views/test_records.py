@@ -0,0 +1,275 @@
+import zipfile
+
+import pytest
+from flask import Flask, g, session
+from werkzeug.exceptions import HTTPException
+from wtforms.csrf.session import SessionCSRF
+
+from odp.lib.client import ODPAPIError
+from odp.ui.admin.views import records
+
+
+@pytest.fixture
+def app():
+    return Flask(__name__)
+
+
+@pytest.fixture
+def rendered(monkeypatch):
+    """Capture render_template calls made by the records views."""
+    calls = []
+
+    def render_template(template, **context):
+        calls.append((template, context))
+        return template
+
+    monkeypatch.setattr(records, 'render_template', render_template)
+    return calls
+
+
+@pytest.fixture
+def api_get(monkeypatch):
+    """Serve API GETs from a dict of path: result, recording the paths requested."""
+    results = {}
+    requested = []
+
+    def get(path, **params):
+        requested.append(path)
+        result = results[path]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    monkeypatch.setattr(records.api, 'get', get)
+    return results, requested
+
+
+@pytest.mark.parametrize('endpoint, path, template, key', [
+    (records.metadata_fragment, '/record/r1', 'record_metadata.html', 'record'),
+    (records.catalog_fragment, '/record/r1/catalog', 'record_catalog_records.html', 'catalog_records'),
+])
+def test_fragments(app, rendered, api_get, endpoint, path, template, key):
+    results, requested = api_get
+    results[path] = {'fetched': path}
+    with app.test_request_context():
+        assert endpoint('r1') == template
+
+    assert requested == [path]
+    assert rendered[0][1][key] == {'fetched': path}
+
+
+def test_audit_fragment(app, rendered, api_get):
+    results, requested = api_get
+    results['/record/r1/audit'] = dict(items=[{'audit_id': 1}], total=25, page=1, pages=3)
+    with app.test_request_context():
+        records.audit_fragment('r1')
+
+    assert requested == ['/record/r1/audit']
+    assert rendered[0][1]['audit_records'] == dict(items=[{'audit_id': 1}], total=25, page=1, pages=1)
+
+
+def test_fragment_api_error(app, rendered, api_get):
+    results, _ = api_get
+    results['/record/r1/audit'] = ODPAPIError(404, 'Not found')
+    with app.test_request_context(), pytest.raises(HTTPException) as excinfo:
+        records.audit_fragment('r1')
+
+    assert excinfo.value.code == 404
+    assert not rendered
+
+
+class FakeRecordAPI:
+    """A record listing that shrinks as records are deleted, as the API's does."""
+
+    def __init__(self, n):
+        self.records = [dict(id=f'r{i}', collection_id='c1') for i in range(n)]
+
+    def get(self, path, **params):
+        if path.startswith('/record/?'):
+            args = dict(arg.split('=') for arg in path.split('?', 1)[1].split('&'))
+            page, size = int(args['page']), int(args['size'])
+            return dict(
+                items=self.records[(page - 1) * size:page * size],
+                total=len(self.records),
+                pages=max(1, -(-len(self.records) // size)),
+            )
+        return next(record for record in self.records if f'/record/{record["id"]}' == path)
+
+    def delete(self, path, **params):
+        self.records = [record for record in self.records if not path.endswith(f'/{record["id"]}')]
+
+
+@pytest.fixture
+def bulk_delete(app, monkeypatch, rendered):
+    """Post to bulk_delete, returning the response and the submitted job's
+    (items, func), if any."""
+    app.secret_key = 'test'
+    fake = FakeRecordAPI(250)
+    grant = records.jobs.Grant(fake, {records.ODPScope.RECORD_READ: '*', records.ODPScope.RECORD_WRITE: '*'})
+    submitted = []
+
+    monkeypatch.setattr(records.api, 'get', fake.get)
+    monkeypatch.setattr(records.jobs, 'grant', lambda: grant)
+    def submit(title, items, func, **kwargs):
+        submitted.append((items, func))
+        return records.jobs.Job(id='j1', title=title, user_id='u1')
+
+    monkeypatch.setattr(records.jobs, 'submit', submit)
+    monkeypatch.setattr(records, 'redirect', lambda url: ('redirect', url))
+    monkeypatch.setattr(records, 'url_for', lambda endpoint, **values: f'/{endpoint}')
+
+    def post(**data):
+        submitted.clear()
+        with app.test_request_context(method='POST', data=data):
+            g.user_permissions = grant.permissions
+            response = records.bulk_delete()
+        return response, submitted[0] if submitted else None
+
+    post.fake = fake
+    return post
+
+
+def test_bulk_delete_all_requires_filter(bulk_delete):
+    response, job = bulk_delete(select_all='y')
+    assert response[0] == 'redirect'
+    assert job is None
+
+
+def test_bulk_delete_all_is_confirmed_with_filter_and_count(bulk_delete, rendered):
+    response, job = bulk_delete(select_all='y', collection='c1', title_q='x')
+    assert job is None
+    template, context = rendered[0]
+    assert template == 'record_bulk_delete.html'
+    assert context['total'] == 250
+    assert context['filters'] == [('Title', 'x'), ('Collection', 'c1')]
+
+
+def test_bulk_delete_all_deletes_every_match(bulk_delete):
+    response, (items, func) = bulk_delete(select_all='y', collection='c1', confirm='1')
+    for record_id in items:
+        func(record_id)
+
+    assert bulk_delete.fake.records == []
+
+
+class CSRFRecordBulkDeleteForm(records.RecordBulkDeleteForm):
+    class Meta:
+        csrf = True
+        csrf_class = SessionCSRF
+        csrf_secret = b'test'
+
+        @property
+        def csrf_context(self):
+            return session
+
+
+@pytest.mark.parametrize('csrf_token', [None, 'bad'])
+def test_bulk_delete_requires_csrf_token(bulk_delete, monkeypatch, csrf_token):
+    monkeypatch.setattr(records, 'RecordBulkDeleteForm', CSRFRecordBulkDeleteForm)
+    data = dict(record_id='r1')
+    if csrf_token:
+        data['csrf_token'] = csrf_token
+    response, job = bulk_delete(**data)
+
+    assert response[0] == 'redirect'
+    assert job is None
+    assert len(bulk_delete.fake.records) == 250
+
+
+def export_record(n):
+    return dict(
+        id=f'r{n}', doi=None, sid=f'sid{n}', metadata={'title': f'Record {n}'}, collection_id='c1',
+        collection_key='C1', schema_id='s', validity=dict(valid=True), published_catalog_ids=[],
+        timestamp='2024-01-01T00:00:00+00:00',
+    )
+
+
+@pytest.fixture
+def failing_record_pages(monkeypatch):
+    """Serve a first page of records, and fail on the second."""
+    def get(path, **params):
+        if '?page=1&' in path:
+            return dict(items=[export_record(0), export_record(1)], page=1, pages=2, total=4)
+        raise ODPAPIError(503, 'Unavailable')
+
+    monkeypatch.setattr(records.api, 'get', get)
+
+
+@pytest.mark.parametrize('export_format, marker', [
+    ('csv', '# ERROR: export incomplete: 503: Unavailable\n'),
+    ('jsonl', '{"error": "export incomplete: 503: Unavailable"}\n'),
+])
+def test_export_error_ends_and_aborts_stream(app, failing_record_pages, export_format, marker):
+    lines = []
+    with app.test_request_context(query_string={'format': export_format}):
+        response = records.export()
+        with pytest.raises(ODPAPIError):
+            for line in response.response:
+                lines.append(line)
+
+    assert len(lines) == (4 if export_format == 'csv' else 3)
+    assert lines[-1] == marker
+
+
+def write_zip(path, members):
+    with zipfile.ZipFile(path, 'w') as zf:
+        for name, content in members.items():
+            zf.writestr(name, content)
+
+
+def test_iter_import_documents(tmp_path):
+    path = tmp_path / 'upload.zip'
+    write_zip(path, {
+        'a.json': '[{"doi": "10.1/a"}, {"doi": "10.1/b"}]',
+        'b.jsonl': '{"doi": "10.1/c"}\n\n{"doi": "10.1/d"}\n',
+        'c.json': '{"doi": ',
+        'readme.txt': 'ignored',
+    })
+    documents = list(records._iter_import_documents(str(path), 'upload.zip'))
+
+    assert [label for label, _ in documents] == ['a.json[1]', 'a.json[2]', 'b.jsonl:1', 'b.jsonl:3', 'c.json']
+    assert documents[0][1] == {'doi': '10.1/a'}
+    assert documents[2][1] == '{"doi": "10.1/c"}'
+    assert isinstance(documents[4][1], ValueError)
+    assert path.exists()
+
+
+@pytest.mark.parametrize('document, expected', [
+    ({'doi': '10.15493/a.1'}, dict(doi='10.15493/a.1', sid=None, metadata={'doi': '10.15493/a.1'})),
+    ('{"metadata": {"title": "t"}, "sid": "sid-1"}', dict(doi=None, sid='sid-1', metadata={'title': 't'})),
+])
+def test_import_record(document, expected):
+    assert records._import_record(document) == expected
+
+
+@pytest.mark.parametrize('document', [ValueError('bad'), '[1]', '{"title": "no id"}'])
+def test_import_record_invalid(document):
+    with pytest.raises(records.jobs.JobItemError):
+        records._import_record(document)
+
+
+def test_check_import_file_limits(tmp_path, monkeypatch):
+    monkeypatch.setattr(records, 'IMPORT_MAX_JSON_SIZE', 10)
+    monkeypatch.setattr(records, 'IMPORT_MAX_ZIP_MEMBERS', 2)
+    monkeypatch.setattr(records, 'IMPORT_MAX_ZIP_SIZE', 100)
+
+    large_json = tmp_path / 'large.json'
+    large_json.write_text('[' + '{}, ' * 10 + '{}]')
+    assert 'JSON Lines' in records._check_import_file(str(large_json), '.json')
+    assert records._check_import_file(str(large_json), '.jsonl') is None
+
+    zip_path = tmp_path / 'upload.zip'
+    write_zip(zip_path, {'a.jsonl': '{}', 'b.jsonl': '{}', 'c.txt': 'x' * 1000})
+    assert records._check_import_file(str(zip_path), '.zip') is None
+
+    write_zip(zip_path, {'a.jsonl': '{}', 'b.jsonl': '{}', 'c.jsonl': '{}'})
+    assert 'limited to 2 files' in records._check_import_file(str(zip_path), '.zip')
+
+    write_zip(zip_path, {'a.jsonl': '{}\n' * 60})
+    assert 'uncompressed' in records._check_import_file(str(zip_path), '.zip')
+
+    write_zip(zip_path, {'a.json': '[' + '{}, ' * 10 + '{}]'})
+    assert 'JSON Lines' in records._check_import_file(str(zip_path), '.zip')
+
+    zip_path.write_bytes(b'not a zip')
+    assert records._check_import_file(str(zip_path), '.zip') == 'Invalid zip file.'
@@ -0,0 +1,53 @@
+import pytest
+from flask import Flask
+
+from odp.ui.admin.views import roles
+
+
+@pytest.fixture
+def role_api(monkeypatch):
+    """Serve a role, recording POSTs and PUTs, and the templates rendered."""
+    role = dict(id='r1', collection_specific=False, collection_keys=['c1'], scope_ids=['odp.record:read'])
+    calls = []
+
+    def populate_collection_choices(field):
+        field.choices = [('c1', 'C1'), ('c2', 'C2')]
+
+    def populate_scope_choices(field, scope_types):
+        field.choices = [(scope, scope) for scope in ('odp.record:read', 'odp.record:write')]
+
+    monkeypatch.setattr(roles.api, 'get', lambda path, **params: role)
+    monkeypatch.setattr(roles.api, 'post', lambda path, data, **params: calls.append(('POST', path, data)))
+    monkeypatch.setattr(roles.api, 'put', lambda path, data, **params: calls.append(('PUT', path, data)))
+    monkeypatch.setattr(roles.utils, 'populate_collection_choices', populate_collection_choices)
+    monkeypatch.setattr(roles.utils, 'populate_scope_choices', populate_scope_choices)
+    monkeypatch.setattr(roles, 'render_template', lambda template, **context: calls.append(('render', template)))
+    return calls
+
+
+@pytest.mark.parametrize('data', [
+    dict(add_scope_ids=['odp.role:admin']),
+    dict(add_collection_ids=['c9']),
+    dict(remove_scope_ids=['odp.record:write']),
+    dict(remove_collection_ids=['c2']),
+])
+def test_edit_rejects_ids_not_offered(role_api, data):
+    with Flask(__name__).test_request_context(method='POST', data=dict(id='r1', confirm='1') | data):
+        roles.edit('r1')
+
+    assert role_api == [('render', 'role_edit.html')]
+
+
+def test_create_rejects_scopes_not_offered(role_api):
+    with Flask(__name__).test_request_context(method='POST', data=dict(id='r2', add_scope_ids=['odp.role:admin'])):
+        roles.create()
+
+    assert role_api == [('render', 'role_edit.html')]
+
+
+def test_edit_previews_offered_changes(role_api):
+    data = dict(id='r1', add_scope_ids=['odp.record:write'], remove_collection_ids=['c1'])
+    with Flask(__name__).test_request_context(method='POST', data=data):
+        roles.edit('r1')
+
+    assert role_api == [('render', 'membership_preview.html')]